@@ -5,6 +5,18 @@
 let languageData = {};
 let fiscalData = {};
 let billsData = {};
+const sentenceShards = {};
+
+// Sentence text lives in data/sentences/<first 2 chars of id>.json;
+// fetch only the shards this bill references
+async function loadSentences(ids) {
+    const dir = languageData.sentence_dir || 'data/sentences';
+    const prefixes = [...new Set(ids.map(id => id.slice(0, 2)))];
+    await Promise.all(prefixes.filter(p => !sentenceShards[p]).map(async p => {
+        const res = await fetch(`${dir}/${p}.json`);
+        sentenceShards[p] = res.ok ? await res.json() : {};
+    }));
+}
 
 function getBillFromURL() {
     const params = new URLSearchParams(window.location.search);
@@ -244,26 +256,64 @@ function renderLanguageAnalysis(billNumber) {
         interpretation = `<strong>Balanced approach.</strong> Mixes mandatory requirements with some agency discretion.`;
     }
     
+    const substantive = analysis.substantive;
+    const boilerplate = substantive ? total - (substantive.mandatory + substantive.prohibited + substantive.discretionary) : 0;
+    
     html += `
         <div class="bg-slate-100 rounded-lg p-4 mb-6">
             <div class="text-sm text-slate-700">${interpretation}</div>
+            ${boilerplate > 0 ? `<div class="text-xs text-slate-500 mt-2">Excluding ${boilerplate} boilerplate sentence${boilerplate === 1 ? '' : 's'} repeated across ${languageData.boilerplate_min_bills}+ bills: ${substantive.mandatory} mandatory, ${substantive.prohibited} prohibited, ${substantive.discretionary} discretionary.</div>` : ''}
+        </div>
+        <div id="sentenceSections" class="space-y-4">
+            <p class="text-sm text-slate-400">Loading sentences...</p>
         </div>
-        <div class="space-y-4">
     `;
+    container.innerHTML = html;
+    
+    renderSentences(analysis).catch(err => {
+        console.error('Error loading sentences:', err);
+        document.getElementById('sentenceSections').innerHTML = '';
+    });
+}
+
+async function renderSentences(analysis) {
+    const ids = kind => (analysis[kind] && analysis[kind].ids) || [];
+    const all = ['shall', 'shall_not', 'may_not', 'may'].flatMap(ids);
+    if (all.length === 0) {
+        document.getElementById('sentenceSections').innerHTML = '';
+        return;
+    }
+    await loadSentences(all);
+    const boilerplate = new Set(languageData.boilerplate || []);
+    const lookup = list => list.map(id => ({
+        text: sentenceShards[id.slice(0, 2)][id] || '',
+        boilerplate: boilerplate.has(id)
+    })).filter(s => s.text);
     
-    if (analysis.shall.sentences.length > 0) {
-        html += renderSentenceSection('Mandatory Actions (SHALL)', analysis.shall.sentences, 'mandatory', 'shall');
+    let html = '';
+    const shall = lookup(ids('shall'));
+    const prohibited = lookup([...ids('shall_not'), ...ids('may_not')]);
+    const may = lookup(ids('may'));
+    if (shall.length > 0) {
+        html += renderSentenceSection('Mandatory Actions (SHALL)', shall, 'mandatory', 'shall');
     }
-    if (analysis.shall_not.sentences.length > 0 || analysis.may_not.sentences.length > 0) {
-        const prohibited = [...(analysis.shall_not.sentences || []), ...(analysis.may_not.sentences || [])];
+    if (prohibited.length > 0) {
         html += renderSentenceSection('Prohibited Actions', prohibited, 'prohibited', 'prohibited');
     }
-    if (analysis.may.sentences.length > 0) {
-        html += renderSentenceSection('Discretionary Actions (MAY)', analysis.may.sentences, 'discretionary', 'may');
+    if (may.length > 0) {
+        html += renderSentenceSection('Discretionary Actions (MAY)', may, 'discretionary', 'may');
     }
-    
-    html += `</div>`;
-    container.innerHTML = html;
+    document.getElementById('sentenceSections').innerHTML = html;
+}
+
+function renderSentenceCard(s, type) {
+    const text = s.text;
+    return `
+                    <div class="sentence-card ${type} text-sm text-slate-700 p-3 rounded">
+                        "${text}${text.endsWith('...') ? '' : '...'}"
+                        ${s.boilerplate ? '<span class="ml-1 text-xs text-slate-400 whitespace-nowrap">(boilerplate)</span>' : ''}
+                    </div>
+    `;
 }
 
 function renderSentenceSection(title, sentences, type, id) {
@@ -282,21 +332,13 @@ function renderSentenceSection(title, sentences, type, id) {
         <div>
             <h4 class="font-semibold ${colorClass} mb-2">${title} (${sentences.length})</h4>
             <div class="space-y-2">
-                ${sentences.slice(0, visibleCount).map(s => `
-                    <div class="sentence-card ${type} text-sm text-slate-700 p-3 rounded">
-                        "${s}${s.endsWith('...') ? '' : '...'}"
-                    </div>
-                `).join('')}
+                ${sentences.slice(0, visibleCount).map(s => renderSentenceCard(s, type)).join('')}
     `;
     
     if (hasMore) {
         html += `
                 <div id="${id}-more" class="hidden space-y-2">
-                    ${sentences.slice(visibleCount).map(s => `
-                        <div class="sentence-card ${type} text-sm text-slate-700 p-3 rounded">
-                            "${s}${s.endsWith('...') ? '' : '...'}"
-                        </div>
-                    `).join('')}
+                    ${sentences.slice(visibleCount).map(s => renderSentenceCard(s, type)).join('')}
                 </div>
                 <button onclick="toggleMore('${id}')" id="${id}-btn" 
                         class="text-sm ${colorClass} hover:underline font-medium mt-2">
@@ -253,9 +253,9 @@ function createBillCard(bill) {
     }
     
     return `
-        <div class="bill-card bg-white rounded-lg shadow hover:shadow-xl transition-all duration-200 p-6 border-l-4 ${statusColor} relative cursor-pointer" onclick="if(!event.target.closest('button') && !event.target.closest('a')) window.location.href='bill.html?bill=' + '${bill.bill_number}'">
+        <div class="bill-card bg-white rounded-lg shadow hover:shadow-xl transition-all duration-200 p-6 border-l-4 ${statusColor} relative cursor-pointer" onclick="if(!event.target.closest('button') && !event.target.closest('a')) window.location.href='bills/${bill.bill_number}.html'">
             <div class="flex justify-between items-center mb-3">
-                <a href="bill.html?bill=${bill.bill_number}" class="text-3xl font-bold text-blue-600 hover:text-blue-800">
+                <a href="bills/${bill.bill_number}.html" class="text-3xl font-bold text-blue-600 hover:text-blue-800">
                     ${formatBillNumber(bill.bill_number)}
                 </a>
                 <span class="absolute top-4 left-1/2 transform -translate-x-1/2 text-xs px-2 py-1 bg-gray-100 rounded z-10 whitespace-nowrap flex items-center">${bill.status || 'Filed'}</span>
@@ -7,6 +7,7 @@ let billsData = {};
 let legislatorsData = {};
 let votesData = {};
 let summariesData = {};
+let relatedData = {};
 
 // Get bill number from URL
 function getBillFromURL() {
@@ -66,6 +67,15 @@ async function init() {
             console.log('No summaries available');
         }
         
+        try {
+            const relRes = await fetch('data/related_bills.json');
+            if (relRes.ok) {
+                const relData = await relRes.json(); relatedData = relData.related || {};
+            }
+        } catch (e) {
+            console.log('No related bills available');
+        }
+        
         currentBill = billsData[billNumber];
         
         if (!currentBill) {
@@ -229,6 +239,9 @@ function renderBill() {
     // Votes
     renderVotes();
     
+    // Related bills
+    renderRelatedBills();
+    
     // Watchlist button state
     updateWatchlistButton();
     
@@ -343,6 +356,25 @@ function renderOrgPositions() {
     }).join('');
 }
 
+function renderRelatedBills() {
+    const related = (relatedData[currentBill.bill_number] || [])
+        .filter(([billNum]) => billsData[billNum]);
+    
+    if (related.length === 0) return;
+    
+    document.getElementById('relatedList').innerHTML = related.map(([billNum]) => {
+        const bill = billsData[billNum];
+        return `
+            <a href="bill.html?bill=${billNum}" class="block p-3 rounded-lg border border-gray-200 hover:bg-gray-50">
+                <span class="font-semibold text-blue-900">${billNum}</span>
+                <span class="text-gray-700 ml-2">${bill.title}</span>
+                <span class="block text-xs text-gray-500 mt-1">${bill.status || 'Filed'}</span>
+            </a>
+        `;
+    }).join('');
+    document.getElementById('relatedSection').classList.remove('hidden');
+}
+
 function formatOrgName(field) {
     return field
         .replace('_position', '')
@@ -9,6 +9,8 @@ class ComparisonEngine {
         this.legislators = legislators;
         this.organizations = organizations;
         this.userPositions = {}; // From quiz
+        this.billsByNumber = {};
+        (bills || []).forEach(bill => this.billsByNumber[bill.bill_number] = bill);
         
         // Ideology templates (based on typical positions)
         this.ideologies = {
@@ -132,9 +134,11 @@ class ComparisonEngine {
         const leg = this.legislators[legislatorName];
         if (!leg) return {};
         
+        // Yea and nay on different roll calls of one bill counts as yea,
+        // as in generate_compare_data.calculate_alignment
         const positions = {};
-        leg.yea_votes.forEach(bill => positions[bill] = 'Support');
         leg.nay_votes.forEach(bill => positions[bill] = 'Oppose');
+        leg.yea_votes.forEach(bill => positions[bill] = 'Support');
         return positions;
     }
     
@@ -170,7 +174,7 @@ class ComparisonEngine {
         commonBills.forEach(billNum => {
             const pos1 = positions1[billNum];
             const pos2 = positions2[billNum];
-            const bill = this.bills.find(b => b.bill_number === billNum);
+            const bill = this.billsByNumber[billNum];
             
             if (pos1 === pos2) {
                 agreements.push({
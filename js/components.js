@@ -6,7 +6,8 @@
 function getBasePath() {
     // Detect if we're in a subdirectory
     const path = window.location.pathname;
-    if (path.includes('/quiz/') || path.includes('/blog/') || path.includes('/tools/')) {
+    if (path.includes('/quiz/') || path.includes('/blog/') || path.includes('/tools/') ||
+        path.includes('/bills/') || path.includes('/legislators/')) {
         return '../';
     }
     return '';
@@ -5,6 +5,65 @@
 // Filter state
 let currentFilter = 'all';
 
+// Precomputed facet bitsets (scripts/build_facet_index.py)
+let facetIndex = null;
+
+async function loadFacetIndex() {
+    try {
+        const response = await fetch('data/facet_index.json');
+        if (!response.ok) return;
+        const data = await response.json();
+        
+        // Decode base64 bitsets into Uint32Array words
+        const bitsets = {};
+        for (const [facet, values] of Object.entries(data.bitsets)) {
+            bitsets[facet] = {};
+            for (const [value, encoded] of Object.entries(values)) {
+                const raw = atob(encoded);
+                const bytes = new Uint8Array(raw.length);
+                for (let i = 0; i < raw.length; i++) bytes[i] = raw.charCodeAt(i);
+                bitsets[facet][value] = new Uint32Array(bytes.buffer);
+            }
+        }
+        facetIndex = { bills: data.bills, counts: data.counts, bitsets };
+        console.log(`Loaded facet index: ${data.bills.length} bills`);
+    } catch (error) {
+        console.warn('Facet index unavailable, filtering by scan:', error);
+    }
+}
+
+// The index is only usable if it was built from the bills on the page
+function facetIndexMatches(bills) {
+    if (!facetIndex || facetIndex.bills.length !== bills.length) return false;
+    return bills.every((bill, i) => bill.bill_number === facetIndex.bills[i]);
+}
+
+// OR the bitsets for `values` within one facet
+function facetUnion(facet, values) {
+    const words = new Uint32Array(Math.ceil(facetIndex.bills.length / 32));
+    for (const [key, bits] of Object.entries(facetIndex.bitsets[facet])) {
+        // Status checkboxes are substring matches over exact statuses
+        const hit = facet === 'status' ? values.some(v => key.includes(v)) : values.includes(key);
+        if (hit) for (let w = 0; w < words.length; w++) words[w] |= bits[w];
+    }
+    return words;
+}
+
+// Bills passing the view/org/status/topic filters, via bitset intersection
+function facetFilter(bills, view, orgs, statuses, topics) {
+    const words = new Uint32Array(Math.ceil(bills.length / 32)).fill(0xFFFFFFFF);
+    const intersect = other => { for (let w = 0; w < words.length; w++) words[w] &= other[w]; };
+    
+    if (view === 'controversial' || view === 'agreement') intersect(facetIndex.bitsets.view[view]);
+    if (orgs.length) intersect(facetUnion('org', orgs));
+    if (statuses.length) intersect(facetUnion('status', statuses));
+    if (topics.length) intersect(facetUnion('topic', topics));
+    
+    return bills.filter((bill, i) => words[i >>> 5] >>> (i & 31) & 1);
+}
+
+document.addEventListener('DOMContentLoaded', loadFacetIndex);
+
 // Set main filter (All, Controversial, Agreement, My Votes)
 function setFilter(filterType) {
     // Clear org selections when "All Bills" is clicked
@@ -46,30 +105,10 @@ function getPositionValues(bill) {
     return positions;
 }
 
-// Main filter function
-function applyAllFilters() {
-    if (!window.allBills || !Array.isArray(window.allBills)) {
-        console.log('Bills not loaded yet');
-        return;
-    }
-    
-    let filtered = [...window.allBills];
-    console.log(`Starting with ${filtered.length} bills`);
-    
-    // 1. Apply search filter
-    const searchTerm = document.getElementById('search-input')?.value?.toLowerCase() || '';
-    if (searchTerm) {
-        filtered = filtered.filter(bill => 
-            bill.bill_number?.toLowerCase().includes(searchTerm) ||
-            bill.bill_number?.toLowerCase().replace(/0+/, '').includes(searchTerm) ||
-            bill.title?.toLowerCase().includes(searchTerm) ||
-            bill.sponsor?.toLowerCase().includes(searchTerm)
-        );
-        console.log(`After search: ${filtered.length} bills`);
-    }
-    
-    // 2. Apply main filter (controversial, agreement, my-votes)
-    if (currentFilter === 'controversial') {
+// Filter by rescanning every bill (fallback when the facet index is missing or stale)
+function scanFilters(filtered, view, orgs, statuses, topics) {
+    // 2. Apply main filter (controversial, agreement)
+    if (view === 'controversial') {
         filtered = filtered.filter(bill => {
             const positions = getPositionValues(bill);
             const hasSupport = positions.includes('Support');
@@ -77,28 +116,19 @@ function applyAllFilters() {
             return hasSupport && hasOppose;
         });
         console.log(`After controversial filter: ${filtered.length} bills`);
-    } else if (currentFilter === 'agreement') {
+    } else if (view === 'agreement') {
         filtered = filtered.filter(bill => {
             const positions = getPositionValues(bill);
             const nonWatching = positions.filter(p => p !== 'Watching' && p !== 'Studying');
             return nonWatching.length >= 2 && new Set(nonWatching).size === 1;
         });
         console.log(`After agreement filter: ${filtered.length} bills`);
-    } else if (currentFilter === 'my-votes') {
-        const myVotes = JSON.parse(localStorage.getItem('user_bill_votes') || '{}');
-        const votedBills = Object.keys(myVotes);
-        console.log('My votes:', votedBills);
-        filtered = filtered.filter(bill => {
-            const formatted = bill.bill_number.replace(/([A-Z]+)0+/, "$1");
-            return myVotes[formatted] || myVotes[bill.bill_number];
-        });
-        console.log(`After my-votes filter: ${filtered.length} bills`);
     }
     
     // 3. Apply organization filters (uses selectedOrgs Set from app.js)
-    if (typeof selectedOrgs !== "undefined" && selectedOrgs.size > 0) {
+    if (orgs.length > 0) {
         filtered = filtered.filter(bill => {
-            return Array.from(selectedOrgs).some(orgId => {
+            return orgs.some(orgId => {
                 const positionField = `${orgId}_position`;
                 return bill[positionField] && bill[positionField] !== "" && bill[positionField] !== "N/A";
             });
@@ -107,9 +137,7 @@ function applyAllFilters() {
     }
     
     // 4. Apply status filters
-    const checkedStatuses = document.querySelectorAll('.status-filter:checked');
-    if (checkedStatuses.length > 0) {
-        const statuses = Array.from(checkedStatuses).map(cb => cb.value);
+    if (statuses.length > 0) {
         filtered = filtered.filter(bill => {
             const billStatus = bill.status || '';
             return statuses.some(s => billStatus.includes(s));
@@ -118,17 +146,64 @@ function applyAllFilters() {
     }
     
     // 5. Apply topic filters
-    const checkedTopics = document.querySelectorAll('.topic-filter:checked');
-    if (checkedTopics.length > 0) {
-        const selectedTopics = Array.from(checkedTopics).map(cb => cb.value);
-        console.log('Selected topics:', selectedTopics);
+    if (topics.length > 0) {
         filtered = filtered.filter(bill => {
             const billTopics = bill.topics || [];
-            return selectedTopics.some(topic => billTopics.includes(topic));
+            return topics.some(topic => billTopics.includes(topic));
         });
         console.log(`After topic filter: ${filtered.length} bills`);
     }
     
+    return filtered;
+}
+
+// Main filter function
+function applyAllFilters() {
+    if (!window.allBills || !Array.isArray(window.allBills)) {
+        console.log('Bills not loaded yet');
+        return;
+    }
+    
+    let filtered = [...window.allBills];
+    console.log(`Starting with ${filtered.length} bills`);
+    
+    // 1. Apply search filter
+    const searchTerm = document.getElementById('search-input')?.value?.toLowerCase() || '';
+    if (searchTerm) {
+        filtered = filtered.filter(bill => 
+            bill.bill_number?.toLowerCase().includes(searchTerm) ||
+            bill.bill_number?.toLowerCase().replace(/0+/, '').includes(searchTerm) ||
+            bill.title?.toLowerCase().includes(searchTerm) ||
+            bill.sponsor?.toLowerCase().includes(searchTerm)
+        );
+        console.log(`After search: ${filtered.length} bills`);
+    }
+    
+    const orgs = typeof selectedOrgs !== "undefined" ? Array.from(selectedOrgs) : [];
+    const statuses = Array.from(document.querySelectorAll('.status-filter:checked')).map(cb => cb.value);
+    const topics = Array.from(document.querySelectorAll('.topic-filter:checked')).map(cb => cb.value);
+    
+    // 2-5. Facet filters: bitset intersection when the index matches the loaded bills
+    if (facetIndexMatches(window.allBills)) {
+        const view = currentFilter === 'my-votes' ? 'all' : currentFilter;
+        const matching = new Set(facetFilter(window.allBills, view, orgs, statuses, topics));
+        filtered = filtered.filter(bill => matching.has(bill));
+        console.log(`After facet filters: ${filtered.length} bills`);
+    } else {
+        filtered = scanFilters(filtered, currentFilter, orgs, statuses, topics);
+    }
+    
+    if (currentFilter === 'my-votes') {
+        const myVotes = JSON.parse(localStorage.getItem('user_bill_votes') || '{}');
+        const votedBills = Object.keys(myVotes);
+        console.log('My votes:', votedBills);
+        filtered = filtered.filter(bill => {
+            const formatted = bill.bill_number.replace(/([A-Z]+)0+/, "$1");
+            return myVotes[formatted] || myVotes[bill.bill_number];
+        });
+        console.log(`After my-votes filter: ${filtered.length} bills`);
+    }
+    
     // Display results
     if (typeof displayBills === 'function') {
         displayBills(filtered);
@@ -8,9 +8,23 @@ class LegislatorMatcher {
         this.legislators = {};
         this.bills = {};
         this.userVotes = {};
+        this.quizBills = null;
     }
     
     async loadData() {
+        // Compact vote matrix from scripts/export_vote_matrix.py
+        // (~150KB instead of legislators.json + bills.json)
+        try {
+            const matrixResponse = await fetch('data/vote_matrix.json');
+            if (matrixResponse.ok) {
+                this.loadVoteMatrix(await matrixResponse.json());
+                console.log(`Loaded vote matrix: ${this.legislatorNames.length} legislators x ${this.billCount} bills`);
+                return;
+            }
+        } catch (error) {
+            console.warn('Vote matrix unavailable, loading full data:', error);
+        }
+        
         // Load legislators
         const legResponse = await fetch('data/legislators.json');
         const legData = await legResponse.json();
@@ -25,6 +39,49 @@ class LegislatorMatcher {
         console.log(`Loaded ${this.bills.length} bills`);
     }
     
+    loadVoteMatrix(data) {
+        /**
+         * Decode the base64 int8 matrix: row per legislator, column per bill
+         * Codes: 1 yea, -1 nay, 2 voted both ways, 0 no vote
+         */
+        this.legislatorNames = data.legislators;
+        this.billCount = data.bills.length;
+        this.billIndex = {};
+        data.bills.forEach((bill, j) => this.billIndex[bill] = j);
+        
+        const raw = atob(data.codes);
+        this.voteCodes = new Int8Array(raw.length);
+        for (let i = 0; i < raw.length; i++) {
+            this.voteCodes[i] = raw.charCodeAt(i) << 24 >> 24;
+        }
+        
+        this.quizBills = data.quizBills || null;
+    }
+    
+    legislatorVote(row, billNum) {
+        /**
+         * {yea, nay} for one legislator row - matrix or vote lists
+         */
+        if (this.voteCodes) {
+            const j = this.billIndex[billNum];
+            const code = j === undefined ? 0 : this.voteCodes[row * this.billCount + j];
+            return { yea: code === 1 || code === 2, nay: code === -1 || code === 2 };
+        }
+        const legislator = this.legislators[row];
+        return {
+            yea: legislator.yea_votes.includes(billNum),
+            nay: legislator.nay_votes.includes(billNum)
+        };
+    }
+    
+    legislatorRows() {
+        /**
+         * [name, row] pairs; row is a matrix index or a legislators.json key
+         */
+        if (this.voteCodes) return this.legislatorNames.map((name, i) => [name, i]);
+        return Object.keys(this.legislators).map(name => [name, name]);
+    }
+    
     getQuizBills(count = 20) {
         /**
          * Get bills for quiz - prioritize:
@@ -33,6 +90,9 @@ class LegislatorMatcher {
          * 3. Bills that were actually voted on
          */
         
+        // Already picked by the pipeline when loaded from the vote matrix
+        if (this.quizBills) return this.quizBills.slice(0, count);
+        
         const votedBills = this.bills.filter(bill => {
             // Has vote data
             const hasVotes = (bill.house_votes_for || 0) + (bill.house_votes_against || 0) > 0;
@@ -81,7 +141,7 @@ class LegislatorMatcher {
         
         const results = [];
         
-        for (const [name, legislator] of Object.entries(this.legislators)) {
+        for (const [name, row] of this.legislatorRows()) {
             let agreements = 0;
             let disagreements = 0;
             let compared = 0;
@@ -89,8 +149,7 @@ class LegislatorMatcher {
             for (const [billNum, userVote] of Object.entries(this.userVotes)) {
                 if (userVote === 'skip') continue;
                 
-                const legVotedYea = legislator.yea_votes.includes(billNum);
-                const legVotedNay = legislator.nay_votes.includes(billNum);
+                const { yea: legVotedYea, nay: legVotedNay } = this.legislatorVote(row, billNum);
                 
                 if (!legVotedYea && !legVotedNay) continue; // Legislator didn't vote
                 
@@ -125,27 +184,25 @@ class LegislatorMatcher {
          * Compare two legislators' voting records
          */
         
-        const leg1 = this.legislators[name1];
-        const leg2 = this.legislators[name2];
+        const rows = Object.fromEntries(this.legislatorRows());
+        const row1 = rows[name1];
+        const row2 = rows[name2];
         
-        if (!leg1 || !leg2) return null;
+        if (row1 === undefined || row2 === undefined) return null;
         
         let agreements = 0;
         let disagreements = 0;
         
-        // Find bills both voted on
-        const allBills = new Set([
-            ...leg1.yea_votes,
-            ...leg1.nay_votes,
-            ...leg2.yea_votes,
-            ...leg2.nay_votes
-        ]);
-        
-        for (const bill of allBills) {
-            const leg1Yea = leg1.yea_votes.includes(bill);
-            const leg1Nay = leg1.nay_votes.includes(bill);
-            const leg2Yea = leg2.yea_votes.includes(bill);
-            const leg2Nay = leg2.nay_votes.includes(bill);
+        const billNumbers = this.voteCodes
+            ? Object.keys(this.billIndex)
+            : Object.keys(Object.fromEntries([
+                ...this.legislators[name1].yea_votes, ...this.legislators[name1].nay_votes,
+                ...this.legislators[name2].yea_votes, ...this.legislators[name2].nay_votes
+            ].map(bill => [bill, true])));
+        
+        for (const bill of billNumbers) {
+            const { yea: leg1Yea, nay: leg1Nay } = this.legislatorVote(row1, bill);
+            const { yea: leg2Yea, nay: leg2Nay } = this.legislatorVote(row2, bill);
             
             // Both must have voted
             if ((leg1Yea || leg1Nay) && (leg2Yea || leg2Nay)) {
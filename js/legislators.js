@@ -111,19 +111,24 @@ function renderLegislators() {
     grid.innerHTML = filtered.map(leg => createLegislatorCard(leg)).join('');
 }
 
+// Older alignment files have no interval; fall back to the old 3-vote floor
+function isReliable(org) {
+    return org.reliable ?? org.total >= 3;
+}
+
 function createLegislatorCard(leg) {
     const partyColor = leg.party === 'R' ? 'red' : 'blue';
     const partyEmoji = leg.party === 'R' ? '🐘' : '🐴';
     
-    // Top 3 alignments
+    // Top 3 alignments (only cells with enough votes to mean something)
     const topOrgs = Object.entries(leg.organizations || {})
-        .filter(([_, org]) => org.total >= 3)
+        .filter(([_, org]) => isReliable(org))
         .sort((a, b) => b[1].alignment - a[1].alignment)
         .slice(0, 3);
     
     // Bottom 3 alignments
     const bottomOrgs = Object.entries(leg.organizations || {})
-        .filter(([_, org]) => org.total >= 3)
+        .filter(([_, org]) => isReliable(org))
         .sort((a, b) => a[1].alignment - b[1].alignment)
         .slice(0, 3);
     
@@ -132,7 +137,9 @@ function createLegislatorCard(leg) {
              onclick="showLegislatorDetail('${leg.id}')">
             <div class="flex items-center justify-between mb-3">
                 <div>
-                    <h3 class="font-bold text-lg">${leg.name}</h3>
+                    <h3 class="font-bold text-lg">
+                        <a href="legislators/${leg.id}.html" class="hover:text-blue-600" onclick="event.stopPropagation()">${leg.name}</a>
+                    </h3>
                     <p class="text-sm text-gray-500">
                         ${partyEmoji} ${leg.party === 'R' ? 'Republican' : 'Democrat'} · ${leg.chamber} District ${leg.district}
                     </p>
@@ -189,6 +196,7 @@ function showLegislatorDetail(legId) {
         <h2 class="text-2xl font-bold mb-2">${leg.name}</h2>
         <p class="text-gray-600 mb-4">
             ${partyEmoji} ${partyName} · ${leg.chamber} District ${leg.district}
+            · <a href="legislators/${legId}.html" class="text-blue-600 hover:underline">Full voting record</a>
         </p>
         
         <div class="grid grid-cols-2 gap-4 mb-6">
@@ -203,19 +211,22 @@ function showLegislatorDetail(legId) {
         </div>
         
         <h3 class="font-bold text-lg mb-3">Organization Alignments</h3>
-        <p class="text-sm text-gray-500 mb-4">Based on contested votes only (20-80% split)</p>
+        <p class="text-sm text-gray-500 mb-4">Based on contested votes only (20-80% split). Ranges are 95% intervals; faded rows rest on too few votes to read much into.</p>
         
         <div class="space-y-2 max-h-96 overflow-y-auto">
             ${allOrgsSorted.map(([field, org]) => {
                 const pct = org.alignment;
                 const barColor = pct >= 60 ? 'bg-green-500' : pct >= 40 ? 'bg-yellow-500' : 'bg-red-500';
+                const range = org.alignment_low !== undefined
+                    ? `<span class="font-normal text-gray-400">${Math.round(org.alignment_low)}-${Math.round(org.alignment_high)}%</span>`
+                    : '';
                 return `
-                    <div class="flex items-center gap-3">
+                    <div class="flex items-center gap-3 ${isReliable(org) ? '' : 'opacity-50'}">
                         <div class="w-8 text-center">${org.emoji}</div>
                         <div class="flex-1">
                             <div class="flex justify-between text-sm mb-1">
                                 <span>${org.name}</span>
-                                <span class="font-semibold">${pct}% (${org.matches}/${org.total})</span>
+                                <span class="font-semibold">${pct}% (${org.matches}/${org.total}) ${range}</span>
                             </div>
                             <div class="h-2 bg-gray-200 rounded-full overflow-hidden">
                                 <div class="${barColor} h-full rounded-full" style="width: ${pct}%"></div>
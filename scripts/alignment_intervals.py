@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Alignment Intervals - Confidence bounds and a reliability flag for agreement rates
+Usage: python3 scripts/alignment_intervals.py    # summarize data/legislator_alignments.json
+
+A legislator's alignment with an org is agreements / bills compared,
+and many cells rest on 2-5 bills: "0.0% over 3 bills" is all but
+uninformative. Every alignment cell therefore also carries the 95%
+Wilson score interval for that rate, plus `reliable`, which is true
+only when at least MIN_BILLS bills were compared and the interval is
+at most MAX_WIDTH points wide.
+
+The interval depends only on (agreements, bills compared). Those are
+small integers, so each distinct pair is computed once and the full
+legislator x org x filter matrix costs a few thousand dict lookups.
+"""
+
+import json
+import math
+import time
+from collections import Counter
+from functools import lru_cache
+
+ALIGNMENTS_FILE = 'data/legislator_alignments.json'
+
+Z = 1.959964                # two-sided 95%
+MIN_BILLS = 5
+MAX_WIDTH = 50.0            # percentage points
+
+
+@lru_cache(maxsize=None)
+def alignment_interval(agreements, compared):
+    """(low %, high %, reliable) for `agreements` out of `compared` bills"""
+    if compared <= 0:
+        return 0.0, 100.0, False
+    p = agreements / compared
+    z2 = Z * Z
+    denom = 1 + z2 / compared
+    center = (p + z2 / (2 * compared)) / denom
+    spread = Z * math.sqrt(p * (1 - p) / compared + z2 / (4 * compared * compared)) / denom
+    low = round(max(0.0, center - spread) * 100, 1)
+    high = round(min(1.0, center + spread) * 100, 1)
+    return low, high, compared >= MIN_BILLS and high - low <= MAX_WIDTH
+
+
+def main():
+    with open(ALIGNMENTS_FILE, 'r') as f:
+        alignments = json.load(f)
+    cells = [(o['matches'], o['total']) for leg in alignments.values() for o in leg['organizations'].values()]
+
+    alignment_interval.cache_clear()
+    start = time.perf_counter()
+    results = [alignment_interval(k, n) for k, n in cells]
+    elapsed = time.perf_counter() - start
+
+    reliable = sum(1 for r in results if r[2])
+    widths = Counter(min(int((high - low) // 10) * 10, 90) for low, high, _ in results)
+    print(f"  {len(cells)} legislator x org cells, {alignment_interval.cache_info().currsize} distinct "
+          f"(agreements, compared) pairs, {elapsed * 1000:.1f}ms")
+    print(f"  Reliable (>= {MIN_BILLS} bills, interval <= {MAX_WIDTH:.0f} pts): {reliable} "
+          f"({reliable / len(cells):.0%})")
+    for bucket in sorted(widths):
+        print(f"    width {bucket:>2}-{bucket + 10:<3} pts  {widths[bucket]}")
+
+
+if __name__ == '__main__':
+    main()
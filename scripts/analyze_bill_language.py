@@ -1,28 +1,51 @@
 """
 Bill Language Analyzer - Counts and extracts SHALL/MAY/MUST sentences
+
+Sentence text is interned into the shared table under data/sentences/
+(see sentence_table.py); bill_language.json keeps counts and sentence IDs.
 """
 
 import re
 import json
-import requests
 from html import unescape
 import os
 import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pipeline_metrics
+from artifact_index import open_index, optional_index
+from sentence_table import write_language
+
+BILLS_FILE = 'data/bills.json'
+CACHE_DIR = 'cache/bill_xml'
+
+def bill_xml_cache_path(bill_number, session="2025"):
+    """Where a fetched bill's XML is cached on disk"""
+    return os.path.join(CACHE_DIR, session, f'{bill_number}.xml')
 
 def fetch_bill_xml(bill_number, session="2025"):
-    """Fetch bill XML from Utah Legislature"""
+    """Fetch bill XML from Utah Legislature (cached on disk)"""
+    run = pipeline_metrics.current()
+    cache_path = bill_xml_cache_path(bill_number, session)
+    if os.path.exists(cache_path):
+        run.cache_hit('bill_xml')
+        with open(cache_path, 'r') as f:
+            return f.read()
+    run.cache_miss('bill_xml')
+
     urls = [
         f"https://le.utah.gov/Session/{session}/bills/enrolled/{bill_number}.xml",
         f"https://le.utah.gov/Session/{session}/bills/introduced/{bill_number}.xml"
     ]
     
     for url in urls:
-        try:
-            response = requests.get(url, timeout=30)
-            if response.status_code == 200 and '<?xml' in response.text[:100]:
-                return response.text
-        except:
-            continue
+        response = run.http_get(url, timeout=30, bill=bill_number)
+        if response is not None and response.status_code == 200 and '<?xml' in response.text[:100]:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(cache_path, 'w') as f:
+                f.write(response.text)
+            return response.text
+    run.error('not_found', bill_number)
     return None
 
 def extract_text_from_xml(xml_content):
@@ -53,8 +76,10 @@ def analyze_bill(bill_number, session="2025"):
     if not xml:
         return None
     
-    text = extract_text_from_xml(xml)
-    
+    return analyze_text(bill_number, extract_text_from_xml(xml))
+
+def analyze_text(bill_number, text):
+    """Count SHALL/MAY/MUST sentences in already-extracted bill text"""
     # Find SHALL
     shall_sentences = find_keyword_sentences(text, 'shall')
     shall_not_sentences = [s for s in shall_sentences if re.search(r'\bshall\s+not\b', s, re.IGNORECASE)]
@@ -102,63 +127,146 @@ def analyze_bill(bill_number, session="2025"):
         }
     }
 
+def analyze_cached_file(job):
+    """Worker: analyze one bill from its cached XML path
+
+    Takes (bill_number, path) so only the path crosses the process
+    boundary; the worker reads and parses the XML itself.
+    """
+    bill_number, path = job
+    with open(path, 'r') as f:
+        text = extract_text_from_xml(f.read())
+    return analyze_text(bill_number, text)
+
+def analyze_parallel(jobs, workers=None, chunksize=None):
+    """Fan (bill_number, xml_path) jobs out over a process pool
+
+    Yields analyses in the same order as `jobs`, as soon as each chunk
+    completes. Chunking keeps IPC overhead low for the ~1ms-per-bill work.
+    """
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, len(jobs) // (workers * 4))
+    
+    if workers == 1:
+        # No pool overhead when there is only one core to use
+        yield from map(analyze_cached_file, jobs)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(analyze_cached_file, jobs, chunksize=chunksize)
+
+def reanalyze_session(workers=None, session="2025"):
+    """Re-analyze every bill with cached XML in parallel and rewrite the output
+    
+    Bills missing from the cache are fetched first (sequentially, rate-limited).
+    """
+    run = pipeline_metrics.start_run('analyze_bill_language')
+    
+    with run.span('load'):
+        bill_numbers = list(open_index(BILLS_FILE, 'bills', 'bill_number').keys())
+    
+    jobs = []
+    for bill_num in bill_numbers:
+        path = bill_xml_cache_path(bill_num, session)
+        if not os.path.exists(path):
+            with run.span('fetch', bill_num):
+                xml = fetch_bill_xml(bill_num, session)
+            run.sleep(0.5, bill_num)  # Be nice to their server
+            if not xml:
+                continue
+        jobs.append((bill_num, path))
+    
+    workers = workers or os.cpu_count() or 1
+    print(f"Analyzing {len(jobs)} cached bills across {workers} worker(s)...")
+    
+    analyses = {}
+    with run.span('analyze'):
+        for i, result in enumerate(analyze_parallel(jobs, workers), 1):
+            analyses[result['bill_number']] = result
+            if i % 100 == 0:
+                print(f"  [{i}/{len(jobs)}] analyzed")
+    run.count('analyzed', len(analyses))
+    
+    output_file = 'data/bill_language.json'
+    with run.span('serialize'):
+        output = write_language(output_file, analyses, time.strftime('%Y-%m-%dT%H:%M:%S'))
+    run.count('boilerplate_sentences', len(output['boilerplate']))
+    
+    print(f"\n✅ Analyzed {len(analyses)} bills")
+    print(f"   Saved to {output_file}")
+    run.finish()
+
+def load_existing_analyses(output_file):
+    """Load previously saved analyses (empty if none yet)"""
+    if not os.path.exists(output_file):
+        return {}
+    with open(output_file, 'r') as f:
+        return json.load(f).get('analyses', {})
+
 def generate_all_analyses():
     """Generate language analysis for controversial bills"""
+    run = pipeline_metrics.start_run('analyze_bill_language')
     
-    # Load bills to find which ones to analyze
-    with open('data/bills.json', 'r') as f:
-        bills_data = json.load(f)
-    
-    # Get controversial bills (have org positions with disagreement)
-    controversial = bills_data['bills']  # Process ALL bills
+    # Only bill numbers are needed, so read them from the index
+    with run.span('load'):
+        controversial = list(open_index(BILLS_FILE, 'bills', 'bill_number').keys())  # Process ALL bills
     print(f"Found {len(controversial)} controversial bills to analyze")
     
-    # Load existing analyses if any
+    # Existing analyses are checked by key; the full file is only loaded
+    # once there is a new analysis to merge into it
     output_file = 'data/bill_language.json'
-    if os.path.exists(output_file):
-        with open(output_file, 'r') as f:
-            existing = json.load(f)
-        analyses = existing.get('analyses', {})
-    else:
-        analyses = {}
+    with run.span('load'):
+        done = optional_index(output_file, 'analyses')
+    analyses = None
     
     # Analyze each bill
-    for i, bill in enumerate(controversial):
-        bill_num = bill['bill_number']
-        
-        if bill_num in analyses:
+    for i, bill_num in enumerate(controversial):
+        if bill_num in done:
             print(f"  Skipping {bill_num} (already analyzed)")
+            run.count('skipped')
             continue
         
         print(f"  [{i+1}/{len(controversial)}] Analyzing {bill_num}...")
         
-        result = analyze_bill(bill_num)
-        if result:
-            analyses[bill_num] = result
+        was_cached = os.path.exists(bill_xml_cache_path(bill_num))
+        with run.span('fetch', bill_num):
+            xml = fetch_bill_xml(bill_num)
+        if xml:
+            if analyses is None:
+                with run.span('load'):
+                    analyses = load_existing_analyses(output_file)
+            with run.span('parse', bill_num):
+                text = extract_text_from_xml(xml)
+            with run.span('analyze', bill_num):
+                analyses[bill_num] = analyze_text(bill_num, text)
+            run.count('analyzed')
             
             # Save after each to preserve progress
-            output = {
-                'generated_date': time.strftime('%Y-%m-%dT%H:%M:%S'),
-                'total_bills': len(analyses),
-                'analyses': analyses
-            }
-            with open(output_file, 'w') as f:
-                json.dump(output, f, indent=2)
+            with run.span('serialize', bill_num):
+                write_language(output_file, analyses, time.strftime('%Y-%m-%dT%H:%M:%S'))
         
-        time.sleep(0.5)  # Be nice to their server
+        if not was_cached:
+            run.sleep(0.5, bill_num)  # Be nice to their server
     
-    print(f"\n✅ Analyzed {len(analyses)} bills")
+    total = len(analyses) if analyses is not None else len(done)
+    print(f"\n✅ Analyzed {total} bills")
     print(f"   Saved to {output_file}")
+    run.finish()
 
-if __name__ == "__main__":
+def main():
     import sys
-    
+
     if len(sys.argv) > 1 and sys.argv[1] == '--all':
         generate_all_analyses()
+    elif len(sys.argv) > 1 and sys.argv[1] == '--parallel':
+        # --parallel [WORKERS]: re-analyze the whole session from cached XML
+        reanalyze_session(int(sys.argv[2]) if len(sys.argv) > 2 else None)
     else:
         # Test with one bill
         print("Testing bill language analyzer...")
-        print("Use --all flag to analyze all controversial bills\n")
+        print("Use --all flag to analyze all controversial bills")
+        print("Use --parallel [WORKERS] to re-analyze every cached bill on all cores\n")
         
         result = analyze_bill("HB0085")
         
@@ -173,3 +281,7 @@ if __name__ == "__main__":
             print(f"  Mandatory actions:  {result['totals']['mandatory']}")
             print(f"  Prohibited actions: {result['totals']['prohibited']}")
             print(f"  Discretionary:      {result['totals']['discretionary']}")
+
+
+if __name__ == "__main__":
+    main()
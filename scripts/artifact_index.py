@@ -0,0 +1,169 @@
+"""
+Artifact Index - Memory-mapped, lazily parsed access to large JSON artifacts
+
+Pipeline scripts used to json.load all of bills.json (or bill_language.json,
+fiscal_notes.json...) just to read a few fields or check whether a bill is
+already present. This module converts one collection inside such a file into
+a line-delimited sidecar (one record per line) plus an offset index by key,
+both under cache/index/. Readers mmap the sidecar and only parse the records
+they touch.
+
+    from artifact_index import open_index
+
+    bills = open_index('data/bills.json', 'bills', key_field='bill_number')
+    'HB0085' in bills                     # index lookup, no parsing
+    bills.get('HB0085')['title']          # parses one line
+    for b in bills.iter_records(fields=('bill_number', 'status')):
+        ...
+
+The sidecar is rebuilt automatically whenever the source file's size or
+mtime changes, so it never serves stale data.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+
+INDEX_DIR = 'cache/index'
+
+
+def _index_paths(source_path, collection):
+    # Same-named files in different checkouts must not share a sidecar
+    base = os.path.splitext(os.path.basename(source_path))[0]
+    where = hashlib.sha1(os.path.abspath(source_path).encode()).hexdigest()[:8]
+    stem = os.path.join(INDEX_DIR, f'{base}.{collection}.{where}')
+    return stem + '.ndjson', stem + '.idx.json'
+
+
+def _source_stamp(source_path):
+    st = os.stat(source_path)
+    return {'source': source_path, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def build_index(source_path, collection, key_field=None):
+    """Convert `collection` inside a JSON file into NDJSON + offset index
+
+    The collection may be a list of records (key taken from `key_field`) or
+    a dict of key -> record. Returns the path of the NDJSON sidecar.
+    """
+    with open(source_path, 'r') as f:
+        data = json.load(f)
+
+    records = data.get(collection, data) if isinstance(data, dict) else data
+    if isinstance(records, dict):
+        items = records.items()
+    else:
+        items = ((r[key_field], r) for r in records)
+
+    ndjson_path, idx_path = _index_paths(source_path, collection)
+    os.makedirs(INDEX_DIR, exist_ok=True)
+
+    offsets = {}
+    with open(ndjson_path, 'wb') as out:
+        for key, record in items:
+            line = json.dumps(record, separators=(',', ':')).encode('utf-8')
+            offsets[key] = (out.tell(), len(line))
+            out.write(line + b'\n')
+
+    index = {**_source_stamp(source_path), 'collection': collection, 'offsets': offsets}
+    with open(idx_path, 'w') as f:
+        json.dump(index, f, separators=(',', ':'))
+
+    return ndjson_path
+
+
+class RecordIndex:
+    """Read-only, key-addressable view over an NDJSON sidecar"""
+
+    def __init__(self, ndjson_path, offsets):
+        self.path = ndjson_path
+        self.offsets = offsets
+        self._file = open(ndjson_path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        # mmap refuses zero-length files; an empty collection needs no map
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __contains__(self, key):
+        return key in self.offsets
+
+    def keys(self):
+        return self.offsets.keys()
+
+    def raw(self, key):
+        """The record's JSON bytes, without parsing"""
+        offset, length = self.offsets[key]
+        return self._map[offset:offset + length]
+
+    def get(self, key, default=None):
+        if key not in self.offsets:
+            return default
+        return json.loads(self.raw(key))
+
+    def items(self):
+        """Yield (key, record) in file order"""
+        for key in self.offsets:
+            yield key, json.loads(self.raw(key))
+
+    def iter_records(self, fields=None, keys=None):
+        """Yield records in file order (or for `keys`), optionally projected
+
+        `fields` may be a collection of field names or a predicate on the
+        field name, e.g. lambda k: k.endswith('_position').
+        """
+        if fields is None:
+            pick = None
+        elif callable(fields):
+            pick = fields
+        else:
+            wanted = set(fields)
+            pick = wanted.__contains__
+
+        for key in (self.offsets if keys is None else keys):
+            if key not in self.offsets:
+                continue
+            record = json.loads(self.raw(key))
+            if pick is not None and isinstance(record, dict):
+                record = {k: v for k, v in record.items() if pick(k)}
+            yield record
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_index(source_path, collection, key_field=None):
+    """Open (building or refreshing if stale) the index for a collection"""
+    ndjson_path, idx_path = _index_paths(source_path, collection)
+    stamp = _source_stamp(source_path)
+
+    index = None
+    if os.path.exists(idx_path) and os.path.exists(ndjson_path):
+        with open(idx_path, 'r') as f:
+            index = json.load(f)
+        if any(index.get(k) != v for k, v in stamp.items()):
+            index = None
+
+    if index is None:
+        build_index(source_path, collection, key_field)
+        with open(idx_path, 'r') as f:
+            index = json.load(f)
+
+    return RecordIndex(ndjson_path, index['offsets'])
+
+
+def optional_index(source_path, collection, key_field=None):
+    """open_index() for outputs that may not exist yet (returns an empty dict)"""
+    if not os.path.exists(source_path):
+        return {}
+    return open_index(source_path, collection, key_field)
@@ -0,0 +1,550 @@
+#!/usr/bin/env python3
+"""
+Pipeline Benchmark - Times each data stage against recorded fixtures (no network)
+Usage:
+  python3 scripts/benchmark_pipeline.py                  # run all stages
+  python3 scripts/benchmark_pipeline.py --stage fiscal_parse --repeat 5
+  python3 scripts/benchmark_pipeline.py --record 25      # record 25 live fixtures first
+  python3 scripts/benchmark_pipeline.py --compare benchmarks/results/OLD.json
+
+Fixtures live in benchmarks/fixtures/ (bill_xml/*.xml, fiscal_html/*.fn.html).
+No fixtures are committed, so out of the box the suite is synthetic-only:
+bill XML and fiscal HTML are synthesized from the published data files,
+and xml_extract, language_* and fiscal_parse time that generated markup,
+not le.utah.gov pages. Run --record N once to benchmark real pages;
+results record which source was used. Results go to benchmarks/results/,
+which is local to each machine and not committed.
+"""
+
+import atexit
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from html import escape
+
+import analyze_bill_language
+import artifact_index
+import cli
+import generate_bill_summaries
+import generate_compare_data
+import records
+import scrape_fiscal_notes
+from sentence_table import KINDS, SentenceTable
+
+BILLS_FILE = 'data/bills.json'
+LEGISLATORS_FILE = 'data/legislators.json'
+LANGUAGE_FILE = 'data/bill_language.json'
+FISCAL_FILE = 'data/fiscal_notes.json'
+FIXTURES_DIR = 'benchmarks/fixtures'
+RESULTS_DIR = 'benchmarks/results'
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+def record_fixtures(count):
+    """Fetch `count` bills' XML and fiscal HTML from the live site into fixtures"""
+    with open(BILLS_FILE, 'r') as f:
+        bills = json.load(f)['bills']
+
+    xml_dir = os.path.join(FIXTURES_DIR, 'bill_xml')
+    fiscal_dir = os.path.join(FIXTURES_DIR, 'fiscal_html')
+    os.makedirs(xml_dir, exist_ok=True)
+    os.makedirs(fiscal_dir, exist_ok=True)
+
+    # Spread the sample across the session instead of taking the first N
+    step = max(1, len(bills) // count)
+    sample = [b['bill_number'] for b in bills[::step]][:count]
+
+    for i, bill_num in enumerate(sample):
+        print(f"  [{i+1}/{len(sample)}] Recording {bill_num}...")
+        xml = analyze_bill_language.fetch_bill_xml(bill_num)
+        if xml:
+            with open(os.path.join(xml_dir, f'{bill_num}.xml'), 'w') as f:
+                f.write(xml)
+        html = scrape_fiscal_notes.fetch_fiscal_html(bill_num)
+        if html:
+            with open(os.path.join(fiscal_dir, f'{bill_num}.fn.html'), 'w') as f:
+                f.write(html)
+        time.sleep(0.5)  # Be nice to their server
+
+
+def load_recorded(subdir, suffix):
+    """Load recorded fixtures as {bill_number: text}"""
+    path = os.path.join(FIXTURES_DIR, subdir)
+    if not os.path.isdir(path):
+        return {}
+    fixtures = {}
+    for name in sorted(os.listdir(path)):
+        if name.endswith(suffix):
+            with open(os.path.join(path, name), 'r') as f:
+                fixtures[name[:-len(suffix)]] = f.read()
+    return fixtures
+
+
+def synthesize_bill_xml(bill, analysis, sentences):
+    """Rebuild a bill XML document from its provisions and extracted sentences"""
+    paras = [bill.get('general_provisions', ''), bill.get('highlighted_provisions', '')]
+    for category in KINDS:
+        paras.extend(sentences.texts(analysis.get(category, {}).get('ids', [])))
+
+    body = '\n'.join(
+        f'  <section number="{i}"><para>{escape(p)}</para></section>'
+        for i, p in enumerate(paras, 1) if p
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<legislation billnumber="{bill["bill_number"]}">\n'
+        f'  <title>{escape(bill.get("title", ""))}</title>\n'
+        f'{body}\n'
+        '</legislation>\n'
+    )
+
+
+def synthesize_fiscal_html(bill_num, note):
+    """Rebuild a fiscal note page from its parsed fields"""
+    years = note.get('fiscal_years', [])[:3]
+    header = ''.join(f'<th>FY {fy}</th>' for fy in years)
+
+    def row(label, values):
+        cells = ''.join(f'<td>{values.get(f"FY{fy}", "$0")}</td>' for fy in years)
+        return f'<tr><td>{label}</td>{cells}</tr>'
+
+    return (
+        f'<html><head><title>{bill_num} Fiscal Note</title></head><body>\n'
+        f'<p>{escape(note.get("summary", ""))}</p>\n'
+        f'<table><tr><th></th>{header}</tr>\n'
+        f'{row("Total Revenues", note.get("total_revenues", {}))}\n'
+        f'{row("Total Expenditures", note.get("total_expenditures", {}))}\n'
+        f'{row("Net All Funds", note.get("net_impact", {}))}\n'
+        '</table>\n'
+        f'<h3>Local Government</h3><p class="UCA">{escape(note.get("local_government", ""))}</p>\n'
+        f'<h3>Individuals &amp; Businesses</h3><p class="UCA">{escape(note.get("individuals_businesses", ""))}</p>\n'
+        f'<h3>Regulatory Impact</h3><p class="UCA">{escape(note.get("regulatory_impact", ""))}</p>\n'
+        '</body></html>\n'
+    )
+
+
+def load_fixtures(bills):
+    """Return (bill_xml, fiscal_html, source) for the benchmark run"""
+    bill_xml = load_recorded('bill_xml', '.xml')
+    fiscal_html = load_recorded('fiscal_html', '.fn.html')
+    if bill_xml and fiscal_html:
+        return bill_xml, fiscal_html, 'recorded'
+
+    print("⚠️  No recorded fixtures found - synthesizing from published data")
+    print("   Run with --record N to capture real bill XML and fiscal HTML\n")
+
+    with open(LANGUAGE_FILE, 'r') as f:
+        analyses = json.load(f).get('analyses', {})
+    with open(FISCAL_FILE, 'r') as f:
+        notes = json.load(f).get('notes', {})
+
+    sentences = SentenceTable()
+    bill_xml = {
+        b['bill_number']: synthesize_bill_xml(b, analyses.get(b['bill_number'], {}), sentences)
+        for b in bills
+    }
+    fiscal_html = {
+        num: synthesize_fiscal_html(num, note) for num, note in notes.items()
+    }
+    return bill_xml, fiscal_html, 'synthesized'
+
+
+# ---------------------------------------------------------------------------
+# Stages
+# ---------------------------------------------------------------------------
+# Each stage factory returns (fn, items, bytes_in). fn() runs the whole stage
+# once; items and bytes_in are used for throughput.
+
+def stage_xml_extract(ctx):
+    docs = list(ctx['bill_xml'].values())
+
+    def run():
+        for xml in docs:
+            analyze_bill_language.extract_text_from_xml(xml)
+
+    return run, len(docs), sum(len(d) for d in docs)
+
+
+def stage_language_analysis(ctx):
+    texts = [
+        (num, analyze_bill_language.extract_text_from_xml(xml))
+        for num, xml in ctx['bill_xml'].items()
+    ]
+
+    def run():
+        for num, text in texts:
+            analyze_bill_language.analyze_text(num, text)
+
+    return run, len(texts), sum(len(t) for _, t in texts)
+
+
+def stage_language_parallel(ctx):
+    # Worker processes read XML by path, so stage the fixtures on disk
+    tmp = tempfile.mkdtemp(prefix='bench-xml-')
+    atexit.register(shutil.rmtree, tmp, True)
+    jobs = []
+    for num, xml in ctx['bill_xml'].items():
+        path = os.path.join(tmp, f'{num}.xml')
+        with open(path, 'w') as f:
+            f.write(xml)
+        jobs.append((num, path))
+
+    def run():
+        for _ in analyze_bill_language.analyze_parallel(jobs):
+            pass
+
+    return run, len(jobs), sum(len(x) for x in ctx['bill_xml'].values())
+
+
+def stage_fiscal_parse(ctx):
+    docs = list(ctx['fiscal_html'].values())
+
+    def run():
+        for html in docs:
+            scrape_fiscal_notes.parse_fiscal_note(html)
+
+    return run, len(docs), sum(len(d) for d in docs)
+
+
+def stage_compare_alignment(ctx):
+    bills = ctx['bills']
+    legislators = ctx['legislators']
+
+    def run():
+        contested = generate_compare_data.get_contested_bills(bills, min_nays=6)
+        org_positions = generate_compare_data.discover_org_positions(bills)
+        generate_compare_data.build_compare_legislators(
+            legislators, org_positions, contested
+        )
+
+    return run, len(legislators), 0
+
+
+def stage_bills_load(ctx):
+    raw = ctx['bills_raw']
+
+    def run():
+        json.loads(raw)
+
+    return run, len(ctx['bills']), len(raw)
+
+
+def stage_bills_serialize(ctx):
+    data = ctx['bills_data']
+
+    def run():
+        json.dumps(data, indent=2)
+
+    return run, len(ctx['bills']), len(ctx['bills_raw'])
+
+
+# Typed record layer (records.py); compare with bills_load / bills_serialize
+
+def stage_records_load(ctx):
+    raw = ctx['bills_raw']
+
+    def run():
+        records.decode_bills(json.loads(raw)['bills'])
+
+    return run, len(ctx['bills']), len(raw)
+
+
+def stage_records_serialize(ctx):
+    bills = records.decode_bills(ctx['bills'])
+    data = ctx['bills_data']
+
+    def run():
+        records.dump_bills(bills, data)
+
+    return run, len(bills), len(ctx['bills_raw'])
+
+
+def stage_records_compact_load(ctx):
+    compact = records.dumps_compact(records.decode_bills(ctx['bills']))
+
+    def run():
+        records.loads_compact(compact)
+
+    return run, len(ctx['bills']), len(compact)
+
+
+def stage_records_compact_serialize(ctx):
+    bills = records.decode_bills(ctx['bills'])
+
+    def run():
+        records.dumps_compact(bills)
+
+    return run, len(bills), 0
+
+
+def stage_bills_index_open(ctx):
+    # Warm the sidecar so only the open + lookup path is timed
+    artifact_index.open_index(BILLS_FILE, 'bills', 'bill_number').close()
+
+    def run():
+        with artifact_index.open_index(BILLS_FILE, 'bills', 'bill_number') as index:
+            'HB0085' in index
+            index.get('HB0085')
+
+    return run, 1, 0
+
+
+def stage_bills_index_scan(ctx):
+    artifact_index.open_index(BILLS_FILE, 'bills', 'bill_number').close()
+    fields = ('bill_number', 'status', 'house_votes_against', 'senate_votes_against')
+
+    def run():
+        with artifact_index.open_index(BILLS_FILE, 'bills', 'bill_number') as index:
+            for _ in index.iter_records(fields=fields):
+                pass
+
+    return run, len(ctx['bills']), len(ctx['bills_raw'])
+
+
+def stage_summary_prompts(ctx):
+    bills = ctx['bills']
+
+    def run():
+        for bill in generate_bill_summaries.get_controversial_bills(bills):
+            generate_bill_summaries.build_prompt(bill)
+
+    return run, len(bills), 0
+
+
+STAGES = {
+    'xml_extract': stage_xml_extract,
+    'language_analysis': stage_language_analysis,
+    'language_parallel': stage_language_parallel,
+    'fiscal_parse': stage_fiscal_parse,
+    'compare_alignment': stage_compare_alignment,
+    'bills_load': stage_bills_load,
+    'bills_serialize': stage_bills_serialize,
+    'records_load': stage_records_load,
+    'records_serialize': stage_records_serialize,
+    'records_compact_load': stage_records_compact_load,
+    'records_compact_serialize': stage_records_compact_serialize,
+    'bills_index_open': stage_bills_index_open,
+    'bills_index_scan': stage_bills_index_scan,
+    'summary_prompts': stage_summary_prompts,
+}
+
+
+def measure(stage_factory, ctx, repeat):
+    """Time a stage `repeat` times, then run once more under tracemalloc"""
+    run, items, bytes_in = stage_factory(ctx)
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+
+    # Separate pass so tracing overhead doesn't distort the timings
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = min(timings)
+    return {
+        'runs': repeat,
+        'min_s': round(best, 6),
+        'median_s': round(statistics.median(timings), 6),
+        'max_s': round(max(timings), 6),
+        'peak_mem_bytes': peak,
+        'items': items,
+        'items_per_s': round(items / best, 1) if best else None,
+        'bytes_in': bytes_in,
+        'mb_per_s': round(bytes_in / best / 1e6, 2) if best and bytes_in else None,
+    }
+
+
+# Cold-start cost of answering "is HB0085 in bills.json, and what's its status?"
+# in a fresh interpreter, so peak RSS reflects only that access pattern.
+STARTUP_PROBES = {
+    'json_load': (
+        "import json\n"
+        "bills = json.load(open('data/bills.json'))['bills']\n"
+        "[b for b in bills if b['bill_number'] == 'HB0085'][0]['status']\n"
+    ),
+    'index_open': (
+        "import sys; sys.path.insert(0, 'scripts')\n"
+        "from artifact_index import open_index\n"
+        "open_index('data/bills.json', 'bills', 'bill_number').get('HB0085')['status']\n"
+    ),
+}
+
+
+def measure_startup(repeat):
+    """Wall time and peak RSS of each startup probe in a fresh interpreter"""
+    artifact_index.open_index(BILLS_FILE, 'bills', 'bill_number').close()
+    # VmHWM is reset on exec; ru_maxrss can carry over this (large) parent's peak
+    wrapper = (
+        "import resource, time\n"
+        "t = time.perf_counter()\n"
+        "exec(compile({code!r}, 'probe', 'exec'))\n"
+        "elapsed = time.perf_counter() - t\n"
+        "try:\n"
+        "    hwm = [l for l in open('/proc/self/status') if l.startswith('VmHWM')][0]\n"
+        "    peak = int(hwm.split()[1])\n"
+        "except OSError:\n"
+        "    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+        "print(elapsed, peak)\n"
+    )
+    results = {}
+    for name, code in STARTUP_PROBES.items():
+        runs = []
+        for _ in range(repeat):
+            out = subprocess.check_output([sys.executable, '-c', wrapper.format(code=code)])
+            elapsed, maxrss = out.decode().split()
+            runs.append((float(elapsed), int(maxrss)))
+        results[name] = {
+            'min_s': round(min(r[0] for r in runs), 6),
+            'peak_rss_kb': min(r[1] for r in runs),
+        }
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Results
+# ---------------------------------------------------------------------------
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return 'unknown'
+
+
+def save_results(results):
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    path = os.path.join(RESULTS_DIR, f'{stamp}-{results["git_revision"]}.json')
+    for target in (path, os.path.join(RESULTS_DIR, 'latest.json')):
+        with open(target, 'w') as f:
+            json.dump(results, f, indent=2)
+    return path
+
+
+def compare_results(old, new):
+    """Print per-stage deltas against a previous results run"""
+    if old.get('fixture_source') != new.get('fixture_source'):
+        print(f"⚠️  Fixture source differs ({old.get('fixture_source')} vs "
+              f"{new.get('fixture_source')}) - timings are not comparable")
+
+    print(f"\n{'Stage':<20} {'Before':>10} {'After':>10} {'Change':>9}")
+    print(f"{'-'*20} {'-'*10} {'-'*10} {'-'*9}")
+    for name, stage in new['stages'].items():
+        before = old.get('stages', {}).get(name)
+        if not before:
+            print(f"{name:<20} {'-':>10} {stage['min_s']:>9.4f}s {'new':>9}")
+            continue
+        change = (stage['min_s'] - before['min_s']) / before['min_s'] * 100 if before['min_s'] else 0
+        flag = ' ⚠️' if change > 10 else ''
+        print(f"{name:<20} {before['min_s']:>9.4f}s {stage['min_s']:>9.4f}s {change:>+8.1f}%{flag}")
+
+
+def main(argv=None):
+    repeat = 3
+    only = None
+    compare_to = None
+
+    args = list(sys.argv[1:] if argv is None else argv)
+    while args:
+        arg = args.pop(0)
+        if arg == '--record':
+            record_fixtures(int(args.pop(0)) if args else 25)
+        elif arg == '--repeat':
+            repeat = int(args.pop(0))
+        elif arg == '--stage':
+            only = args.pop(0)
+        elif arg == '--compare':
+            compare_to = args.pop(0)
+
+    print("=" * 60)
+    print("PIPELINE BENCHMARK")
+    print("=" * 60)
+
+    # Read the baseline up front - it may be latest.json, which we overwrite
+    baseline = None
+    if compare_to:
+        with open(compare_to, 'r') as f:
+            baseline = json.load(f)
+
+    with open(BILLS_FILE, 'r') as f:
+        bills_raw = f.read()
+    bills_data = json.loads(bills_raw)
+    with open(LEGISLATORS_FILE, 'r') as f:
+        legislators_data = json.load(f)
+
+    bills = bills_data.get('bills', bills_data)
+    bill_xml, fiscal_html, source = load_fixtures(bills)
+
+    ctx = {
+        'bills_raw': bills_raw,
+        'bills_data': bills_data,
+        'bills': bills,
+        'legislators': legislators_data.get('legislators', legislators_data),
+        'bill_xml': bill_xml,
+        'fiscal_html': fiscal_html,
+    }
+
+    print(f"📁 Fixtures: {len(bill_xml)} bill XML, {len(fiscal_html)} fiscal HTML ({source})")
+    print(f"🔁 Repeats per stage: {repeat}\n")
+
+    stages = {}
+    for name, factory in STAGES.items():
+        if only and name != only:
+            continue
+        print(f"⏱️  {name}...")
+        stages[name] = measure(factory, ctx, repeat)
+        s = stages[name]
+        rate = f", {s['mb_per_s']} MB/s" if s['mb_per_s'] else ''
+        print(f"   {s['min_s']:.4f}s min / {s['median_s']:.4f}s median, "
+              f"{s['items_per_s']} items/s{rate}, peak {s['peak_mem_bytes'] / 1e6:.1f} MB")
+
+    startup = {}
+    imports = {}
+    if not only:
+        print("⏱️  startup probes (fresh interpreter)...")
+        startup = measure_startup(repeat)
+        for name, probe in startup.items():
+            print(f"   {name:<12} {probe['min_s']:.4f}s, peak RSS {probe['peak_rss_kb'] / 1024:.1f} MB")
+        print("⏱️  stage imports (-X importtime)...")
+        imports = cli.measure_imports(repeat)
+        for name, probe in sorted(imports.items(), key=lambda kv: -(kv[1]['import_ms'] or 0))[:5]:
+            print(f"   {name:<12} {probe['import_ms']}ms")
+
+    results = {
+        'generated_date': datetime.now().isoformat(),
+        'git_revision': git_revision(),
+        'python': sys.version.split()[0],
+        'cpu_count': os.cpu_count(),
+        'fixture_source': source,
+        'fixture_counts': {'bill_xml': len(bill_xml), 'fiscal_html': len(fiscal_html)},
+        'stages': stages,
+        'startup': startup,
+        'imports': imports,
+    }
+
+    path = save_results(results)
+    print(f"\n✅ Results saved to {path}")
+
+    if baseline:
+        compare_results(baseline, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Bill Timeline - Action-history event table and stage-duration analytics
+Usage:
+  python3 scripts/bill_timeline.py              # fetch missing status pages, write data/bill_timeline.json
+  python3 scripts/bill_timeline.py --offline    # only use cached pages
+
+bills.json keeps just `status` and `last_action_date`, and the vote files
+carry vote IDs without dates. This stage reads each bill's full action
+history from its le.utah.gov status page (cached under cache/bill_status/)
+into one columnar event table (bill, day, stage, chamber, location, vote),
+then aggregates it:
+
+  - first date each bill reached each stage
+    (introduced -> committee -> floor -> enrolled -> governor)
+  - stage-to-stage durations
+  - bottleneck committees (days from referral until the bill moved on,
+    and how many bills never got out)
+  - time-to-passage distribution
+  - the date of every roll call, keyed like the vote files (house + id)
+
+Group-bys sort the event columns once and walk runs of equal keys
+instead of scanning per bill. The output is small aggregates the site
+can chart; the full event table stays in cache/timeline/.
+"""
+
+import json
+import os
+import re
+import sys
+from datetime import date, datetime
+from html import unescape
+from itertools import groupby
+
+import pipeline_metrics
+from artifact_index import open_index
+
+BILLS_FILE = 'data/bills.json'
+OUTPUT_FILE = 'data/bill_timeline.json'
+CACHE_DIR = 'cache/bill_status'
+EVENTS_FILE = 'cache/timeline/events.json'
+
+STAGES = ['introduced', 'committee', 'floor', 'enrolled', 'governor']
+OTHER, DIED = 'other', 'died'
+
+# (stage, phrases) checked in order against the lowercased action text
+STAGE_RULES = [
+    ('governor', ('governor signed', 'governor vetoed', 'became law without', 'line item veto')),
+    ('enrolled', ('to governor', 'enrolled bill', 'enrolling')),
+    (DIED, ('/ filed', 'failed', 'not considered')),
+    ('floor', ('3rd reading', 'third reading', '2nd reading', 'second reading',
+               'concurs', 'circled', 'passed')),
+    ('committee', ('committee', 'comm -', 'favorable recommendation', 'to standing')),
+    ('introduced', ('numbered', 'received bill from legislative research', '1st reading',
+                    'introduced')),
+]
+
+HISTOGRAM_DAYS = 7
+
+_ROW_RE = re.compile(r'<tr[^>]*>(.*?)</tr>', re.S | re.I)
+_CELL_RE = re.compile(r'<t[dh][^>]*>(.*?)</t[dh]>', re.S | re.I)
+_DATE_RE = re.compile(r'^\s*(\d{1,2})/(\d{1,2})/(\d{4})\s*$')
+_VOTE_RE = re.compile(r'voteid=(\d+)(?:[^"\'>]*?house=([HS]))?', re.I)
+
+
+def status_cache_path(bill_number, session="2025"):
+    """Where a fetched bill status page is cached on disk"""
+    return os.path.join(CACHE_DIR, session, f'{bill_number}.html')
+
+
+def fetch_status_html(bill_number, url=None, session="2025", offline=False, refresh=False):
+    """Fetch a bill's static status page (cached on disk)
+
+    refresh re-fetches a cached page (falling back to the cached copy if
+    the fetch fails), for bills that may still gain actions.
+    """
+    run = pipeline_metrics.current()
+    cache_path = status_cache_path(bill_number, session)
+    if os.path.exists(cache_path) and (offline or not refresh):
+        run.cache_hit('bill_status')
+        with open(cache_path, 'r') as f:
+            return f.read()
+    run.cache_miss('bill_status')
+    if offline:
+        return None
+
+    url = url or f"https://le.utah.gov/~{session}/bills/static/{bill_number}.html"
+    r = run.http_get(url, timeout=15, bill=bill_number)
+    if r is not None and r.status_code == 200:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path, 'w') as f:
+            f.write(r.text)
+        return r.text
+    run.error('not_found' if r is not None else 'fetch_failed', bill_number)
+    if os.path.exists(cache_path):
+        with open(cache_path, 'r') as f:
+            return f.read()
+    return None
+
+
+def _clean(cell):
+    return re.sub(r'\s+', ' ', unescape(re.sub(r'<[^>]+>', ' ', cell))).strip()
+
+
+def parse_actions(html):
+    """[(date, action, location, (house, vote_id) | None)] from the status table
+
+    Any table row whose first cell is an M/D/YYYY date counts as an action;
+    the vote, if any, comes from a voteid= link in the row.
+    """
+    actions = []
+    for row in _ROW_RE.findall(html or ''):
+        cells = _CELL_RE.findall(row)
+        if len(cells) < 2:
+            continue
+        m = _DATE_RE.match(_clean(cells[0]))
+        if not m:
+            continue
+        month, day, year = map(int, m.groups())
+        action = _clean(cells[1])
+        location = _clean(cells[2]) if len(cells) > 2 else ''
+        vote = _VOTE_RE.search(row)
+        if vote:
+            house = vote.group(2) or ('H' if action.lower().startswith('house') else 'S')
+            vote = (house.upper(), vote.group(1))
+        actions.append((date(year, month, day), action, location, vote))
+    return actions
+
+
+def classify(action):
+    text = action.lower()
+    for stage, phrases in STAGE_RULES:
+        if any(p in text for p in phrases):
+            return stage
+    return OTHER
+
+
+def chamber_of(action, location):
+    for text in (action, location):
+        if text.startswith('House') or 'House' in text.split(' ')[:2]:
+            return 'H'
+        if text.startswith('Senate') or 'Senate' in text.split(' ')[:2]:
+            return 'S'
+    return ''
+
+
+class EventTable:
+    """Columnar action history: parallel lists, one entry per event"""
+
+    def __init__(self):
+        self.bill, self.day, self.stage, self.chamber = [], [], [], []
+        self.location, self.action, self.vote = [], [], []
+
+    def add(self, bill, when, action, location, vote):
+        self.bill.append(bill)
+        self.day.append(when.toordinal())
+        self.stage.append(classify(action))
+        self.chamber.append(chamber_of(action, location))
+        self.location.append(location)
+        self.action.append(action)
+        self.vote.append(f'{vote[0]}{vote[1]}' if vote else None)
+
+    def __len__(self):
+        return len(self.bill)
+
+    def order_by(self, *columns):
+        """Row indices sorted by the given columns"""
+        cols = [getattr(self, c) for c in columns]
+        return sorted(range(len(self)), key=lambda i: tuple(c[i] for c in cols))
+
+    def group_by(self, *columns):
+        """Yield (key, [row indices]) runs in key order"""
+        cols = [getattr(self, c) for c in columns]
+        key = (lambda i: cols[0][i]) if len(cols) == 1 else (lambda i: tuple(c[i] for c in cols))
+        for k, rows in groupby(self.order_by(*columns + ('day',)), key=key):
+            yield k, list(rows)
+
+    def to_json(self):
+        # Repeated strings go through a lookup table to keep the file small
+        strings = sorted(set(self.location) | set(self.action))
+        sid = {s: i for i, s in enumerate(strings)}
+        return {
+            'strings': strings,
+            'bill': self.bill,
+            'day': self.day,
+            'stage': self.stage,
+            'chamber': self.chamber,
+            'location': [sid[s] for s in self.location],
+            'action': [sid[s] for s in self.action],
+            'vote': self.vote,
+        }
+
+
+def distribution(values):
+    values = sorted(values)
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'median': pipeline_metrics.percentile(values, 50),
+        'p90': pipeline_metrics.percentile(values, 90),
+        'mean': round(sum(values) / len(values), 1),
+        'max': values[-1],
+    }
+
+
+def stage_days(events):
+    """{bill: {stage: first ordinal day}}"""
+    first = {}
+    for (bill, stage), rows in events.group_by('bill', 'stage'):
+        if stage in STAGES:
+            first.setdefault(bill, {})[stage] = events.day[rows[0]]
+    return first
+
+
+def stage_durations(first):
+    """Days between consecutive stages, over bills that reached both"""
+    result = {}
+    for a, b in zip(STAGES, STAGES[1:]):
+        gaps = [s[b] - s[a] for s in first.values() if a in s and b in s and s[b] >= s[a]]
+        result[f'{a}->{b}'] = distribution(gaps)
+    return result
+
+
+def committee_bottlenecks(events, limit=15):
+    """Per committee: days from arrival until the bill moved on, and stuck bills
+
+    A bill leaves a committee at its first later action at a different
+    location (reported out, sent to the floor, returned to Rules...);
+    being filed at sine die while still there counts as stuck.
+    """
+    per_committee = {}
+    for bill, rows in events.group_by('bill'):
+        arrived = {}
+        current = None
+        for i in rows:
+            location = events.location[i]
+            if location == current:
+                continue
+            if current in arrived:
+                if events.stage[i] == DIED:
+                    continue        # died in committee; counted as stuck below
+                per_committee[current]['days'].append(events.day[i] - arrived.pop(current))
+            current = location
+            if 'committee' in location.lower() and location not in arrived:
+                arrived[location] = events.day[i]
+                per_committee.setdefault(location, {'bills': 0, 'stuck': 0, 'days': []})
+                per_committee[location]['bills'] += 1
+        for location in arrived:
+            per_committee[location]['stuck'] += 1
+
+    table = []
+    for committee, s in per_committee.items():
+        d = distribution(s['days'])
+        table.append({
+            'committee': committee,
+            'bills': s['bills'],
+            'reported': d['count'],
+            'stuck': s['stuck'],
+            'medianDays': d.get('median'),
+            'p90Days': d.get('p90'),
+        })
+    table.sort(key=lambda c: (c['medianDays'] or 0, c['stuck']), reverse=True)
+    return table[:limit]
+
+
+def time_to_passage(first, epoch):
+    """Introduced -> enrolled (passed both chambers), plus a weekly histogram"""
+    days = [s['enrolled'] - s['introduced'] for s in first.values()
+            if 'introduced' in s and 'enrolled' in s and s['enrolled'] >= s['introduced']]
+    histogram = {}
+    for d in days:
+        bucket = d // HISTOGRAM_DAYS * HISTOGRAM_DAYS
+        histogram[bucket] = histogram.get(bucket, 0) + 1
+
+    passed_by_day = {}
+    for s in first.values():
+        if 'enrolled' in s:
+            passed_by_day[s['enrolled']] = passed_by_day.get(s['enrolled'], 0) + 1
+    cumulative, total = [], 0
+    for day in sorted(passed_by_day):
+        total += passed_by_day[day]
+        cumulative.append([day - epoch, total])
+
+    return {
+        **distribution(days),
+        'histogram': [{'days': b, 'bills': n} for b, n in sorted(histogram.items())],
+        'cumulativePassed': cumulative,
+    }
+
+
+def build_events(bills, offline=False):
+    run = pipeline_metrics.current()
+    events = EventTable()
+    for i, bill in enumerate(bills):
+        number = bill['bill_number']
+        was_cached = os.path.exists(status_cache_path(number))
+        with run.span('fetch', number):
+            html = fetch_status_html(number, bill.get('url'), offline=offline)
+        if not html:
+            continue
+        with run.span('parse', number):
+            actions = parse_actions(html)
+        if not actions:
+            run.error('no_actions', number)
+        for when, action, location, vote in actions:
+            events.add(number, when, action, location, vote)
+        run.count('bills_with_history', 1 if actions else 0)
+        if not was_cached and not offline:
+            run.sleep(0.3, number)
+        if (i + 1) % 100 == 0:
+            print(f"  [{i+1}/{len(bills)}] {len(events)} events")
+    return events
+
+
+def build_timeline(events):
+    """The data/bill_timeline.json payload"""
+    epoch = min(events.day)
+    first = stage_days(events)
+    vote_days = {}
+    for i in range(len(events)):
+        if events.vote[i]:
+            vote_days.setdefault(events.vote[i], events.day[i] - epoch)
+
+    return {
+        'generated_date': datetime.now().isoformat(),
+        # Day numbers below are offsets from this date
+        'epoch': date.fromordinal(epoch).isoformat(),
+        'stages': STAGES,
+        'totalEvents': len(events),
+        'stageReached': {s: sum(1 for f in first.values() if s in f) for s in STAGES},
+        'stageDurations': stage_durations(first),
+        'bottleneckCommittees': committee_bottlenecks(events),
+        'timeToPassage': time_to_passage(first, epoch),
+        # {bill: [day reached per stage, null if never]}
+        'bills': {
+            bill: [s[stage] - epoch if stage in s else None for stage in STAGES]
+            for bill, s in sorted(first.items())
+        },
+        # {house + vote_id (as in data/votes/*.json): day}
+        'voteDays': vote_days,
+    }
+
+
+def main():
+    offline = '--offline' in sys.argv
+
+    print("=" * 60)
+    print("BILL TIMELINE")
+    print("=" * 60)
+    run = pipeline_metrics.start_run('bill_timeline')
+
+    with run.span('load'):
+        bills = list(open_index(BILLS_FILE, 'bills', key_field='bill_number').iter_records(
+            fields=('bill_number', 'url')
+        ))
+
+    events = build_events(bills, offline=offline)
+    if not len(events):
+        print(f"\n⚠️  No action history found ({'no cached pages' if offline else 'fetches failed'})")
+        run.finish()
+        return
+
+    with run.span('analyze'):
+        timeline = build_timeline(events)
+
+    with run.span('serialize'):
+        os.makedirs(os.path.dirname(EVENTS_FILE), exist_ok=True)
+        with open(EVENTS_FILE, 'w') as f:
+            json.dump(events.to_json(), f, separators=(',', ':'))
+        with open(OUTPUT_FILE, 'w') as f:
+            json.dump(timeline, f, separators=(',', ':'))
+
+    print(f"\n  {len(events)} events across {len(timeline['bills'])} bills")
+    for transition, d in timeline['stageDurations'].items():
+        if d['count']:
+            print(f"  {transition:<24} median {d['median']:>3}d  p90 {d['p90']:>3}d  (n={d['count']})")
+    print(f"\n✅ Saved {OUTPUT_FILE}")
+    run.finish()
+
+
+if __name__ == '__main__':
+    main()
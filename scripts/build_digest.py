@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+Build Digest - Render per-subscriber email digests from the change feed
+Usage:
+  python3 scripts/build_digest.py subscribers.csv                   # .eml files in outbox/
+  python3 scripts/build_digest.py subscribers.csv --smtp localhost:1025
+  python3 scripts/build_digest.py subscribers.csv --frequency daily --changes data/changes.json
+  python3 scripts/build_digest.py --synthetic 20000 --smtp local    # benchmark against the built-in SMTP sink
+
+subscribers.csv is the signup Google Sheet exported as CSV (columns as in
+js/signup.js: Name, Email, ZIP, Followed_Orgs, Top_Issues,
+Email_Frequency, User_ID...), optionally with a Watched_Bills column.
+A .json list of the same records also works.
+
+Each subscriber's digest depends only on which changed bills are relevant
+to them (watched, followed org has a position, or a topic matches their
+issues) and on their ZIP's legislators. Subscribers are grouped by that
+interest signature and each distinct digest is rendered once, as a MIME
+message with name/address placeholders; per-subscriber output is a byte
+substitution on the cached message. Per-bill blocks are cached too, so
+even a digest with a unique signature is mostly string joins.
+"""
+
+import argparse
+import csv
+import functools
+import hashlib
+import html
+import json
+import os
+import random
+import smtplib
+import socketserver
+import threading
+import time
+from datetime import datetime
+from email.header import Header
+from email.utils import formataddr, formatdate
+
+import pipeline_metrics
+from artifact_index import open_index, optional_index
+
+CHANGES_FILE = 'data/changes.json'
+BILLS_FILE = 'data/bills.json'
+LEGISLATORS_FILE = 'data/legislators.json'
+ZIP_FILE = 'data/zip-to-legislators.json'
+TOPICS_FILE = 'data/bill_topics.json'
+OUTBOX_DIR = 'outbox'
+
+SITE_URL = 'https://ez-le-ut.com'
+FROM_ADDRESS = formataddr(('Utah Bill Tracker', 'digest@ez-le-ut.com'))
+
+RUN_DATE = formatdate(localtime=True)
+
+FREQUENCIES = {'weekly': 'Weekly Digest', 'daily': 'Daily Updates'}
+
+# signup.js ISSUES -> bills.json topics / bill_topics.json taxonomy
+ISSUE_TOPICS = {
+    'Education': {'Education'},
+    'Healthcare': {'Healthcare'},
+    'Environment': {'Environment', 'Climate'},
+    'Taxes': {'Tax & Budget', 'Taxes'},
+    'Housing': {'Housing'},
+    'Public Safety': {'Criminal Justice'},
+    'Transportation': {'Transportation'},
+    'Civil Rights': {'Civil Rights', 'LGBTQ'},
+    'Gun Rights': {'Guns'},
+    'Immigration': {'Immigration'},
+    'Labor/Workers': {'Labor'},
+    'Business/Economy': {'Business'},
+    'Water': {'Environment', 'Climate'},
+    'Public Lands': {'Environment', 'Climate'},
+    'Elections': {'Government'},
+}
+
+# Filled in per subscriber after the group's message is rendered
+NAME_SLOT = '\x00NAME\x00'
+TO_SLOT = '\x00TO\x00'
+
+
+def split_list(value):
+    if isinstance(value, list):
+        return [v.strip() for v in value if v.strip()]
+    return [v.strip() for v in (value or '').split(',') if v.strip()]
+
+
+def load_subscribers(path):
+    """Records from the signup sheet export (.csv) or a .json list"""
+    if path.endswith('.json'):
+        with open(path, 'r') as f:
+            return json.load(f)
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+class DigestContext:
+    """Everything needed to decide relevance and render: changes + lookups"""
+
+    def __init__(self, changes):
+        self.changes = changes['bills']
+        self.since = changes.get('since')
+
+        bills = open_index(BILLS_FILE, 'bills', key_field='bill_number')
+        changed = list(self.changes)
+        self.bills = {b['bill_number']: b for b in bills.iter_records(keys=changed)}
+        with open(BILLS_FILE, 'r') as f:
+            self.org_names = {o['field_name']: o['name']
+                              for o in json.load(f).get('organizations', [])}
+
+        tags = optional_index(TOPICS_FILE, 'bills')
+        self.topics = {}
+        for bill in changed:
+            topics = set(self.bills.get(bill, {}).get('topics') or [])
+            topics.update(t['topic'] for t in (tags.get(bill) or []))
+            self.topics[bill] = topics
+
+        with open(LEGISLATORS_FILE, 'r') as f:
+            data = json.load(f)
+        self.legislators = data.get('legislators', data)
+        with open(ZIP_FILE, 'r') as f:
+            self.zips = json.load(f).get('zip_mappings', {})
+
+        # Inverted lookups over the changed bills only
+        self.by_org = {}
+        self.by_topic = {}
+        for bill in changed:
+            record = self.bills.get(bill, {})
+            for key, value in record.items():
+                if key.endswith('_position') and value:
+                    self.by_org.setdefault(key[:-len('_position')], set()).add(bill)
+            for topic in self.topics[bill]:
+                self.by_topic.setdefault(topic, set()).add(bill)
+
+    def signature(self, subscriber):
+        """(relevant changed bills, reps) - everything the digest body depends on"""
+        relevant = {b for b in split_list(subscriber.get('Watched_Bills')) if b in self.changes}
+        for org in split_list(subscriber.get('Followed_Orgs')):
+            relevant |= self.by_org.get(org, set())
+        for issue in split_list(subscriber.get('Top_Issues')):
+            for topic in ISSUE_TOPICS.get(issue, {issue}):
+                relevant |= self.by_topic.get(topic, set())
+        reps = tuple(sorted(self.zips.get((subscriber.get('ZIP') or '').strip()[:5], [])))
+        return tuple(sorted(relevant)), reps
+
+    # -- Rendering ------------------------------------------------------------
+
+    def describe(self, section, before, after):
+        """Human-readable lines for one changed section"""
+        lines = []
+        if section == 'positions':
+            for org in sorted(set(before) | set(after)):
+                name = self.org_names.get(org, org)
+                old, new = before.get(org), after.get(org)
+                lines.append(f"{name}: {old} → {new}" if old else f"{name} now: {new}")
+        elif section == 'summary':
+            lines.append('Plain-language summary updated')
+        else:
+            for field in sorted(set(before) | set(after)):
+                label = field.replace('_', ' ').capitalize()
+                old, new = before.get(field), after.get(field)
+                lines.append(f"{label}: {old} → {new}" if old not in (None, '', {}) else f"{label}: {new}")
+        return lines
+
+    @functools.lru_cache(maxsize=None)
+    def rep_record(self, rep):
+        leg = self.legislators.get(rep, {})
+        return set(leg.get('yea_votes', [])), set(leg.get('nay_votes', []))
+
+    def rep_votes(self, rep, bills):
+        yea, nay = self.rep_record(rep)
+        return [(b, 'Yea' if b in yea else 'Nay') for b in bills if b in yea or b in nay]
+
+    @functools.lru_cache(maxsize=None)
+    def bill_fragment(self, bill):
+        """(text, html) block for one changed bill, shared by every digest"""
+        title = self.changes[bill].get('title', '').strip()
+        url = f"{SITE_URL}/bill.html?bill={bill}"
+        text = [f"{bill} - {title}"]
+        body = [f'<h3><a href="{url}">{bill}</a> {html.escape(title)}</h3>', '<ul>']
+        for section, diff in self.changes[bill]['changes'].items():
+            for line in self.describe(section, diff['before'], diff['after']):
+                text.append(f"  • {line}")
+                body.append(f"<li>{html.escape(line)}</li>")
+        text += [f"  {url}", '']
+        body.append('</ul>')
+        return '\n'.join(text), '\n'.join(body)
+
+    def render(self, signature, frequency):
+        """One MIME message (bytes) with name/recipient placeholders"""
+        bills, reps = signature
+        period = 'this week' if frequency == 'weekly' else 'today'
+
+        text = [f"Hi {NAME_SLOT},", '', f"Here's what changed on bills you follow {period}:", '']
+        body = [f"<p>Hi {NAME_SLOT},</p>",
+                f"<p>Here's what changed on bills you follow {period}:</p>"]
+        for bill in bills:
+            t, h = self.bill_fragment(bill)
+            text.append(t)
+            body.append(h)
+
+        if reps:
+            text.append('Your legislators:')
+            body += ['<h3>Your legislators</h3>', '<ul>']
+            for rep in reps:
+                votes = self.rep_votes(rep, bills)
+                record = ', '.join(f"{b} {v}" for b, v in votes) or 'no recorded votes on these bills'
+                text.append(f"  {rep}: {record}")
+                body.append(f"<li>{html.escape(rep)}: {html.escape(record)}</li>")
+            body.append('</ul>')
+            text.append('')
+
+        text.append(f"Manage your alerts: {SITE_URL}/signup.html")
+        body.append(f'<p><a href="{SITE_URL}/signup.html">Manage your alerts</a></p>')
+
+        subject = f"Utah Bill Tracker: {len(bills)} bill{'s' if len(bills) != 1 else ''} changed {period}"
+        return mime_message(subject, '\n'.join(text), '\n'.join(body))
+
+
+@functools.lru_cache(maxsize=None)
+def encode_subject(subject):
+    return subject if subject.isascii() else Header(subject, 'utf-8').encode()
+
+
+def mime_message(subject, text, body):
+    """multipart/alternative bytes, assembled directly
+
+    EmailMessage costs milliseconds per message; the structure here is
+    fixed, so it is built by hand (8bit UTF-8 parts, CRLF line endings).
+    """
+    boundary = '==digest-' + hashlib.sha1(text.encode('utf-8')).hexdigest()[:20]
+    lines = [
+        f'From: {FROM_ADDRESS}',
+        f'To: {TO_SLOT}',
+        f'Subject: {encode_subject(subject)}',
+        f'Date: {RUN_DATE}',
+        'MIME-Version: 1.0',
+        f'Content-Type: multipart/alternative; boundary="{boundary}"',
+        '',
+    ]
+    for subtype, content in (('plain', text), ('html', body)):
+        lines += [
+            f'--{boundary}',
+            f'Content-Type: text/{subtype}; charset="utf-8"',
+            'Content-Transfer-Encoding: 8bit',
+            '',
+            content,
+        ]
+    lines += [f'--{boundary}--', '']
+    return '\n'.join(lines).replace('\n', '\r\n').encode('utf-8')
+
+
+def personalize(template, subscriber):
+    """Fill the placeholders in a rendered group message"""
+    name = ' '.join((subscriber.get('Name') or '').split()) or 'there'
+    to = formataddr((name, subscriber['Email'].strip()))
+    first = name.split(' ')[0]
+    return (template
+            .replace(TO_SLOT.encode(), to.encode('utf-8'))
+            .replace(NAME_SLOT.encode(), html.escape(first).encode('utf-8')))
+
+
+def build_digests(context, subscribers, frequency='weekly'):
+    """Yield (subscriber, message bytes); render-cache stats go to the run"""
+    run = pipeline_metrics.current()
+    wanted = FREQUENCIES[frequency]
+    rendered = {}
+    for subscriber in subscribers:
+        if (subscriber.get('Email_Frequency') or 'Weekly Digest') != wanted or not subscriber.get('Email'):
+            run.count('skipped_frequency')
+            continue
+        with run.span('analyze'):
+            signature = context.signature(subscriber)
+        if not signature[0]:
+            run.count('skipped_no_changes')
+            continue
+        template = rendered.get(signature)
+        if template is None:
+            run.cache_miss('render')
+            with run.span('render'):
+                template = rendered[signature] = context.render(signature, frequency)
+        else:
+            run.cache_hit('render')
+        yield subscriber, personalize(template, subscriber)
+    run.count('distinct_digests', len(rendered))
+
+
+# -- Output ---------------------------------------------------------------------
+
+def write_eml(messages, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    count = 0
+    for subscriber, message in messages:
+        key = subscriber.get('User_ID') or subscriber['Email'].replace('@', '_at_')
+        with open(os.path.join(out_dir, f'{key}.eml'), 'wb') as f:
+            f.write(message)
+        count += 1
+    return count
+
+
+def send_smtp(messages, host, port, batch=500):
+    """Send over one connection, reconnecting every `batch` messages"""
+    count = 0
+    server = None
+    for subscriber, message in messages:
+        if server is None:
+            server = smtplib.SMTP(host, port)
+        server.sendmail(FROM_ADDRESS, [subscriber['Email'].strip()], message)
+        count += 1
+        if count % batch == 0:
+            server.quit()
+            server = None
+    if server is not None:
+        server.quit()
+    return count
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    """Minimal local SMTP stand-in: accepts and counts messages, stores nothing"""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address=('127.0.0.1', 0)):
+        super().__init__(address, _SinkHandler)
+        self.received = 0
+        self.bytes = 0
+        self.lock = threading.Lock()
+
+
+class _SinkHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        self.reply('220 localhost sink')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            verb = line[:4].upper()
+            if verb in (b'HELO', b'EHLO'):
+                self.reply('250 localhost')
+            elif verb == b'DATA':
+                self.reply('354 end with .')
+                size = 0
+                for data in iter(self.rfile.readline, b''):
+                    if data == b'.\r\n':
+                        break
+                    size += len(data)
+                with self.server.lock:
+                    self.server.received += 1
+                    self.server.bytes += size
+                self.reply('250 queued')
+            elif verb == b'QUIT':
+                self.reply('221 bye')
+                return
+            else:
+                self.reply('250 ok')
+
+
+def synthetic_subscribers(n, context, seed=0):
+    """Realistic-looking subscribers for benchmarking"""
+    rng = random.Random(seed)
+    zips = list(context.zips)
+    orgs = list(context.org_names)
+    issues = list(ISSUE_TOPICS)
+    changed = list(context.changes)
+    subscribers = []
+    for i in range(n):
+        subscribers.append({
+            'Name': f'Subscriber {i}',
+            'Email': f'sub{i}@example.com',
+            'ZIP': rng.choice(zips) if zips else '',
+            'Followed_Orgs': ', '.join(rng.sample(orgs, min(len(orgs), rng.randint(1, 3)))),
+            'Top_Issues': ', '.join(rng.sample(issues, rng.randint(0, 3))),
+            'Watched_Bills': ', '.join(rng.sample(changed, min(len(changed), rng.randint(0, 2)))),
+            'Email_Frequency': 'Weekly Digest',
+            'User_ID': f'user_{i}',
+        })
+    return subscribers
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render email digests from data/changes.json')
+    parser.add_argument('subscribers', nargs='?', help='signup export (.csv or .json)')
+    parser.add_argument('--changes', default=CHANGES_FILE)
+    parser.add_argument('--frequency', choices=sorted(FREQUENCIES), default='weekly')
+    parser.add_argument('--out', default=None, help='directory for .eml files')
+    parser.add_argument('--smtp', help="host:port, or 'local' for the built-in sink")
+    parser.add_argument('--synthetic', type=int, help='generate N subscribers instead of reading a file')
+    args = parser.parse_args()
+
+    if not args.subscribers and not args.synthetic:
+        parser.error('a subscriber export or --synthetic N is required')
+
+    print("=" * 60)
+    print("EMAIL DIGEST")
+    print("=" * 60)
+    run = pipeline_metrics.start_run('build_digest')
+
+    with run.span('load'):
+        with open(args.changes, 'r') as f:
+            changes = json.load(f)
+        context = DigestContext(changes)
+        if args.synthetic:
+            subscribers = synthetic_subscribers(args.synthetic, context)
+        else:
+            subscribers = load_subscribers(args.subscribers)
+
+    if not context.changes:
+        print(f"  No changed bills in {args.changes} - nothing to send")
+        run.finish()
+        return
+
+    messages = build_digests(context, subscribers, args.frequency)
+    started = time.perf_counter()
+    sink = None
+    with run.span('serialize'):
+        if args.smtp:
+            if args.smtp == 'local':
+                sink = SMTPSink()
+                threading.Thread(target=sink.serve_forever, daemon=True).start()
+                host, port = sink.server_address
+            else:
+                host, _, port = args.smtp.partition(':')
+                port = int(port or 25)
+            sent = send_smtp(messages, host, port)
+            where = f"SMTP {host}:{port}"
+        else:
+            out_dir = args.out or os.path.join(OUTBOX_DIR, datetime.now().strftime('%Y-%m-%d'))
+            sent = write_eml(messages, out_dir)
+            where = out_dir
+    elapsed = time.perf_counter() - started
+
+    run.count('messages', sent)
+    cache = run.cache['render']
+    print(f"  {len(subscribers)} subscribers -> {sent} digests "
+          f"({run.counters['distinct_digests']} distinct) in {elapsed:.2f}s")
+    print(f"  Render cache: {cache['hit']} hits / {cache['miss']} renders "
+          f"({cache['hit'] / max(1, cache['hit'] + cache['miss']):.0%} reuse)")
+    if sink:
+        print(f"  Sink received {sink.received} messages, {sink.bytes / 1e6:.1f} MB")
+        sink.shutdown()
+    print(f"\n✅ Delivered to {where}")
+    run.finish()
+
+
+if __name__ == '__main__':
+    main()
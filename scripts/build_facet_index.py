@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Build facet_index.json - precomputed filter bitsets and counts for the bills listing
+Usage:
+  python3 scripts/build_facet_index.py            # write data/facet_index.json
+  python3 scripts/build_facet_index.py --check    # verify against the filters.js semantics
+
+--check runs the bitsets, the reference scan and (with node installed) both
+filters.js paths, facetFilter() and the scanFilters() fallback, over the
+hand-checked bills in scripts/fixtures/facet_bills.json, then compares the
+bitsets with the reference scan on a few hundred combinations of the real data.
+
+filters.js applyAllFilters() rescans every bill and every `*_position` key
+on each click. This stage emits one bitset per facet value over bill
+ordinals (bills.json order) plus counts:
+
+  org      {org_id: bills where the org has any position}
+  status   {exact status string: bills}        (checkbox terms are substring
+                                                  matches, OR'd over these)
+  topic    {topic: bills}
+  view     {controversial, agreement}
+
+Bitsets are base64 of little-endian bytes padded to 4-byte words, so the
+browser can decode them straight into a Uint32Array. Any filter
+combination is then an OR within a facet and an AND across facets.
+"""
+
+import base64
+import json
+import random
+import shutil
+import subprocess
+import sys
+from datetime import datetime
+
+import pipeline_metrics
+from artifact_index import open_index
+
+BILLS_FILE = 'data/bills.json'
+OUTPUT_FILE = 'data/facet_index.json'
+FILTERS_JS = 'js/filters.js'
+FIXTURE = 'scripts/fixtures/facet_bills.json'   # bills plus filter cases with expected bill numbers
+
+FACETS = ('org', 'status', 'topic', 'view')
+
+# Checkbox values in index.html's status panel
+STATUS_TERMS = ['Governor Signed', 'Passed', 'Failed', 'Committee', 'Reading', 'Filed']
+
+# Stances the "agreement" view ignores
+PASSIVE_POSITIONS = ('Watching', 'Studying')
+
+
+def position_values(bill):
+    """Port of filters.js getPositionValues(): every set *_position value"""
+    return [v for k, v in bill.items() if k.endswith('_position') and v and v != 'N/A']
+
+
+def is_controversial(bill):
+    positions = position_values(bill)
+    return 'Support' in positions and 'Oppose' in positions
+
+
+def is_agreement(bill):
+    active = [p for p in position_values(bill) if p not in PASSIVE_POSITIONS]
+    return len(active) >= 2 and len(set(active)) == 1
+
+
+def encode_bits(bits, n):
+    """Little-endian bytes padded to whole 32-bit words, base64"""
+    return base64.b64encode(bits.to_bytes(-(-n // 32) * 4, 'little')).decode('ascii')
+
+
+def decode_bits(data):
+    return int.from_bytes(base64.b64decode(data), 'little')
+
+
+class FacetIndex:
+    """Per-facet-value bitsets over bill ordinals"""
+
+    def __init__(self, bills, facets):
+        self.bills = bills           # bill numbers, ordinal order
+        self.facets = facets         # {facet: {value: bits}}
+        self.all_bits = (1 << len(bills)) - 1
+
+    @classmethod
+    def from_bills(cls, bills):
+        facets = {name: {} for name in FACETS}
+
+        def add(facet, value, j):
+            facets[facet][value] = facets[facet].get(value, 0) | 1 << j
+
+        numbers = []
+        for j, bill in enumerate(bills):
+            numbers.append(bill['bill_number'])
+            for key, value in bill.items():
+                if key.endswith('_position') and key != 'author_position' and value and value != 'N/A':
+                    add('org', key[:-len('_position')], j)
+            add('status', bill.get('status') or '', j)
+            for topic in bill.get('topics') or []:
+                add('topic', topic, j)
+            if is_controversial(bill):
+                add('view', 'controversial', j)
+            if is_agreement(bill):
+                add('view', 'agreement', j)
+        facets['view'].setdefault('controversial', 0)
+        facets['view'].setdefault('agreement', 0)
+        return cls(numbers, facets)
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data['bills'], {
+            facet: {value: decode_bits(b) for value, b in values.items()}
+            for facet, values in data['bitsets'].items()
+        })
+
+    def to_json(self):
+        n = len(self.bills)
+        return {
+            'generated_date': datetime.now().isoformat(),
+            'bills': self.bills,
+            'statusTerms': STATUS_TERMS,
+            'counts': {
+                facet: {value: bits.bit_count() for value, bits in sorted(values.items())}
+                for facet, values in self.facets.items()
+            },
+            'statusTermCounts': {t: self.status_bits(t).bit_count() for t in STATUS_TERMS},
+            'bitsets': {
+                facet: {value: encode_bits(bits, n) for value, bits in sorted(values.items())}
+                for facet, values in self.facets.items()
+            },
+        }
+
+    def status_bits(self, term):
+        """Statuses containing `term` (filters.js uses a case-sensitive includes())"""
+        bits = 0
+        for status, b in self.facets['status'].items():
+            if term in status:
+                bits |= b
+        return bits
+
+    def any_of(self, facet, values):
+        bits = 0
+        for value in values:
+            bits |= self.status_bits(value) if facet == 'status' else self.facets[facet].get(value, 0)
+        return bits
+
+    def query(self, orgs=(), statuses=(), topics=(), view='all'):
+        """Bitset of bills passing the facet filters (search/my-votes stay client-side)"""
+        bits = self.all_bits
+        if view in ('controversial', 'agreement'):
+            bits &= self.facets['view'][view]
+        for facet, values in (('org', orgs), ('status', statuses), ('topic', topics)):
+            if values:
+                bits &= self.any_of(facet, values)
+        return bits
+
+    def bill_numbers(self, bits):
+        return [b for j, b in enumerate(self.bills) if bits >> j & 1]
+
+    def counts_within(self, bits):
+        """{facet: {value: count}} restricted to `bits` (live facet counts)"""
+        return {
+            facet: {value: (b & bits).bit_count() for value, b in values.items()}
+            for facet, values in self.facets.items()
+        }
+
+
+# -- Self-check -----------------------------------------------------------------
+
+def reference_filter(bills, orgs=(), statuses=(), topics=(), view='all'):
+    """Straight port of filters.js applyAllFilters() steps 2-5"""
+    filtered = list(bills)
+    if view == 'controversial':
+        filtered = [b for b in filtered if is_controversial(b)]
+    elif view == 'agreement':
+        filtered = [b for b in filtered if is_agreement(b)]
+    if orgs:
+        filtered = [b for b in filtered if any(
+            b.get(f'{o}_position') and b.get(f'{o}_position') != 'N/A' for o in orgs)]
+    if statuses:
+        filtered = [b for b in filtered if any(s in (b.get('status') or '') for s in statuses)]
+    if topics:
+        filtered = [b for b in filtered if any(t in (b.get('topics') or []) for t in topics)]
+    return [b['bill_number'] for b in filtered]
+
+
+def check(bills, index, trials=500, seed=0):
+    """Compare FacetIndex.query() with reference_filter(); returns mismatches"""
+    orgs = sorted(index.facets['org'])
+    topics = sorted(index.facets['topic'])
+    views = ['all', 'controversial', 'agreement']
+
+    cases = [{'view': v} for v in views]
+    cases += [{'orgs': [o]} for o in orgs]
+    cases += [{'statuses': [s]} for s in STATUS_TERMS]
+    cases += [{'topics': [t]} for t in topics]
+
+    rng = random.Random(seed)
+    for _ in range(trials):
+        cases.append({
+            'view': rng.choice(views),
+            'orgs': rng.sample(orgs, rng.randint(0, 3)),
+            'statuses': rng.sample(STATUS_TERMS, rng.randint(0, 2)),
+            'topics': rng.sample(topics, rng.randint(0, 2)),
+        })
+
+    failures = []
+    for case in cases:
+        expected = reference_filter(bills, **case)
+        got = index.bill_numbers(index.query(**case))
+        if got != expected:
+            failures.append({'case': case, 'expected': len(expected), 'got': len(got)})
+    return len(cases), failures
+
+
+# Loads filters.js into a bare context (no DOM), feeds loadFacetIndex() the
+# built index through a stub fetch(), then runs every fixture case through
+# facetFilter() and scanFilters().
+NODE_HARNESS = r'''
+const fs = require('fs'), vm = require('vm');
+const input = JSON.parse(fs.readFileSync(0, 'utf8'));
+const ctx = vm.createContext({
+    input,
+    console: { log() {}, warn() {} },
+    document: { addEventListener() {} },
+    window: {},
+    atob: s => Buffer.from(s, 'base64').toString('latin1'),
+    fetch: async () => ({ ok: true, json: async () => input.index }),
+});
+vm.runInContext(fs.readFileSync(input.script, 'utf8'), ctx);
+vm.runInContext('loadFacetIndex()', ctx).then(() => {
+    const results = vm.runInContext(`input.cases.map(c => {
+        const args = [c.view || 'all', c.orgs || [], c.statuses || [], c.topics || []];
+        return {
+            facetFilter: facetIndexMatches(input.bills)
+                ? facetFilter(input.bills, ...args).map(b => b.bill_number) : null,
+            scanFilters: scanFilters([...input.bills], ...args).map(b => b.bill_number),
+        };
+    })`, ctx);
+    process.stdout.write(JSON.stringify(results));
+});
+'''
+
+
+def run_filters_js(bills, output, cases):
+    """[{'facetFilter': [...], 'scanFilters': [...]}] per case, or None without node"""
+    node = shutil.which('node')
+    if not node:
+        return None
+    payload = json.dumps({'script': FILTERS_JS, 'index': output, 'bills': bills, 'cases': cases})
+    result = subprocess.run([node, '-e', NODE_HARNESS], input=payload,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+
+def check_fixture():
+    """Run the fixture cases through every filter path; returns (cases, failures, js_checked)"""
+    with open(FIXTURE, 'r') as f:
+        fixture = json.load(f)
+    bills = fixture['bills']
+    cases = [case['filters'] for case in fixture['cases']]
+    output = FacetIndex.from_bills(bills).to_json()
+    index = FacetIndex.from_json(json.loads(json.dumps(output)))
+    js = run_filters_js(bills, output, cases)
+
+    failures = []
+    for i, case in enumerate(fixture['cases']):
+        expected = case['expected']
+        got = {
+            'bitsets': index.bill_numbers(index.query(**case['filters'])),
+            'reference': reference_filter(bills, **case['filters']),
+        }
+        if js:
+            got.update(js[i])
+        for path, numbers in got.items():
+            if numbers != expected:
+                failures.append(f"{path} {case['filters']}: expected {expected}, got {numbers}")
+    return len(cases), failures, js is not None
+
+
+def load_bills():
+    index = open_index(BILLS_FILE, 'bills', key_field='bill_number')
+    return list(index.iter_records(
+        fields=lambda k: k in ('bill_number', 'status', 'topics') or k.endswith('_position')
+    ))
+
+
+def main():
+    print("=" * 60)
+    print("FACET INDEX")
+    print("=" * 60)
+    run = pipeline_metrics.start_run('build_facet_index')
+
+    with run.span('load'):
+        bills = load_bills()
+    with run.span('analyze'):
+        index = FacetIndex.from_bills(bills)
+        output = index.to_json()
+
+    if '--check' in sys.argv:
+        total, fixture_failures, js_checked = check_fixture()
+        for f in fixture_failures:
+            print(f"  ❌ {f}")
+        paths = 'bitsets, reference scan, facetFilter() and scanFilters()' if js_checked \
+            else 'bitsets and reference scan (node not found, filters.js skipped)'
+        print(f"{'✅' if not fixture_failures else '❌'} {FIXTURE}: {total} cases through {paths}")
+
+        # Round-trip through the JSON encoding so the check covers it too
+        decoded = FacetIndex.from_json(json.loads(json.dumps(output)))
+        total, failures = check(bills, decoded)
+        for f in failures[:10]:
+            print(f"  ❌ {f['case']}: expected {f['expected']} bills, got {f['got']}")
+        print(f"\n{'✅' if not failures else '❌'} {total - len(failures)}/{total} "
+              f"filter combinations match filters.js semantics")
+        sys.exit(1 if failures or fixture_failures else 0)
+
+    with run.span('serialize'):
+        with open(OUTPUT_FILE, 'w') as f:
+            json.dump(output, f, separators=(',', ':'))
+
+    for facet in FACETS:
+        print(f"  {facet:<7} {len(index.facets[facet]):>4} values")
+    print(f"\n✅ Saved {OUTPUT_FILE} ({len(index.bills)} bills)")
+    run.finish()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+Build Site - Bundle, minify and fingerprint page assets into dist/
+Usage:
+  python3 scripts/build_site.py              # validate pages and build dist/
+  python3 scripts/build_site.py --check      # validate only, write nothing
+  python3 scripts/build_site.py --no-minify  # bundle and fingerprint without minifying
+
+Each HTML page is scanned for local <script src> and stylesheet <link>
+tags. Consecutive tags (nothing but whitespace or comments between them)
+become one bundle: the files are concatenated in page order, minified,
+and written as dist/assets/<first-file>.<hash>.js|css. The tags are
+replaced by one tag pointing at the bundle. Inline scripts, markup,
+CDN scripts and async/defer/module scripts break a run, so execution
+order and the DOM each script sees are unchanged. A run is also split
+where two files declare the same top-level const/let/class, since that
+is a syntax error inside a single script.
+
+Bundle names are content hashes, so pages that share a run (components.js
++ my-reps-modal.js on most pages) share one file. dist/_headers marks
+assets/ as immutable for hosts that read it (Netlify, Cloudflare Pages);
+HTML and data/ keep short-lived caching so deploys show up immediately.
+
+dist/ is what ships: .github/workflows/pages.yml runs this script on
+every push to main and publishes dist/ to GitHub Pages (Pages source:
+"GitHub Actions"). Pages ignores _headers, but the hashed bundle names
+still make each deploy take effect at once.
+
+The rest of the site (data/, images, favicons, CNAME...) is copied as-is,
+including the bills/ and legislators/ pages from render_pages.py (run it
+first). dist/sitemap.xml lists every page under the CNAME domain, and
+dist/robots.txt points crawlers at it, so the pre-rendered pages can be
+found without running the listing's JavaScript.
+Backups, Python helpers and docs are left out. Every page also goes
+through validate_html.py's checks, plus a check that each local asset
+reference exists. Any failure exits 1 before dist/ is written.
+"""
+
+import hashlib
+import importlib.util
+import os
+import posixpath
+import re
+import shutil
+import sys
+from html import escape
+from pathlib import Path
+
+DIST_DIR = 'dist'
+ASSETS_DIR = 'assets'
+HASH_LENGTH = 10
+
+# Never copied into dist/
+SKIP_DIRS = {'.git', 'scripts', 'cache', 'reports', 'outbox', 'benchmarks', 'templates',
+             'node_modules', '__pycache__', DIST_DIR}
+SKIP_SUFFIXES = ('.py', '.pyc', '.backup', '.md', '.jsonl', '.patch')
+SKIP_FILES = {'.gitignore', '.DS_Store'}
+SITEMAP_SKIP = {'404.html'}
+
+HEADERS = f"""/{ASSETS_DIR}/*
+  Cache-Control: public, max-age=31536000, immutable
+/*.html
+  Cache-Control: public, max-age=300
+/data/*
+  Cache-Control: public, max-age=300
+"""
+
+SCRIPT_TAG = re.compile(r'<script\b([^>]*)>\s*</script>', re.I)
+LINK_TAG = re.compile(r'<link\b([^>]*)>', re.I)
+ATTR = re.compile(r'([\w-]+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+)))?')
+RUN_GAP = re.compile(r'(?:\s|<!--.*?-->)*$', re.S)
+TOP_LEVEL_DECL = re.compile(r'^(?:const|let|class)\s+([A-Za-z_$][\w$]*)', re.M)
+
+
+def load_validator():
+    """validate_html.check_file from the repo root (scripts/ is not a package)"""
+    spec = importlib.util.spec_from_file_location('validate_html', 'validate_html.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.check_file
+
+
+# -- Minifiers ----------------------------------------------------------------
+
+REGEX_AFTER = set('(,=:[!&|?{};+-*%<>~^')
+REGEX_AFTER_WORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'instanceof', 'new',
+                     'delete', 'void', 'throw', 'yield', 'await', 'of'}
+
+
+def minify_js(source):
+    """Drop comments and indentation, collapse spaces; keeps every line break
+
+    Line breaks stay so automatic semicolon insertion behaves exactly as
+    in the source. Strings, template literals (including nested ${...})
+    and regex literals are copied verbatim.
+    """
+    out = []
+    i, n = 0, len(source)
+    last = ''               # last significant character emitted
+    word = ''               # identifier/keyword ending at `last`
+    space = newline = False
+    templates = []          # brace depth at each open ${ ... }
+    depth = 0
+
+    def emit(text):
+        nonlocal space, newline
+        if out:
+            if newline:
+                out.append('\n')
+            elif space:
+                out.append(' ')
+        out.append(text)
+        space = newline = False
+
+    while i < n:
+        c = source[i]
+        if c == '\n':
+            newline = True
+            i += 1
+        elif c in ' \t\r\f\v\ufeff':
+            space = True
+            i += 1
+        elif source.startswith('//', i):
+            end = source.find('\n', i)
+            i = n if end < 0 else end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            end = n if end < 0 else end + 2
+            if '\n' in source[i:end]:
+                newline = True
+            else:
+                space = True
+            i = end
+        elif c in '"\'':
+            j = i + 1
+            while j < n and source[j] != c and source[j] != '\n':
+                j += 2 if source[j] == '\\' else 1
+            emit(source[i:j + 1])
+            i, last, word = j + 1, c, ''
+        elif c == '`' or (c == '}' and templates and templates[-1] == depth):
+            # Template literal text, from ` or the } closing a ${ ... }
+            if c == '}':
+                templates.pop()
+            j = i + 1
+            while j < n and source[j] != '`' and not source.startswith('${', j):
+                j += 2 if source[j] == '\\' else 1
+            if source.startswith('${', j):
+                templates.append(depth)
+                emit(source[i:j + 2])
+                i, last, word = j + 2, '{', ''
+            else:
+                emit(source[i:j + 1])
+                i, last, word = j + 1, '`', ''
+        elif c == '/' and (last in REGEX_AFTER or last == '' or word in REGEX_AFTER_WORDS):
+            j, in_class = i + 1, False
+            while j < n and source[j] != '\n':
+                ch = source[j]
+                if ch == '\\':
+                    j += 2
+                    continue
+                if ch == '[':
+                    in_class = True
+                elif ch == ']':
+                    in_class = False
+                elif ch == '/' and not in_class:
+                    break
+                j += 1
+            j += 1
+            while j < n and (source[j].isalnum() or source[j] == '_'):
+                j += 1
+            emit(source[i:j])
+            i, last, word = j, 'a', ''
+        elif c.isalnum() or c in '_$':
+            j = i + 1
+            while j < n and (source[j].isalnum() or source[j] in '_$'):
+                j += 1
+            word = source[i:j]
+            emit(word)
+            i, last = j, 'a'
+        else:
+            if c == '{':
+                depth += 1
+            elif c == '}':
+                depth -= 1
+            emit(c)
+            i, last, word = i + 1, c, ''
+    return ''.join(out) + '\n'
+
+
+CSS_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+CSS_STRING = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'')
+
+
+def minify_css(source):
+    """Drop comments, collapse whitespace, tighten around { } ; , >"""
+    strings = []
+
+    def keep(match):
+        strings.append(match.group(0))
+        return f'\x00{len(strings) - 1}\x00'
+
+    text = CSS_STRING.sub(keep, source)
+    text = CSS_COMMENT.sub('', text)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+    text = text.replace(';}', '}').strip()
+    return re.sub(r'\x00(\d+)\x00', lambda m: strings[int(m.group(1))], text) + '\n'
+
+
+CSS_URL = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+
+
+def rebase_css_urls(css, from_dir, to_dir):
+    """Rewrite relative url() references for a stylesheet moved between dirs"""
+    def rebase(match):
+        quote, url = match.groups()
+        if re.match(r'^(?:[a-z]+:|/|#)', url):
+            return match.group(0)
+        target = posixpath.normpath(posixpath.join(from_dir, url))
+        return f'url({quote}{posixpath.relpath(target, to_dir)}{quote})'
+
+    return CSS_URL.sub(rebase, css)
+
+
+# -- Pages --------------------------------------------------------------------
+
+def parse_attrs(text):
+    return {m.group(1).lower(): next((g for g in m.groups()[1:] if g is not None), '')
+            for m in ATTR.finditer(text)}
+
+
+def local_ref(url):
+    """Site-relative path part of a local reference, or None for external URLs"""
+    if re.match(r'^(?:[a-z]+:)?//', url, re.I) or url.startswith(('data:', '#')):
+        return None
+    return url.split('?', 1)[0].split('#', 1)[0]
+
+
+def asset_tags(html):
+    """[(start, end, kind, url)] for the bundleable asset tags, in page order
+
+    kind is 'js' or 'css'; tags that must stay where they are (inline,
+    external, async/defer/module, non-stylesheet links) are returned with
+    kind None so they break runs.
+    """
+    tags = []
+    for m in SCRIPT_TAG.finditer(html):
+        attrs = parse_attrs(m.group(1))
+        src = attrs.get('src')
+        bundleable = (src and local_ref(src) and attrs.get('type', 'text/javascript') == 'text/javascript'
+                      and not {'async', 'defer', 'nomodule', 'integrity'} & set(attrs))
+        tags.append((m.start(), m.end(), 'js' if bundleable else None, src))
+    for m in LINK_TAG.finditer(html):
+        attrs = parse_attrs(m.group(1))
+        href = attrs.get('href')
+        if attrs.get('rel', '').lower() != 'stylesheet' or not href:
+            continue
+        bundleable = local_ref(href) and attrs.get('media', 'all') == 'all'
+        tags.append((m.start(), m.end(), 'css' if bundleable else None, href))
+    return sorted(tags)
+
+
+def find_runs(html, tags):
+    """Group consecutive same-kind bundleable tags with only whitespace between"""
+    runs = []
+    previous = None
+    for tag in tags:
+        start, _, kind, _ = tag
+        if (kind and previous and previous[2] == kind
+                and RUN_GAP.match(html, previous[1], start) and runs
+                and runs[-1][-1] is previous):
+            runs[-1].append(tag)
+        elif kind:
+            runs.append([tag])
+        previous = tag
+    return runs
+
+
+def split_on_redeclaration(files, sources):
+    """Split a JS run where a file redeclares another's top-level const/let/class"""
+    groups, declared = [[]], set()
+    for path in files:
+        names = set(TOP_LEVEL_DECL.findall(sources[path]))
+        if names & declared:
+            groups.append([])
+            declared = set()
+        groups[-1].append(path)
+        declared |= names
+    return groups
+
+
+class SiteBuilder:
+    def __init__(self, minify=True):
+        self.minify = minify
+        self.bundles = {}           # asset path -> content
+        self.sources = {}           # site path -> text, read once
+        self.errors = {}            # page -> [error]
+        self.stats = {'pages': 0, 'tags_before': 0, 'tags_after': 0,
+                      'bytes_before': 0, 'bytes_after': 0}
+
+    def read(self, path):
+        if path not in self.sources:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.sources[path] = f.read()
+        return self.sources[path]
+
+    def bundle(self, kind, files):
+        """Write one bundle for `files`; returns its site path"""
+        parts = []
+        for path in files:
+            text = self.read(path)
+            if kind == 'css':
+                text = rebase_css_urls(text, posixpath.dirname(path), ASSETS_DIR)
+            parts.append(text)
+        if kind == 'js':
+            content = ';\n'.join(minify_js(p) if self.minify else p for p in parts)
+        else:
+            content = '\n'.join(minify_css(p) if self.minify else p for p in parts)
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:HASH_LENGTH]
+        stem = posixpath.splitext(posixpath.basename(files[0]))[0]
+        name = posixpath.join(ASSETS_DIR, f'{stem}.{digest}.{kind}')
+        self.bundles[name] = content
+        self.stats['bytes_before'] += sum(len(p.encode('utf-8')) for p in parts)
+        self.stats['bytes_after'] += len(content.encode('utf-8'))
+        return name
+
+    def page(self, page):
+        """Rewritten HTML for one page; problems go to self.errors"""
+        html = self.read(page)
+        page_dir = posixpath.dirname(page)
+        errors = []
+
+        tags = asset_tags(html)
+        for _, _, kind, url in tags:
+            ref = url and local_ref(url)
+            if ref and not os.path.exists(posixpath.normpath(posixpath.join(page_dir, ref))):
+                errors.append(f"Missing local asset {url}")
+        if errors:
+            self.errors.setdefault(page, []).extend(errors)
+            return html
+
+        replacements = []
+        for run in find_runs(html, tags):
+            kind = run[0][2]
+            files = [posixpath.normpath(posixpath.join(page_dir, local_ref(t[3]))) for t in run]
+            groups = split_on_redeclaration(files, {f: self.read(f) for f in files}) if kind == 'js' else [files]
+            tags_for = iter(run)
+            for group in groups:
+                group_tags = [next(tags_for) for _ in group]
+                href = posixpath.relpath(self.bundle(kind, group), page_dir or '.')
+                tag = (f'<script src="{href}"></script>' if kind == 'js'
+                       else f'<link rel="stylesheet" href="{href}">')
+                # First tag becomes the bundle, the rest (and the gaps) go
+                replacements.append((group_tags[0][0], group_tags[-1][1], tag))
+                self.stats['tags_before'] += len(group)
+                self.stats['tags_after'] += 1
+
+        for start, end, text in sorted(replacements, reverse=True):
+            html = html[:start] + text + html[end:]
+        self.stats['pages'] += 1
+        return html
+
+
+def site_files(root='.'):
+    """Site-relative paths of everything that ships, HTML pages included"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS and not d.startswith('.'))
+        for name in sorted(filenames):
+            if name in SKIP_FILES or name.endswith(SKIP_SUFFIXES):
+                continue
+            yield posixpath.normpath(posixpath.join(dirpath, name).replace(os.sep, '/'))
+
+
+def write_dist(files, pages, bundles):
+    if os.path.isdir(DIST_DIR):
+        shutil.rmtree(DIST_DIR)
+    for path in files:
+        target = os.path.join(DIST_DIR, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if path in pages:
+            with open(target, 'w', encoding='utf-8') as f:
+                f.write(pages[path])
+        else:
+            shutil.copy2(path, target)
+    for path, content in bundles.items():
+        target = os.path.join(DIST_DIR, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'w', encoding='utf-8') as f:
+            f.write(content)
+    with open(os.path.join(DIST_DIR, '_headers'), 'w') as f:
+        f.write(HEADERS)
+
+
+def sitemap(pages, domain):
+    """sitemap.xml for every page except SITEMAP_SKIP"""
+    urls = ''.join(
+        f"  <url><loc>https://{domain}/{escape('' if page == 'index.html' else page)}</loc></url>\n"
+        for page in sorted(pages) if page not in SITEMAP_SKIP
+    )
+    return ('<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+            f'{urls}</urlset>\n')
+
+
+def write_sitemap(pages):
+    """dist/sitemap.xml and dist/robots.txt; skipped without a CNAME to build URLs from"""
+    if not os.path.exists('CNAME'):
+        return 0
+    with open('CNAME', 'r') as f:
+        domain = f.read().strip()
+    with open(os.path.join(DIST_DIR, 'sitemap.xml'), 'w', encoding='utf-8') as f:
+        f.write(sitemap(pages, domain))
+    robots = os.path.join(DIST_DIR, 'robots.txt')
+    if not os.path.exists(robots):
+        with open(robots, 'w') as f:
+            f.write(f"User-agent: *\nAllow: /\nSitemap: https://{domain}/sitemap.xml\n")
+    return len(pages) - len(SITEMAP_SKIP & set(pages))
+
+
+def main():
+    check_only = '--check' in sys.argv
+    print("=" * 60)
+    print("SITE BUILD" + (" (check only)" if check_only else ""))
+    print("=" * 60)
+
+    check_file = load_validator()
+    builder = SiteBuilder(minify='--no-minify' not in sys.argv)
+    files = list(site_files())
+    pages = {}
+    for path in files:
+        if not path.endswith('.html'):
+            continue
+        errors = check_file(Path(path))
+        if errors:
+            builder.errors.setdefault(path, []).extend(errors)
+        pages[path] = builder.page(path)
+
+    for page in sorted(pages):
+        if page in builder.errors:
+            print(f"\n❌ {page}")
+            for error in builder.errors[page]:
+                print(f"   • {error}")
+    if builder.errors:
+        print(f"\n❌ {len(builder.errors)} of {len(pages)} pages have issues - dist/ not written")
+        return 1
+
+    s = builder.stats
+    print(f"✅ {len(pages)} pages valid")
+    print(f"📦 {s['tags_before']} asset tags -> {s['tags_after']} bundles "
+          f"({len(builder.bundles)} distinct files)")
+    if s['bytes_before']:
+        print(f"📉 {s['bytes_before'] / 1024:.0f} KB -> {s['bytes_after'] / 1024:.0f} KB "
+              f"({1 - s['bytes_after'] / s['bytes_before']:.0%} smaller before compression)")
+    if check_only:
+        return 0
+
+    write_dist(files, pages, builder.bundles)
+    listed = write_sitemap(pages)
+    print(f"\n✅ Built {DIST_DIR}/ ({len(files)} files + {len(builder.bundles)} bundles)")
+    if listed:
+        print(f"🗺️  sitemap.xml lists {listed} pages")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Change Feed - What changed in the data since the previous pipeline run
+Usage:
+  python3 scripts/change_feed.py            # diff against the last snapshot, write data/changes.json
+  python3 scripts/change_feed.py --reset    # start a fresh baseline
+
+Pipeline scripts overwrite bills.json, fiscal_notes.json and friends in
+place. Run this after them: it extracts the watched sections of every
+bill (status, vote tallies, roll calls, org positions, fiscal impact,
+summary), hashes each one, and compares the hashes with the snapshot
+from the previous run (cache/change_feed/snapshot.json). Only sections
+whose hash moved are diffed, and the feed keeps just the changed fields
+with their before/after values, so digests and alerts can read one
+small file.
+
+The record iteration and hashing helpers (iter_source, record_hash,
+canonical_json) are shared with snapshot_store.py.
+"""
+
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+
+import pipeline_metrics
+from artifact_index import open_index
+from org_matrix import org_fields
+
+OUTPUT_FILE = 'data/changes.json'
+SNAPSHOT_FILE = 'cache/change_feed/snapshot.json'
+
+# name -> (path, collection, key_field). Collections that are a dict of
+# key -> record need no key field; votes_summary.json and
+# legislator_alignments.json are that dict themselves. The feed reads
+# the sources its SECTIONS name; snapshot_store.py archives them all.
+SOURCES = {
+    'bills': ('data/bills.json', 'bills', 'bill_number'),
+    'votes_summary': ('data/votes_summary.json', 'records', None),
+    'fiscal_notes': ('data/fiscal_notes.json', 'notes', None),
+    'summaries': ('data/bill_summaries.json', 'summaries', None),
+    'legislators': ('data/legislators.json', 'legislators', None),
+    'alignments': ('data/legislator_alignments.json', 'records', None),
+}
+
+VOTE_FIELDS = ('house_votes_for', 'house_votes_against', 'senate_votes_for', 'senate_votes_against')
+FISCAL_FIELDS = ('impact_level', 'total_expenditures', 'total_revenues', 'net_impact')
+
+# section -> (source, extractor); extractors return a flat, JSON-able dict
+SECTIONS = {
+    'status': ('bills', lambda r: {k: r.get(k) for k in ('status', 'last_action_date')}),
+    'votes': ('bills', lambda r: {k: r.get(k) for k in VOTE_FIELDS}),
+    'positions': ('bills', lambda r: {f[:-len('_position')]: r[f] for f in org_fields(r) if r[f]}),
+    'roll_calls': ('votes_summary', lambda r: {k: r.get(k) for k in ('vote_count', 'has_roll_call')}),
+    'fiscal': ('fiscal_notes', lambda r: {k: r.get(k) for k in FISCAL_FIELDS}),
+    'summary': ('summaries', lambda r: {'plain_summary': r.get('plain_summary')}),
+}
+
+
+def canonical_json(obj):
+    """Stable JSON encoding: sorted keys, no whitespace"""
+    return json.dumps(obj, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+def record_hash(obj):
+    return hashlib.sha1(canonical_json(obj).encode('utf-8')).hexdigest()
+
+
+def iter_source(name):
+    """Yield (key, record) for one SOURCES entry; nothing if the file is missing"""
+    path, collection, key_field = SOURCES[name]
+    if not os.path.exists(path):
+        return
+    yield from open_index(path, collection, key_field).items()
+
+
+def extract_sections():
+    """{section: {bill: value}} for every watched section"""
+    by_source = {}
+    for section, (source, extract) in SECTIONS.items():
+        by_source.setdefault(source, []).append((section, extract))
+
+    values = {section: {} for section in SECTIONS}
+    for source, sections in by_source.items():
+        for key, record in iter_source(source):
+            for section, extract in sections:
+                values[section][key] = extract(record)
+    return values
+
+
+def diff_values(before, after):
+    """(before, after) restricted to the keys whose values differ"""
+    keys = sorted(set(before) | set(after))
+    changed = [k for k in keys if before.get(k) != after.get(k)]
+    return ({k: before.get(k) for k in changed}, {k: after.get(k) for k in changed})
+
+
+def build_feed(previous, values, titles):
+    """Compare new section values with the previous snapshot's hashes"""
+    bills = {}
+    counts = {section: 0 for section in SECTIONS}
+    for section, current in values.items():
+        old = previous.get('sections', {}).get(section, {})
+        for key, value in current.items():
+            entry = old.get(key)
+            if entry is None:
+                if not old:
+                    continue        # section is new to the snapshot, nothing to diff against
+                before = {}
+            elif entry['h'] == record_hash(value):
+                continue
+            else:
+                before = entry['v']
+            b, a = diff_values(before, value)
+            if not a and not b:
+                continue
+            bills.setdefault(key, {})[section] = {'before': b, 'after': a}
+            counts[section] += 1
+
+    prev_bills = set(previous.get('sections', {}).get('status', {}))
+    now_bills = set(values['status'])
+    return {
+        'generated_date': datetime.now().isoformat(),
+        'since': previous.get('generated_date'),
+        'baseline': not previous,
+        'counts': counts,
+        'added': sorted(now_bills - prev_bills) if previous else [],
+        'removed': sorted(prev_bills - now_bills),
+        'bills': {
+            key: {'title': titles.get(key, ''), 'changes': changes}
+            for key, changes in sorted(bills.items())
+        },
+    }
+
+
+def load_snapshot():
+    if os.path.exists(SNAPSHOT_FILE):
+        with open(SNAPSHOT_FILE, 'r') as f:
+            return json.load(f)
+    return {}
+
+
+def save_snapshot(values, generated_date):
+    snapshot = {
+        'generated_date': generated_date,
+        'sections': {
+            section: {key: {'h': record_hash(v), 'v': v} for key, v in current.items()}
+            for section, current in values.items()
+        },
+    }
+    os.makedirs(os.path.dirname(SNAPSHOT_FILE), exist_ok=True)
+    with open(SNAPSHOT_FILE, 'w') as f:
+        json.dump(snapshot, f, separators=(',', ':'))
+
+
+def main():
+    print("=" * 60)
+    print("CHANGE FEED")
+    print("=" * 60)
+    run = pipeline_metrics.start_run('change_feed')
+
+    with run.span('load'):
+        previous = {} if '--reset' in sys.argv else load_snapshot()
+        values = extract_sections()
+        titles = {k: r.get('title', '') for k, r in iter_source('bills')}
+
+    with run.span('analyze'):
+        feed = build_feed(previous, values, titles)
+
+    with run.span('serialize'):
+        with open(OUTPUT_FILE, 'w') as f:
+            json.dump(feed, f, indent=2)
+        save_snapshot(values, feed['generated_date'])
+
+    if feed['baseline']:
+        print(f"  No previous snapshot - recorded a baseline of {len(values['status'])} bills")
+    else:
+        print(f"  Since {feed['since']}: {len(feed['bills'])} bills changed")
+        for section, n in feed['counts'].items():
+            if n:
+                print(f"    {section:<11} {n}")
+        if feed['added']:
+            print(f"    new bills: {len(feed['added'])}")
+    print(f"\n✅ Saved {OUTPUT_FILE}")
+    run.finish()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Consistency Check - Cross-artifact integrity rules over the published data set
+Usage:
+  python3 scripts/check_consistency.py            # check, write data/consistency.json, exit 1 on regressions
+  python3 scripts/check_consistency.py --reset    # accept the current violations as the baseline
+  python3 scripts/check_consistency.py --strict   # exit 1 on any violation
+
+Each stage writes its own files, so they drift apart silently:
+bills.json vote tallies against the roll calls in data/votes,
+roll-call names against legislators.json, the bills.json organization
+registry against the `*_position` fields (see DYNAMIC_LOADING_GUIDE.md),
+compare_data.json against legislators.json and
+legislator_alignments.json, and the vote_matrix.json and
+comparison_table.json vote masks against legislators.json.
+
+Everything is loaded once into a Dataset of key sets and lookup dicts.
+Each rule in RULES is a set operation over it and returns the keys that
+violate it ("HB0015:S", "PETERT", "equality_utah"). The report stores
+every rule's violations. A run fails when a rule has a key the previous
+report accepted (a regression), and keeps failing until the key is fixed
+or accepted with --reset. Violations that were already known stay
+listed but do not fail the pipeline.
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import pipeline_metrics
+from export_vote_matrix import VoteMatrix
+from generate_comparison_table import compare_masks, legislator_masks
+from ingest_roll_calls import surname_key
+from org_matrix import OrgPositionMatrix, org_fields
+
+BILLS_FILE = 'data/bills.json'
+LEGISLATORS_FILE = 'data/legislators.json'
+VOTES_DIR = 'data/votes'
+SUMMARY_FILE = 'data/votes_summary.json'
+COMPARE_FILE = 'data/compare_data.json'
+ALIGNMENTS_FILE = 'data/legislator_alignments.json'
+VOTE_MATRIX_FILE = 'data/vote_matrix.json'
+TABLE_FILE = 'data/comparison_table.json'
+REPORT_FILE = 'data/consistency.json'
+
+CHAMBERS = (('H', 'house'), ('S', 'senate'))
+SAMPLE = 5
+
+
+def _load(path, default=None):
+    if not os.path.exists(path):
+        return default
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+class Dataset:
+    """Every artifact the rules read, loaded once and indexed"""
+
+    def __init__(self):
+        bills_data = _load(BILLS_FILE)
+        self.bills = {b['bill_number']: b for b in bills_data['bills']}
+        self.registry = {o['field_name'] for o in bills_data.get('organizations', [])}
+
+        self.votes = {}
+        for name in sorted(os.listdir(VOTES_DIR)):
+            if name.endswith('.json'):
+                self.votes[name[:-5]] = _load(os.path.join(VOTES_DIR, name))
+        self.roll_calls = [(bill, vid, rc) for bill, calls in self.votes.items() for vid, rc in calls.items()]
+
+        self.legislators = _load(LEGISLATORS_FILE)['legislators']
+        self.legislator_ids = {leg['id'] for leg in self.legislators.values()}
+        self.surnames = {chamber: set() for chamber, _ in CHAMBERS}
+        for name, leg in self.legislators.items():
+            self.surnames['H' if leg.get('chamber') == 'House' else 'S'].add(surname_key(name))
+
+        self.position_fields = {f[:-len('_position')] for b in self.bills.values() for f in org_fields(b)}
+        self.summary = _load(SUMMARY_FILE, {})
+        self.compare = _load(COMPARE_FILE, {})
+        self.alignments = _load(ALIGNMENTS_FILE, {})
+        self.vote_matrix = _load(VOTE_MATRIX_FILE, {})
+        self.table = _load(TABLE_FILE, {})
+
+    def legislator_key(self, name):
+        """legislators.json ID for a name, or the name if it is not there"""
+        return self.legislators[name]['id'] if name in self.legislators else name
+
+
+# -- Rules ---------------------------------------------------------------------
+# Each takes the Dataset and returns the set of violating keys.
+
+def tally_mismatch(d):
+    """bills.json {house,senate}_votes_for/against == max yeas/nays of that chamber's roll calls"""
+    bad = set()
+    for number, bill in d.bills.items():
+        calls = d.votes.get(number, {}).values()
+        for chamber, prefix in CHAMBERS:
+            mine = [rc for rc in calls if rc.get('house') == chamber]
+            expected = (max((rc['yeas_count'] for rc in mine), default=0),
+                        max((rc['nays_count'] for rc in mine), default=0))
+            actual = (bill.get(f'{prefix}_votes_for') or 0, bill.get(f'{prefix}_votes_against') or 0)
+            if actual != expected:
+                bad.add(f'{number}:{chamber}')
+    return bad
+
+
+def roll_call_counts(d):
+    """yeas_count / nays_count == length of the name lists"""
+    return {f'{bill}:{vid}' for bill, vid, rc in d.roll_calls
+            if rc['yeas_count'] != len(rc['yeas']) or rc['nays_count'] != len(rc['nays'])}
+
+
+def orphan_vote_files(d):
+    """every data/votes file belongs to a bill in bills.json"""
+    return set(d.votes) - set(d.bills)
+
+
+def summary_mismatch(d):
+    """votes_summary.json covers exactly the bills and matches data/votes"""
+    bad = set(d.summary) ^ set(d.bills)
+    for number, entry in d.summary.items():
+        calls = d.votes.get(number, {})
+        if entry.get('vote_count') != len(calls) or entry.get('has_roll_call') != bool(calls):
+            bad.add(number)
+    return bad
+
+
+def unknown_voters(d):
+    """every roll-call name resolves to a legislator of that chamber"""
+    return {f"{rc['house']}:{name}" for _, _, rc in d.roll_calls
+            for name in rc['yeas'] + rc['nays']
+            if surname_key(name) not in d.surnames.get(rc['house'], ())}
+
+
+def votes_without_roll_call(d):
+    """legislators' yea_votes / nay_votes only name bills with a roll call"""
+    voted = {bill for bill, calls in d.votes.items() if calls}
+    return {f"{leg['id']}:{bill}" for leg in d.legislators.values()
+            for bill in leg.get('yea_votes', []) + leg.get('nay_votes', [])
+            if bill not in voted}
+
+
+def registry_without_positions(d):
+    """orgs in bills.json `organizations` with no `<org>_position` field on any bill"""
+    return d.registry - d.position_fields
+
+
+def unregistered_position_fields(d):
+    """`<org>_position` fields missing from the bills.json `organizations` registry"""
+    return d.position_fields - d.registry
+
+
+def compare_orgs(d):
+    """compare_data.json organizations == the bills.json registry"""
+    if not d.compare:
+        return set()
+    orgs = d.compare.get('organizations', {})
+    # generate_compare_data writes {org id: org}; older files hold a list
+    if isinstance(orgs, dict):
+        ids = set(orgs)
+    else:
+        ids = {o.get('field_name') or o.get('id') for o in orgs}
+    return ids ^ d.registry
+
+
+def compare_legislators(d):
+    """compare_data.json legislators == legislators.json"""
+    if not d.compare:
+        return set()
+    return set(d.compare.get('legislators', {})) ^ set(d.legislators)
+
+
+def compare_votes_stale(d):
+    """compare_data.json vote lists == legislators.json yea_votes / nay_votes"""
+    bad = set()
+    for name, entry in d.compare.get('legislators', {}).items():
+        leg = d.legislators.get(name)
+        votes = entry.get('votes', {})
+        if leg and (set(votes.get('yea', [])) != set(leg.get('yea_votes', []))
+                    or set(votes.get('nay', [])) != set(leg.get('nay_votes', []))):
+            bad.add(leg['id'])
+    return bad
+
+
+def vote_matrix_stale(d):
+    """vote_matrix.json rows == legislators.json yea_votes / nay_votes"""
+    if not d.vote_matrix:
+        return set()
+    stored = VoteMatrix.from_json(d.vote_matrix)
+    expected = VoteMatrix.from_legislators(d.legislators, stored.bills)
+    rows = {name: expected.row(i) for i, name in enumerate(expected.legislators)}
+    bad = set(stored.legislators) ^ set(rows)
+    for i, name in enumerate(stored.legislators):
+        if name in rows and stored.row(i) != rows[name]:
+            bad.add(name)
+    return {d.legislator_key(name) for name in bad}
+
+
+def comparison_table_stale(d):
+    """comparison_table.json org-vs-legislator cells == legislators.json votes x bills.json positions"""
+    if not d.table:
+        return set()
+    entities = {tuple(e): i for i, e in enumerate(d.table['entities'])}
+    cells = {(a, b): (compared, agreements) for a, b, compared, agreements in d.table['pairs']}
+    names = {eid for etype, eid in entities if etype == 'legislator'}
+    bad = names ^ set(d.legislators)
+
+    matrix = OrgPositionMatrix.from_bills(d.bills.values())
+    masks = legislator_masks(matrix, d.legislators)
+    for name in names & set(d.legislators):
+        j = entities[('legislator', name)]
+        for org in matrix.orgs:
+            # Pairs that compared no bills are left out of the table
+            stored = cells.get((entities.get(('organization', org)), j), (0, 0))
+            if stored != compare_masks(matrix.masks[org], masks[name]):
+                bad.add(name)
+                break
+    return {d.legislator_key(name) for name in bad}
+
+
+def compare_contested_unknown(d):
+    """compare_data.json contestedBillNumbers are all bills"""
+    return set(d.compare.get('contestedBillNumbers', [])) - set(d.bills)
+
+
+def alignment_legislators(d):
+    """legislator_alignments.json IDs are legislators.json IDs"""
+    return set(d.alignments) - d.legislator_ids
+
+
+def alignment_orgs(d):
+    """legislator_alignments.json orgs are registered orgs"""
+    return {field[:-len('_position')] for entry in d.alignments.values()
+            for field in entry.get('organizations', {})} - d.registry
+
+
+def alignment_arithmetic(d):
+    """matches + disagrees == total and alignment == matches / total"""
+    return {f'{leg_id}:{field}' for leg_id, entry in d.alignments.items()
+            for field, o in entry.get('organizations', {}).items()
+            if o['matches'] + o['disagrees'] != o['total']
+            or o['alignment'] != round(o['matches'] / o['total'] * 100, 1)}
+
+
+RULES = {
+    'tally_mismatch': tally_mismatch,
+    'roll_call_counts': roll_call_counts,
+    'orphan_vote_files': orphan_vote_files,
+    'summary_mismatch': summary_mismatch,
+    'unknown_voters': unknown_voters,
+    'votes_without_roll_call': votes_without_roll_call,
+    'registry_without_positions': registry_without_positions,
+    'unregistered_position_fields': unregistered_position_fields,
+    'compare_orgs': compare_orgs,
+    'compare_legislators': compare_legislators,
+    'compare_votes_stale': compare_votes_stale,
+    'compare_contested_unknown': compare_contested_unknown,
+    'vote_matrix_stale': vote_matrix_stale,
+    'comparison_table_stale': comparison_table_stale,
+    'alignment_legislators': alignment_legislators,
+    'alignment_orgs': alignment_orgs,
+    'alignment_arithmetic': alignment_arithmetic,
+}
+
+
+def run_rules(dataset):
+    """{rule: sorted violations}"""
+    return {name: sorted(rule(dataset)) for name, rule in RULES.items()}
+
+
+def build_report(results, previous, elapsed):
+    """The consistency.json payload, with each rule's regressions against `previous`"""
+    before = (previous or {}).get('rules', {})
+    rules = {}
+    for name, violations in results.items():
+        # A previous run's new violations stay new until fixed or --reset
+        known = set(before[name]['violations']) - set(before[name]['new']) if name in before else None
+        new = [] if known is None else [v for v in violations if v not in known]
+        rules[name] = {
+            'rule': RULES[name].__doc__,
+            'count': len(violations),
+            'new': new,
+            'fixed': [] if known is None else sorted(known - set(violations)),
+            'violations': violations,
+        }
+    return {
+        'generated_date': datetime.now().isoformat(),
+        'since': (previous or {}).get('generated_date'),
+        'baseline': not previous,
+        'elapsed_s': round(elapsed, 3),
+        'violations': sum(r['count'] for r in rules.values()),
+        'regressions': sum(len(r['new']) for r in rules.values()),
+        'rules': rules,
+    }
+
+
+def main():
+    print("=" * 60)
+    print("CONSISTENCY CHECK")
+    print("=" * 60)
+    run = pipeline_metrics.start_run('check_consistency')
+
+    previous = None if '--reset' in sys.argv else _load(REPORT_FILE)
+    start = time.perf_counter()
+    with run.span('load'):
+        dataset = Dataset()
+    with run.span('analyze'):
+        results = run_rules(dataset)
+    report = build_report(results, previous, time.perf_counter() - start)
+
+    with run.span('serialize'):
+        with open(REPORT_FILE, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    for name, rule in report['rules'].items():
+        status = '❌' if rule['new'] else ('⚠️ ' if rule['count'] else '✅')
+        line = f"  {status} {name:<30} {rule['count']:>5}"
+        if rule['new']:
+            line += f"  +{len(rule['new'])} new (e.g. {', '.join(rule['new'][:SAMPLE])})"
+        elif rule['count']:
+            line += f"  e.g. {', '.join(rule['violations'][:SAMPLE])}"
+        if rule['fixed']:
+            line += f"  -{len(rule['fixed'])} fixed"
+        print(line)
+        run.count(name, rule['count'])
+
+    print(f"\n  {report['violations']} violations, {report['regressions']} new, "
+          f"checked in {report['elapsed_s']}s")
+    print(f"📁 Report: {REPORT_FILE}")
+    run.finish()
+
+    if report['baseline']:
+        print("✅ Baseline recorded")
+    elif report['regressions']:
+        print(f"❌ {report['regressions']} new violations since {report['since']}")
+        sys.exit(1)
+    else:
+        print(f"✅ No new violations since {report['since']}")
+    if '--strict' in sys.argv and report['violations']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+utah-tracker CLI - One entry point for every pipeline stage
+Usage:
+  python3 scripts/cli.py                          # list stages
+  python3 scripts/cli.py fiscal --all             # = python3 scripts/scrape_fiscal_notes.py --all
+  python3 scripts/cli.py export --score HB0001=yea HB0011=nay
+  python3 scripts/cli.py startup [--repeat 5]     # import cost of each stage (-X importtime)
+
+Each subcommand imports only its own module, and only when it runs. The
+remaining arguments reach the stage unchanged, so every stage keeps its
+own flags and the old `python3 scripts/<stage>.py` invocations still
+work. A cron job that refreshes one stage therefore never loads another
+stage's dependencies. API clients, pypdf and dotenv are imported inside
+the functions that use them, not at module level.
+
+`startup` runs a fresh `python -X importtime` per stage and reports the
+cumulative import time of the stage module plus its slowest direct
+imports, so an eager heavy import shows up by name.
+"""
+
+import importlib
+import os
+import subprocess
+import sys
+
+# subcommand -> (module, one-line description); run from the repo root
+STAGES = {
+    'fetch': ('bill_timeline', 'fetch bill status pages, write the action timeline'),
+    'votes': ('ingest_roll_calls', 'fetch roll calls, derive vote lists and alignments'),
+    'fiscal': ('scrape_fiscal_notes', 'scrape fiscal notes (HTML, PDF fallback)'),
+    'cube': ('fiscal_cube', 'fund x fiscal-year cube from fiscal notes'),
+    'language': ('analyze_bill_language', 'count and extract SHALL/MAY/MUST sentences'),
+    'sentences': ('sentence_table', 'intern bill_language sentences'),
+    'topics': ('tag_topics', 'tag bill topics'),
+    'related': ('related_bills', 'related-bill lists'),
+    'summaries': ('generate_bill_summaries', 'AI summaries for controversial bills'),
+    'compare': ('generate_compare_data', 'compare page data'),
+    'table': ('generate_comparison_table', 'org comparison table'),
+    'orgs': ('org_matrix', 'org position matrix'),
+    'export': ('export_vote_matrix', 'vote matrix for legislator matching'),
+    'facets': ('build_facet_index', 'facet index for bill filters'),
+    'feed': ('change_feed', 'change feed against the last snapshot'),
+    'snapshot': ('snapshot_store', 'archive per-record history; point-in-time reads'),
+    'digest': ('build_digest', 'subscriber email digest'),
+    'pages': ('render_pages', 'pre-render bill and legislator pages'),
+    'site': ('build_site', 'bundle and fingerprint site assets'),
+    'validate': ('records', 'validate data files against the record schemas'),
+    'check': ('check_consistency', 'cross-file consistency rules; fails on regressions'),
+    'serve': ('query_server', 'local query API'),
+    'benchmark': ('benchmark_pipeline', 'benchmark the pipeline stages'),
+}
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+TOP_IMPORTS = 3
+
+
+def usage():
+    print("Usage: python3 scripts/cli.py <stage> [stage args...]\n")
+    width = max(len(name) for name in STAGES)
+    for name, (module, description) in STAGES.items():
+        print(f"  {name:<{width}}  {description}  ({module}.py)")
+    print(f"  {'startup':<{width}}  import time of each stage (--repeat N)")
+
+
+def load(stage):
+    """Import a stage's module"""
+    return importlib.import_module(STAGES[stage][0])
+
+
+def run(stage, args):
+    module = STAGES[stage][0]
+    # Stages read their flags from sys.argv, as when run as a script
+    sys.argv = [os.path.join(SCRIPTS_DIR, f'{module}.py')] + list(args)
+    load(stage).main()
+
+
+def parse_importtime(stderr, module):
+    """(cumulative µs, [(µs, name)] direct imports) for `module` from -X importtime output"""
+    children = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line[12:]:
+            continue
+        _, cumulative, name = line[12:].split('|')
+        if not cumulative.strip().isdigit():
+            continue                        # header row
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        if level == 1:
+            children.append((int(cumulative), name))
+        elif level == 0:
+            if name == module:
+                return int(cumulative), sorted(children, reverse=True)
+            children = []
+    return 0, []
+
+
+def measure_imports(repeat=3, stages=None):
+    """{stage: {'import_ms', 'top'}}, best of `repeat` fresh interpreters"""
+    results = {}
+    for stage in stages or STAGES:
+        module = STAGES[stage][0]
+        code = f"import sys; sys.path.insert(0, {SCRIPTS_DIR!r}); import {module}"
+        best = None
+        for _ in range(repeat):
+            proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                                  capture_output=True, text=True)
+            if proc.returncode != 0:
+                best = None
+                break
+            sample = parse_importtime(proc.stderr, module)
+            if best is None or sample[0] < best[0]:
+                best = sample
+        if best is None:
+            results[stage] = {'import_ms': None, 'error': proc.stderr.strip().splitlines()[-1]}
+            continue
+        results[stage] = {
+            'import_ms': round(best[0] / 1000, 2),
+            'top': [[name, round(us / 1000, 2)] for us, name in best[1][:TOP_IMPORTS]],
+        }
+    return results
+
+
+def startup(args):
+    repeat = int(args[args.index('--repeat') + 1]) if '--repeat' in args else 3
+    print("=" * 60)
+    print("STAGE IMPORT TIME (-X importtime, best of %d)" % repeat)
+    print("=" * 60)
+    results = measure_imports(repeat)
+    for stage, r in sorted(results.items(), key=lambda kv: -(kv[1]['import_ms'] or 0)):
+        if r['import_ms'] is None:
+            print(f"  {stage:<10} ❌ {r['error']}")
+            continue
+        top = ', '.join(f"{name} {ms}ms" for name, ms in r['top'])
+        print(f"  {stage:<10} {r['import_ms']:>8.1f}ms   {top}")
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] in ('-h', '--help', 'help'):
+        usage()
+        return
+    stage, args = sys.argv[1], sys.argv[2:]
+    if stage == 'startup':
+        startup(args)
+    elif stage in STAGES:
+        run(stage, args)
+    else:
+        print(f"❌ Unknown stage: {stage}\n")
+        usage()
+        sys.exit(2)
+
+
+if __name__ == '__main__':
+    main()
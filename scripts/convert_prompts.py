@@ -9,6 +9,8 @@ import json
 from datetime import datetime
 import os
 
+import pipeline_metrics
+
 def convert_prompts():
     csv_path = 'prompts_export.csv'
     json_path = 'data/prompts.json'
@@ -19,9 +21,10 @@ def convert_prompts():
         print("  File → Download → CSV")
         return False
     
+    run = pipeline_metrics.start_run('convert_prompts')
     prompts = []
     
-    with open(csv_path, 'r', encoding='utf-8') as f:
+    with run.span('parse'), open(csv_path, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
         for row in reader:
             # Skip empty rows
@@ -72,7 +75,7 @@ def convert_prompts():
     }
     
     # Write JSON
-    with open(json_path, 'w', encoding='utf-8') as f:
+    with run.span('serialize'), open(json_path, 'w', encoding='utf-8') as f:
         json.dump(output, f, indent=2, ensure_ascii=False)
     
     # Print stats
@@ -90,6 +93,7 @@ def convert_prompts():
     
     # Cleanup
     print(f"\n🗑️  You can now delete {csv_path}")
+    run.finish()
     
     return True
 
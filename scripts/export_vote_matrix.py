@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Export vote_matrix.json - dense legislator x bill vote codes for match scoring
+Usage:
+  python3 scripts/export_vote_matrix.py                         # write data/vote_matrix.json
+  python3 scripts/export_vote_matrix.py --score HB0001=yea HB0011=nay ...
+
+legislator-match.js used to download legislators.json and bills.json
+(3.4MB) and loop over every legislator's vote lists. This stage packs the
+votes into one int8 matrix (1 yea, -1 nay, 2 voted both ways across roll
+calls, 0 no vote), row-major by legislator, base64-encoded, plus the quiz
+bills the page asks about.
+score_legislators() is the reference scorer the browser mirrors.
+"""
+
+import base64
+import json
+import sys
+from datetime import datetime
+from functools import cached_property
+
+import pipeline_metrics
+from artifact_index import open_index
+
+BILLS_FILE = 'data/bills.json'
+LEGISLATORS_FILE = 'data/legislators.json'
+OUTPUT_FILE = 'data/vote_matrix.json'
+
+YEA = 1
+NAY = -1
+SPLIT = 2              # yea on one roll call, nay on another (e.g. committee vs floor)
+MIN_COMPARED = 5       # same floor legislator-match.js uses
+QUIZ_BILLS = 20
+
+# bytes.translate tables: one byte per bill, 0x01 where the vote matches
+_YEA_TABLE = bytes(1 if i in (YEA, SPLIT) else 0 for i in range(256))
+_NAY_TABLE = bytes(1 if i in (NAY & 0xFF, SPLIT) else 0 for i in range(256))
+
+
+class VoteMatrix:
+    """legislator x bill int8 vote codes"""
+
+    def __init__(self, legislators, bills, codes):
+        self.legislators = legislators     # names, row order
+        self.bills = bills                 # bill numbers, column order
+        self.codes = codes                 # bytes, len(legislators) * len(bills)
+        self.bill_index = {b: j for j, b in enumerate(bills)}
+
+    @classmethod
+    def from_legislators(cls, legislators, bills):
+        """Build from legislators.json records and the session's bill numbers"""
+        bill_index = {b: j for j, b in enumerate(bills)}
+        names = list(legislators)
+        codes = bytearray(len(names) * len(bills))
+        for i, name in enumerate(names):
+            row = i * len(bills)
+            for bill in legislators[name].get('yea_votes', []):
+                if bill in bill_index:
+                    codes[row + bill_index[bill]] = YEA
+            for bill in legislators[name].get('nay_votes', []):
+                if bill in bill_index:
+                    j = row + bill_index[bill]
+                    codes[j] = SPLIT if codes[j] == YEA else NAY & 0xFF
+        return cls(names, bills, bytes(codes))
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data['legislators'], data['bills'], base64.b64decode(data['codes']))
+
+    def row(self, i):
+        n = len(self.bills)
+        return self.codes[i * n:(i + 1) * n]
+
+    @cached_property
+    def masks(self):
+        """[(yea_mask, nay_mask)] per legislator
+
+        Masks are integers with one byte per bill (0x01 where the vote
+        matches), so AND + popcount compares a whole row in one C-level op.
+        """
+        return [
+            (int.from_bytes(r.translate(_YEA_TABLE), 'little'),
+             int.from_bytes(r.translate(_NAY_TABLE), 'little'))
+            for r in map(self.row, range(len(self.legislators)))
+        ]
+
+    def user_masks(self, user_votes):
+        """(yea_mask, nay_mask) for {bill: 'yea'|'nay'|'skip'}"""
+        yea = bytearray(len(self.bills))
+        nay = bytearray(len(self.bills))
+        for bill, vote in user_votes.items():
+            j = self.bill_index.get(bill)
+            if j is None:
+                continue
+            if vote == 'yea':
+                yea[j] = 1
+            elif vote == 'nay':
+                nay[j] = 1
+        return int.from_bytes(yea, 'little'), int.from_bytes(nay, 'little')
+
+    def to_json(self):
+        return {
+            'legislators': self.legislators,
+            'bills': self.bills,
+            'codes': base64.b64encode(self.codes).decode('ascii'),
+        }
+
+
+def score_legislators(matrix, user_votes, min_compared=MIN_COMPARED):
+    """Rank every legislator against a user's yea/nay answers
+
+    Same semantics as LegislatorMatcher.calculateMatches(): only bills both
+    the user and legislator voted on count, legislators with fewer than
+    `min_compared` such bills are dropped, results sorted by matchPct.
+    """
+    user_yea, user_nay = matrix.user_masks(user_votes)
+    user_any = user_yea | user_nay
+
+    results = []
+    for name, (yea, nay) in zip(matrix.legislators, matrix.masks):
+        compared = ((yea | nay) & user_any).bit_count()
+        if compared < min_compared:
+            continue
+        agreements = (yea & user_yea).bit_count() + (nay & user_nay).bit_count()
+        results.append({
+            'name': name,
+            # JS Math.round semantics (half up), not Python's banker's rounding
+            'matchPct': int(agreements / compared * 100 + 0.5),
+            'agreements': agreements,
+            'disagreements': compared - agreements,
+            'compared': compared,
+        })
+
+    results.sort(key=lambda r: r['matchPct'], reverse=True)
+    return results
+
+
+def pick_quiz_bills(bills, count=QUIZ_BILLS):
+    """Port of LegislatorMatcher.getQuizBills(): voted-on, contested, watched bills"""
+    scored = []
+    for bill in bills:
+        has_votes = (bill.get('house_votes_for') or 0) + (bill.get('house_votes_against') or 0) > 0
+        positions = [v for k, v in bill.items() if k.endswith('_position') and v]
+        if not has_votes or len(positions) < 2:
+            continue
+        controversial = 2 if 'Support' in positions and 'Oppose' in positions else 0
+        scored.append((controversial + len(positions), bill))
+
+    scored.sort(key=lambda s: s[0], reverse=True)
+    return [
+        {
+            'bill_number': b['bill_number'],
+            'title': b.get('title', ''),
+            'general_provisions': b.get('general_provisions', ''),
+        }
+        for _, b in scored[:count]
+    ]
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--score':
+        score_cli(sys.argv[2:])
+        return
+
+    print("=" * 60)
+    print("VOTE MATRIX EXPORT")
+    print("=" * 60)
+    run = pipeline_metrics.start_run('export_vote_matrix')
+
+    with run.span('load'):
+        index = open_index(BILLS_FILE, 'bills', key_field='bill_number')
+        bills = list(index.iter_records(
+            fields=lambda k: k in ('bill_number', 'title', 'general_provisions',
+                                   'house_votes_for', 'house_votes_against')
+            or k.endswith('_position')
+        ))
+        with open(LEGISLATORS_FILE, 'r') as f:
+            legislators_data = json.load(f)
+        legislators = legislators_data.get('legislators', legislators_data)
+
+    with run.span('analyze'):
+        matrix = VoteMatrix.from_legislators(legislators, [b['bill_number'] for b in bills])
+        output = {
+            'generated_date': datetime.now().isoformat(),
+            **matrix.to_json(),
+            'minCompared': MIN_COMPARED,
+            'quizBills': pick_quiz_bills(bills),
+        }
+
+    with run.span('serialize'):
+        with open(OUTPUT_FILE, 'w') as f:
+            json.dump(output, f, separators=(',', ':'))
+
+    cast = sum(1 for c in matrix.codes if c)
+    print(f"  {len(matrix.legislators)} legislators x {len(matrix.bills)} bills, {cast:,} votes")
+    print(f"\n✅ Saved {OUTPUT_FILE}")
+    run.finish()
+
+
+def score_cli(args):
+    """--score BILL=yea|nay ...: rank legislators from the exported matrix"""
+    with open(OUTPUT_FILE, 'r') as f:
+        matrix = VoteMatrix.from_json(json.load(f))
+    user_votes = dict(a.split('=', 1) for a in args)
+    for i, match in enumerate(score_legislators(matrix, user_votes)[:20], 1):
+        print(f"  {i:>2}. {match['name']:<30} {match['matchPct']:>3}% "
+              f"({match['agreements']}/{match['compared']})")
+
+
+if __name__ == '__main__':
+    main()
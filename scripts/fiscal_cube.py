@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Fiscal Cube - Fund x agency x fiscal year table of fiscal note amounts, with rollups
+Usage:
+  python3 scripts/fiscal_cube.py                  # build data/fiscal_cube.json
+  python3 scripts/fiscal_cube.py --sum fund="General Fund" fiscal_year=2026 kind=expenditure passed=1
+
+Every fiscal note's state government table (scrape_fiscal_notes.py
+parses it into long rows) is stacked into one long table with a row per
+(bill, kind, agency, fund, fiscal year). Each column is a typed array:
+uint16 codes into a dimension list, plus int64 whole-dollar amounts.
+Notes that only give Total Revenues / Total Expenditures contribute one
+row per year under the fund TOTAL_FUND, so session totals still cover
+every bill.
+
+Rollups by fund, agency, topic and for the whole session are
+precomputed, each for all bills and for passed bills. They are stored as
+{label: {fiscal year: [revenue, expenditure]}}. Anything else, such as
+"General Fund expenditures of passed bills in FY2026", is one filtered
+sum over the arrays (FiscalCube.total) rather than a rescrape.
+
+The output stores each column base64-encoded, little-endian, as
+export_vote_matrix.py does.
+"""
+
+import base64
+import json
+import sys
+from array import array
+from collections import defaultdict
+from datetime import datetime
+
+import pipeline_metrics
+from artifact_index import open_index
+from scrape_fiscal_notes import parse_amount
+
+BILLS_FILE = 'data/bills.json'
+FISCAL_FILE = 'data/fiscal_notes.json'
+OUTPUT_FILE = 'data/fiscal_cube.json'
+
+TOTAL_FUND = 'All Funds (note total)'
+KINDS = ['revenue', 'expenditure']
+# column -> array typecode; every column but amount holds dimension codes
+COLUMNS = {'bill': 'H', 'kind': 'B', 'agency': 'H', 'fund': 'H', 'fiscal_year': 'H', 'amount': 'q'}
+DIMENSIONS = [c for c in COLUMNS if c != 'amount']
+
+
+def is_passed(status):
+    """Passed both chambers and was not vetoed"""
+    status = (status or '').lower()
+    return ('governor' in status or 'became law' in status) and 'governor vetoed' not in status
+
+
+def _to_le_bytes(values):
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_le_bytes(typecode, data):
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def note_rows(note):
+    """[(kind, agency, fund, fiscal_year, amount)] for one fiscal note"""
+    table = note.get('state_government') or {}
+    rows = table.get('rows') or []
+    if rows:
+        return [tuple(r) for r in rows]
+    fallback = []
+    for kind, field in (('revenue', 'total_revenues'), ('expenditure', 'total_expenditures')):
+        for fy, amount in (note.get(field) or {}).items():
+            value = parse_amount(amount)
+            if value:
+                fallback.append((kind, '', TOTAL_FUND, fy, value))
+    return fallback
+
+
+class FiscalCube:
+    """Long table of fiscal amounts as parallel typed arrays"""
+
+    def __init__(self, dims, columns, passed, bill_topics):
+        self.dims = dims                    # dimension -> [labels]; codes index these
+        self.columns = columns              # column -> array
+        self.passed = passed                # bytes, 1 per bill code
+        self.bill_topics = bill_topics      # [[topic code]] per bill code
+        self.codes = {d: {label: i for i, label in enumerate(labels)} for d, labels in dims.items()}
+
+    @classmethod
+    def from_notes(cls, notes, bills):
+        """Build from fiscal_notes.json notes and bills.json records"""
+        by_number = {b['bill_number']: b for b in bills}
+        rows = []
+        for number in sorted(notes):
+            rows.extend((number,) + r for r in note_rows(notes[number]))
+
+        dims = {
+            'bill': sorted({r[0] for r in rows}),
+            'kind': KINDS,
+            'agency': sorted({r[2] for r in rows}),
+            'fund': sorted({r[3] for r in rows}),
+            'fiscal_year': sorted({r[4] for r in rows}),
+        }
+        codes = {d: {label: i for i, label in enumerate(labels)} for d, labels in dims.items()}
+        columns = {name: array(typecode) for name, typecode in COLUMNS.items()}
+        for row in rows:
+            for name, value in zip(COLUMNS, row):
+                columns[name].append(value if name == 'amount' else codes[name][value])
+
+        topics = sorted({t for b in dims['bill'] for t in by_number.get(b, {}).get('topics') or []})
+        dims['topic'] = topics
+        topic_codes = {t: i for i, t in enumerate(topics)}
+        bill_topics = [[topic_codes[t] for t in by_number.get(b, {}).get('topics') or []] for b in dims['bill']]
+        passed = bytes(1 if is_passed(by_number.get(b, {}).get('status')) else 0 for b in dims['bill'])
+        return cls(dims, columns, passed, bill_topics)
+
+    @classmethod
+    def from_json(cls, data):
+        columns = {name: _from_le_bytes(typecode, base64.b64decode(data['columns'][name]))
+                   for name, typecode in COLUMNS.items()}
+        return cls(data['dims'], columns, base64.b64decode(data['passed']), data['billTopics'])
+
+    def __len__(self):
+        return len(self.columns['amount'])
+
+    def total(self, passed=None, topic=None, **filters):
+        """Sum of amounts over rows matching every filter
+
+        Filters are dimension=label (fund='General Fund', kind='expenditure',
+        fiscal_year='FY2026', agency=..., bill=...); passed=True keeps
+        passed bills only, topic= keeps bills tagged with that topic.
+        """
+        wanted = []
+        for dim, label in filters.items():
+            code = self.codes[dim].get(label)
+            if code is None:
+                return 0
+            wanted.append((self.columns[dim], code))
+        bills = self.columns['bill']
+        if topic is not None:
+            code = self.codes['topic'].get(topic)
+            keep = bytes(1 if code in ts else 0 for ts in self.bill_topics)
+        else:
+            keep = bytes([1]) * len(self.dims['bill'])
+        if passed:
+            keep = bytes(k & p for k, p in zip(keep, self.passed))
+        amount = self.columns['amount']
+        return sum(
+            amount[i] for i in range(len(amount))
+            if keep[bills[i]] and all(col[i] == code for col, code in wanted)
+        )
+
+    def rollup(self, group):
+        """{'all': {label: {fy: [revenue, expenditure]}}, 'passed': {...}} in one pass
+
+        group is a dimension name, 'topic' (a bill counts toward each of
+        its topics) or None for the session total (label 'total').
+        """
+        out = {'all': defaultdict(lambda: defaultdict(lambda: [0, 0])),
+               'passed': defaultdict(lambda: defaultdict(lambda: [0, 0]))}
+        col = self.columns
+        years = self.dims['fiscal_year']
+        for i in range(len(self)):
+            bill = col['bill'][i]
+            if group is None:
+                labels = ['total']
+            elif group == 'topic':
+                labels = [self.dims['topic'][t] for t in self.bill_topics[bill]]
+            else:
+                labels = [self.dims[group][col[group][i]]]
+            fy, kind, amount = years[col['fiscal_year'][i]], col['kind'][i], col['amount'][i]
+            for label in labels:
+                out['all'][label][fy][kind] += amount
+                if self.passed[bill]:
+                    out['passed'][label][fy][kind] += amount
+        return {scope: {label: dict(sorted(by_year.items())) for label, by_year in sorted(table.items())}
+                for scope, table in out.items()}
+
+    def rollups(self):
+        return {
+            'byFund': self.rollup('fund'),
+            'byAgency': self.rollup('agency'),
+            'byTopic': self.rollup('topic'),
+            'session': self.rollup(None),
+        }
+
+    def to_json(self):
+        return {
+            'rows': len(self),
+            'dims': self.dims,
+            'columns': {name: base64.b64encode(_to_le_bytes(values)).decode('ascii')
+                        for name, values in self.columns.items()},
+            'passed': base64.b64encode(self.passed).decode('ascii'),
+            'billTopics': self.bill_topics,
+        }
+
+
+def sum_cli(args):
+    """--sum dim=label ...: one filtered sum over the saved cube"""
+    with open(OUTPUT_FILE, 'r') as f:
+        cube = FiscalCube.from_json(json.load(f))
+    filters = dict(a.split('=', 1) for a in args)
+    if 'fiscal_year' in filters and not filters['fiscal_year'].startswith('FY'):
+        filters['fiscal_year'] = f"FY{filters['fiscal_year']}"
+    passed = filters.pop('passed', '') in ('1', 'true', 'yes')
+    topic = filters.pop('topic', None)
+    unknown = [d for d in filters if d not in DIMENSIONS]
+    if unknown:
+        raise SystemExit(f"❌ Unknown dimension(s): {', '.join(unknown)} (use {', '.join(DIMENSIONS)}, topic, passed)")
+    print(f"${cube.total(passed=passed, topic=topic, **filters):,}")
+
+
+def main():
+    if '--sum' in sys.argv:
+        sum_cli(sys.argv[sys.argv.index('--sum') + 1:])
+        return
+
+    print("=" * 60)
+    print("FISCAL CUBE")
+    print("=" * 60)
+    run = pipeline_metrics.start_run('fiscal_cube')
+
+    with run.span('load'):
+        with open(FISCAL_FILE, 'r') as f:
+            notes = json.load(f).get('notes', {})
+        bills = list(open_index(BILLS_FILE, 'bills', key_field='bill_number').iter_records(
+            fields=('bill_number', 'status', 'topics')
+        ))
+
+    with run.span('analyze'):
+        cube = FiscalCube.from_notes(notes, bills)
+        output = {
+            'generated_date': datetime.now().isoformat(),
+            'totalFund': TOTAL_FUND,
+            **cube.to_json(),
+            'rollups': cube.rollups(),
+        }
+
+    with run.span('serialize'):
+        with open(OUTPUT_FILE, 'w') as f:
+            json.dump(output, f, separators=(',', ':'))
+
+    detailed = sum(1 for n in notes.values() if (n.get('state_government') or {}).get('rows'))
+    run.count('rows', len(cube))
+    run.count('bills_with_fund_detail', detailed)
+    print(f"  {len(cube):,} rows from {len(cube.dims['bill'])} bills "
+          f"({detailed} with per-fund detail, the rest as note totals)")
+    print(f"  {len(cube.dims['fund'])} funds, {len(cube.dims['agency'])} agencies, "
+          f"{len(cube.dims['fiscal_year'])} fiscal years, {len(cube.dims['topic'])} topics")
+    for fy, (revenue, expenditure) in output['rollups']['session']['passed'].get('total', {}).items():
+        print(f"  Passed bills {fy}: revenue ${revenue:,}  expenditure ${expenditure:,}")
+    print(f"\n✅ Saved {OUTPUT_FILE}")
+    run.finish()
+
+
+if __name__ == '__main__':
+    main()
@@ -6,33 +6,26 @@ Usage: python3 scripts/generate_bill_summaries.py
 
 import json
 import os
-import time
+import sys
 from datetime import datetime
 
-try:
-    import anthropic
-except ImportError:
-    print("Installing anthropic package...")
-    os.system("pip install anthropic")
-    import anthropic
-
-from dotenv import load_dotenv
-
-load_dotenv()
+import pipeline_metrics
+from artifact_index import open_index
+from org_matrix import OrgPositionMatrix
 
 # Configuration
-API_KEY = os.getenv('ANTHROPIC_API_KEY')
 BILLS_FILE = 'data/bills.json'
 SUMMARIES_FILE = 'data/bill_summaries.json'
 MODEL = 'claude-sonnet-4-20250514'
 DELAY_BETWEEN_CALLS = 1  # seconds
 
 
-def load_bills():
-    """Load bills data"""
-    with open(BILLS_FILE, 'r') as f:
-        data = json.load(f)
-    return data.get('bills', data) if isinstance(data, dict) else data
+def iter_bills():
+    """Stream bills with only the fields summaries need"""
+    wanted = {'bill_number', 'title', 'status', 'sponsor', 'controversy_score',
+              'general_provisions', 'highlighted_provisions', 'url', 'topics'}
+    index = open_index(BILLS_FILE, 'bills', key_field='bill_number')
+    return index.iter_records(fields=lambda k: k in wanted or k.endswith('_position'))
 
 
 def load_existing_summaries():
@@ -51,18 +44,17 @@ def save_summaries(summaries_data):
 
 def get_controversial_bills(bills):
     """Find bills with controversy_score > 0"""
+    bills = list(bills)
+    matrix = OrgPositionMatrix.from_bills(bills)
     controversial = []
     
     for bill in bills:
         if bill.get('controversy_score', 0) > 0:
             # Gather org positions
-            positions = {}
-            for key in bill.keys():
-                if key.endswith('_position') and key != 'author_position':
-                    pos = bill.get(key, '')
-                    if pos and pos.lower() in ['support', 'oppose']:
-                        org_name = key.replace('_position', '').replace('_', ' ').title()
-                        positions[org_name] = pos
+            positions = {
+                org.replace('_', ' ').title(): pos
+                for org, pos in matrix.bill_positions(bill['bill_number']).items()
+            }
             
             controversial.append({
                 'bill_number': bill.get('bill_number'),
@@ -80,8 +72,8 @@ def get_controversial_bills(bills):
     return sorted(controversial, key=lambda x: x['controversy_score'], reverse=True)
 
 
-def generate_summary(client, bill):
-    """Generate AI summary for a single bill"""
+def build_prompt(bill):
+    """Build the summary prompt for a single bill"""
     
     # Build position context
     support_orgs = [org for org, pos in bill['positions'].items() if pos == 'Support']
@@ -119,6 +111,12 @@ Format your response as JSON:
 }}
 
 Be balanced and fair to both sides. Avoid partisan language."""
+    return prompt
+
+
+def generate_summary(client, bill):
+    """Generate AI summary for a single bill"""
+    prompt = build_prompt(bill)
 
     try:
         response = client.messages.create(
@@ -149,7 +147,19 @@ Be balanced and fair to both sides. Avoid partisan language."""
 
 
 def main():
-    if not API_KEY or API_KEY == 'your_key_here':
+    # API dependencies are only needed when actually generating
+    try:
+        import anthropic
+        from dotenv import load_dotenv
+    except ImportError as e:
+        print(f"❌ Error: {e.name} is not installed")
+        print("   Install it with: pip install anthropic python-dotenv")
+        sys.exit(1)
+
+    load_dotenv()
+    api_key = os.getenv('ANTHROPIC_API_KEY')
+
+    if not api_key or api_key == 'your_key_here':
         print("❌ Error: Please add your Anthropic API key to .env file")
         print("   Get a key at: https://console.anthropic.com/settings/keys")
         return
@@ -157,17 +167,19 @@ def main():
     print("="*60)
     print("BILL SUMMARY GENERATOR")
     print("="*60)
+    run = pipeline_metrics.start_run('generate_bill_summaries')
     
     # Load data
-    bills = load_bills()
-    controversial = get_controversial_bills(bills)
-    existing = load_existing_summaries()
+    with run.span('load'):
+        existing = load_existing_summaries()
+    with run.span('parse'):
+        controversial = get_controversial_bills(iter_bills())
     
     print(f"\n📊 Found {len(controversial)} controversial bills")
     print(f"📁 Existing summaries: {len(existing['summaries'])}")
     
     # Initialize client
-    client = anthropic.Anthropic(api_key=API_KEY)
+    client = anthropic.Anthropic(api_key=api_key)
     
     # Track progress
     generated = 0
@@ -188,16 +200,21 @@ def main():
         if bill_num in summaries_data['summaries']:
             print(f"⏭️  [{i+1}/{len(controversial)}] {bill_num} - Already generated, skipping")
             skipped += 1
+            run.count('skipped')
             continue
         
         print(f"🔄 [{i+1}/{len(controversial)}] Generating summary for {bill_num}...")
         
-        summary = generate_summary(client, bill)
+        with run.span('api', bill_num):
+            summary = generate_summary(client, bill)
         
         if 'error' in summary:
             print(f"   ❌ Error: {summary['error']}")
             errors += 1
+            run.error('api', bill_num, summary['error'])
         else:
+            if summary.get('parse_error'):
+                run.error('parse', bill_num, 'summary response was not JSON')
             summaries_data['summaries'][bill_num] = {
                 **summary,
                 "title": bill['title'],
@@ -207,16 +224,19 @@ def main():
                 "generated_at": datetime.now().isoformat()
             }
             generated += 1
+            run.count('generated')
             print(f"   ✅ Done")
         
         # Save after each generation (in case of interruption)
-        save_summaries(summaries_data)
+        with run.span('serialize', bill_num):
+            save_summaries(summaries_data)
         
         # Rate limiting
-        time.sleep(DELAY_BETWEEN_CALLS)
+        run.sleep(DELAY_BETWEEN_CALLS, bill_num)
     
     # Final save
-    save_summaries(summaries_data)
+    with run.span('serialize'):
+        save_summaries(summaries_data)
     
     print("\n" + "="*60)
     print("COMPLETE!")
@@ -225,6 +245,7 @@ def main():
     print(f"⏭️  Skipped (existing): {skipped}")
     print(f"❌ Errors: {errors}")
     print(f"\n📁 Summaries saved to: {SUMMARIES_FILE}")
+    run.finish()
 
 
 if __name__ == '__main__':
@@ -9,14 +9,26 @@ Calculates BOTH all-votes AND contested-only alignments
 import json
 from datetime import datetime
 
+import pipeline_metrics
+from alignment_intervals import alignment_interval
+from artifact_index import open_index
+from org_matrix import OrgPositionMatrix
+
 def load_data():
-    """Load source data files"""
+    """Load source data files
+    
+    Bills are streamed from the record index with only the fields the
+    alignment needs (bill number, nay counts and org positions).
+    """
     
     with open('../utah-tracker-public/data/legislators.json', 'r') as f:
         legislators_data = json.load(f)
     
-    with open('../utah-tracker-public/data/bills.json', 'r') as f:
-        bills_data = json.load(f)
+    wanted = {'bill_number', 'house_votes_against', 'senate_votes_against'}
+    index = open_index('../utah-tracker-public/data/bills.json', 'bills', key_field='bill_number')
+    bills_data = {'bills': list(index.iter_records(
+        fields=lambda k: k in wanted or k.endswith('_position')
+    ))}
     
     return legislators_data, bills_data
 
@@ -57,33 +69,22 @@ def get_contested_bills(bills, min_nays=6):
     
     return contested
 
-def discover_org_positions(bills):
-    """Auto-discover all org position fields from bills"""
+def discover_org_positions(bills, matrix=None):
+    """Auto-discover all org position fields from bills
     
-    position_fields = set()
-    for bill in bills:
-        for key in bill.keys():
-            if key.endswith('_position') and key != 'author_position':
-                position_fields.add(key)
+    Positions come from the org x bill matrix, built once per run.
+    """
+    if matrix is None:
+        matrix = OrgPositionMatrix.from_bills(bills)
     
     org_positions = {}
     
-    for field in sorted(position_fields):
-        positions = {}
-        support_count = 0
-        oppose_count = 0
-        
-        for bill in bills:
-            pos = bill.get(field, '')
-            if pos in ['Support', 'Oppose']:
-                positions[bill['bill_number']] = pos
-                if pos == 'Support':
-                    support_count += 1
-                else:
-                    oppose_count += 1
+    for field_base in matrix.orgs:
+        positions = matrix.positions(field_base)
+        support_count, oppose_count = matrix.counts(field_base)
         
         if positions:
-            field_base = field.replace('_position', '')
+            field = f'{field_base}_position'
             org_positions[field_base] = {
                 'id': field_base,
                 'name': field_to_name(field),
@@ -130,29 +131,11 @@ def calculate_alignment(leg_yeas, leg_nays, org_positions, contested_only=None):
     alignment = round((agreements / total) * 100, 1)
     return alignment, agreements, disagreements, total
 
-def generate_compare_data():
-    """Generate the full compare_data.json"""
-    
-    print("Loading data...")
-    legislators_data, bills_data = load_data()
+def build_compare_legislators(legislators, org_positions, contested_bills):
+    """Build per-legislator alignment records (all votes + contested-only)
     
-    legislators = legislators_data.get('legislators', legislators_data)
-    bills = bills_data.get('bills', bills_data)
-    
-    print(f"  {len(legislators)} legislators")
-    print(f"  {len(bills)} bills")
-    
-    # Get contested bills (6+ nay votes)
-    contested_bills = get_contested_bills(bills, min_nays=6)
-    print(f"  {len(contested_bills)} contested bills (6+ nay votes)")
-    
-    # Auto-discover org positions
-    print("\nDiscovering org positions...")
-    org_positions = discover_org_positions(bills)
-    print(f"  {len(org_positions)} organizations with Support/Oppose positions")
-    
-    # Build legislator data with BOTH alignment types
-    print("\nCalculating alignments (all + contested-only)...")
+    Returns (compare_legislators, total_votes).
+    """
     compare_legislators = {}
     total_votes = 0
     
@@ -172,8 +155,12 @@ def generate_compare_data():
                 yea_votes, nay_votes, org['positions']
             )
             if alignment is not None:
+                low, high, reliable = alignment_interval(agrees, compared)
                 alignments[org_id] = {
                     'alignment': alignment,
+                    'alignmentLow': low,
+                    'alignmentHigh': high,
+                    'reliable': reliable,
                     'agreements': agrees,
                     'disagreements': disagrees,
                     'billsCompared': compared
@@ -184,8 +171,12 @@ def generate_compare_data():
                 yea_votes, nay_votes, org['positions'], contested_only=contested_bills
             )
             if alignment_c is not None:
+                low_c, high_c, reliable_c = alignment_interval(agrees_c, compared_c)
                 alignments_contested[org_id] = {
                     'alignment': alignment_c,
+                    'alignmentLow': low_c,
+                    'alignmentHigh': high_c,
+                    'reliable': reliable_c,
                     'agreements': agrees_c,
                     'disagreements': disagrees_c,
                     'billsCompared': compared_c
@@ -205,6 +196,40 @@ def generate_compare_data():
             'nay_votes': nay_votes
         }
     
+    return compare_legislators, total_votes
+
+def generate_compare_data():
+    """Generate the full compare_data.json"""
+    run = pipeline_metrics.start_run('generate_compare_data')
+    
+    print("Loading data...")
+    with run.span('load'):
+        legislators_data, bills_data = load_data()
+    
+    legislators = legislators_data.get('legislators', legislators_data)
+    bills = bills_data.get('bills', bills_data)
+    
+    print(f"  {len(legislators)} legislators")
+    print(f"  {len(bills)} bills")
+    
+    # Get contested bills (6+ nay votes)
+    with run.span('parse'):
+        contested_bills = get_contested_bills(bills, min_nays=6)
+    print(f"  {len(contested_bills)} contested bills (6+ nay votes)")
+    
+    # Auto-discover org positions
+    print("\nDiscovering org positions...")
+    with run.span('parse'):
+        org_positions = discover_org_positions(bills)
+    print(f"  {len(org_positions)} organizations with Support/Oppose positions")
+    
+    # Build legislator data with BOTH alignment types
+    print("\nCalculating alignments (all + contested-only)...")
+    with run.span('analyze'):
+        compare_legislators, total_votes = build_compare_legislators(
+            legislators, org_positions, contested_bills
+        )
+    
     # Build output
     compare_data = {
         'organizations': {org_id: {k: v for k, v in org.items() if k != 'positions'} 
@@ -218,8 +243,9 @@ def generate_compare_data():
     
     # Save
     output_path = '../utah-tracker-public/data/compare_data.json'
-    with open(output_path, 'w') as f:
-        json.dump(compare_data, f, indent=2)
+    with run.span('serialize'):
+        with open(output_path, 'w') as f:
+            json.dump(compare_data, f, indent=2)
     
     print(f"\n✅ Generated compare_data.json")
     print(f"   {len(compare_legislators)} legislators")
@@ -241,8 +267,10 @@ def generate_compare_data():
         con_pct = f"{con_align.get('alignment', 0)}% ({con_align.get('billsCompared', 0)})" if con_align else "N/A"
         
         print(f"  {org_positions[org_id]['name']:<25} {all_pct:>12} {con_pct:>12}")
+    
+    run.finish()
 
-if __name__ == '__main__':
+def main():
     print("="*60)
     print("COMPARE DATA GENERATOR (with Contested Filter)")
     print("="*60)
@@ -252,3 +280,7 @@ if __name__ == '__main__':
     print("\n" + "="*60)
     print("✅ COMPLETE")
     print("="*60)
+
+
+if __name__ == '__main__':
+    main()
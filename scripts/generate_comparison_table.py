@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Generate comparison_table.json - precomputed entity alignments
+Usage:
+  python3 scripts/generate_comparison_table.py            # write data/comparison_table.json
+  python3 scripts/generate_comparison_table.py --check    # verify against calculate_alignment
+
+js/comparison-engine.js builds its ideology templates from all of
+bills.json and compares entities pairwise in the browser. This stage
+builds the templates from data/org_ideology.json scores, then computes
+every org-vs-org, org-vs-legislator, template-vs-org and
+template-vs-legislator alignment once. No page loads the table yet.
+
+A legislator who voted yea and nay on different roll calls of one bill
+counts as yea, as in generate_compare_data.calculate_alignment and
+ComparisonEngine.getLegislatorPositions. --check recomputes every
+org-vs-legislator cell with calculate_alignment and compares the two.
+"""
+
+import json
+import sys
+from datetime import datetime
+
+import pipeline_metrics
+from org_matrix import IDEOLOGY_ALIASES, OrgPositionMatrix, popcount
+
+BILLS_FILE = 'data/bills.json'
+LEGISLATORS_FILE = 'data/legislators.json'
+IDEOLOGY_FILE = 'data/org_ideology.json'
+OUTPUT_FILE = 'data/comparison_table.json'
+
+# Ideology templates: which orgs (by org_ideology.json entry) speak for each
+# template, and how many of them must take a position on a bill.
+TEMPLATES = {
+    'progressive': {'members': lambda o: o['ideology_score'] <= -0.5, 'min_orgs': 2},
+    'conservative': {'members': lambda o: o['ideology_score'] >= 0.5, 'min_orgs': 1},
+    'libertarian': {'members': lambda o: 'libertarian' in o['ideology'].lower(), 'min_orgs': 1},
+}
+
+# Moderate = strong consensus across every scored org
+MODERATE_MIN_ORGS = 3
+MODERATE_CONSENSUS = 0.7
+
+
+def load_ideology():
+    with open(IDEOLOGY_FILE, 'r') as f:
+        orgs = json.load(f)['organizations']
+    for o in orgs:
+        o['field_name'] = IDEOLOGY_ALIASES.get(o['field_name'], o['field_name'])
+    return orgs
+
+
+def majority_template(matrix, members, min_orgs):
+    """(support_bits, oppose_bits) where member orgs' majority lands"""
+    members = [m for m in members if m in matrix.masks]
+    sup_bits = opp_bits = 0
+    for j in range(len(matrix.bills)):
+        sup = sum(matrix.masks[m][0] >> j & 1 for m in members)
+        opp = sum(matrix.masks[m][1] >> j & 1 for m in members)
+        if sup + opp < min_orgs:
+            continue
+        if sup > opp:
+            sup_bits |= 1 << j
+        elif opp > sup:
+            opp_bits |= 1 << j
+    return sup_bits, opp_bits
+
+
+def consensus_template(matrix, members, min_orgs, consensus):
+    """(support_bits, oppose_bits) where members agree at least `consensus`"""
+    members = [m for m in members if m in matrix.masks]
+    sup_bits = opp_bits = 0
+    for j in range(len(matrix.bills)):
+        sup = sum(matrix.masks[m][0] >> j & 1 for m in members)
+        opp = sum(matrix.masks[m][1] >> j & 1 for m in members)
+        total = sup + opp
+        if total < min_orgs:
+            continue
+        if sup / total >= consensus:
+            sup_bits |= 1 << j
+        elif opp / total >= consensus:
+            opp_bits |= 1 << j
+    return sup_bits, opp_bits
+
+
+def build_templates(matrix, ideology):
+    templates = {}
+    for name, spec in TEMPLATES.items():
+        members = [o['field_name'] for o in ideology if spec['members'](o)]
+        templates[name] = majority_template(matrix, members, spec['min_orgs'])
+    scored = [o['field_name'] for o in ideology]
+    templates['moderate'] = consensus_template(
+        matrix, scored, MODERATE_MIN_ORGS, MODERATE_CONSENSUS
+    )
+    return templates
+
+
+def legislator_masks(matrix, legislators):
+    """{name: (yea_bits, nay_bits)} over the matrix's bill ordinals"""
+    masks = {}
+    for name, leg in legislators.items():
+        yea = nay = 0
+        for bill in leg.get('yea_votes', []):
+            j = matrix.bill_index.get(bill)
+            if j is not None:
+                yea |= 1 << j
+        for bill in leg.get('nay_votes', []):
+            j = matrix.bill_index.get(bill)
+            if j is not None:
+                nay |= 1 << j
+        masks[name] = (yea, nay & ~yea)     # yea wins, as in calculate_alignment
+    return masks
+
+
+def compare_masks(a, b):
+    """(compared, agreements) between two (support_bits, oppose_bits) pairs"""
+    sup_a, opp_a = a
+    sup_b, opp_b = b
+    compared = popcount((sup_a | opp_a) & (sup_b | opp_b))
+    agreements = popcount(sup_a & sup_b) + popcount(opp_a & opp_b)
+    return compared, agreements
+
+
+def build_table(matrix, legislators, ideology):
+    templates = build_templates(matrix, ideology)
+    leg_masks = legislator_masks(matrix, legislators)
+
+    entities = (
+        [('organization', org, matrix.masks[org]) for org in matrix.orgs]
+        + [('ideology', name, bits) for name, bits in templates.items()]
+        + [('legislator', name, bits) for name, bits in sorted(leg_masks.items())]
+    )
+
+    # Every pair except legislator-vs-legislator
+    pairs = []
+    for i, (type_a, _, bits_a) in enumerate(entities):
+        for j in range(i + 1, len(entities)):
+            type_b, _, bits_b = entities[j]
+            if type_a == type_b == 'legislator':
+                continue
+            compared, agreements = compare_masks(bits_a, bits_b)
+            if compared:
+                pairs.append([i, j, compared, agreements])
+
+    return {
+        'generated_date': datetime.now().isoformat(),
+        'totalBills': len(matrix.bills),
+        'entities': [[etype, eid] for etype, eid, _ in entities],
+        'templates': {
+            name: {
+                'support': matrix.bills_in(sup),
+                'oppose': matrix.bills_in(opp),
+            }
+            for name, (sup, opp) in templates.items()
+        },
+        # [entity_a, entity_b, billsCompared, agreements]
+        'pairs': pairs,
+    }
+
+
+def check(matrix, legislators):
+    """[(org, legislator, table cell, calculate_alignment cell)] that differ"""
+    from generate_compare_data import calculate_alignment
+
+    leg_masks = legislator_masks(matrix, legislators)
+    failures = []
+    for org in matrix.orgs:
+        positions = matrix.positions(org)
+        for name, leg in legislators.items():
+            _, agrees, _, total = calculate_alignment(leg.get('yea_votes', []), leg.get('nay_votes', []), positions)
+            got = compare_masks(matrix.masks[org], leg_masks[name])
+            if got != (total, agrees):
+                failures.append((org, name, got, (total, agrees)))
+    return failures
+
+
+def main():
+    print("=" * 60)
+    print("COMPARISON TABLE GENERATOR")
+    print("=" * 60)
+    run = pipeline_metrics.start_run('generate_comparison_table')
+
+    with run.span('load'):
+        matrix = OrgPositionMatrix.load(BILLS_FILE)
+        with open(LEGISLATORS_FILE, 'r') as f:
+            legislators_data = json.load(f)
+        legislators = legislators_data.get('legislators', legislators_data)
+        ideology = load_ideology()
+
+    if '--check' in sys.argv:
+        failures = check(matrix, legislators)
+        for org, name, got, expected in failures[:10]:
+            print(f"  ❌ {org} vs {name}: table {got[1]}/{got[0]}, calculate_alignment {expected[1]}/{expected[0]}")
+        cells = len(matrix.orgs) * len(legislators)
+        print(f"\n{'✅' if not failures else '❌'} {cells - len(failures)}/{cells} "
+              f"org-vs-legislator cells match calculate_alignment")
+        sys.exit(1 if failures else 0)
+
+    with run.span('analyze'):
+        table = build_table(matrix, legislators, ideology)
+
+    with run.span('serialize'):
+        with open(OUTPUT_FILE, 'w') as f:
+            json.dump(table, f, separators=(',', ':'))
+
+    for name, t in table['templates'].items():
+        print(f"  {name:<13} {len(t['support']):>4} support / {len(t['oppose']):>4} oppose")
+    print(f"\n✅ Saved {OUTPUT_FILE}: {len(table['entities'])} entities, "
+          f"{len(table['pairs'])} precomputed comparisons")
+    run.finish()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Ingest Roll Calls - Fetch floor votes and regenerate every vote-derived artifact
+Usage:
+  python3 scripts/ingest_roll_calls.py              # fetch new roll calls, rewrite what changed
+  python3 scripts/ingest_roll_calls.py --offline    # no network: rebuild from data/votes + caches
+  python3 scripts/ingest_roll_calls.py --workers 8
+
+Five artifacts are derived from the roll calls:
+  - data/votes/<BILL>.json       {vote_id: roll call} per bill
+  - legislators.json             yea_votes / nay_votes per legislator
+  - bills.json                   house/senate_votes_for/against
+  - data/votes_summary.json      vote_count / has_roll_call per bill
+  - data/legislator_alignments.json  per-org agreement on contested votes
+This stage owns all of them, so they cannot drift apart.
+
+Roll calls are found through each bill's status page (the voteid= links
+bill_timeline.py already parses). Only vote IDs not already in
+data/votes are fetched, over a small thread pool, and every page is
+cached under cache/roll_calls/. Bills whose status shows they can no
+longer get a floor vote keep their cached status page; others are
+re-checked. The existing vote files are the base, so a new vote is one
+fetch plus one rewritten vote file.
+
+derive() then makes a single pass over all roll calls and builds every
+artifact from the same in-memory structure. Files are only rewritten
+when their content changes.
+"""
+
+import argparse
+import json
+import os
+import re
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from html import unescape
+from urllib.parse import urljoin
+
+import pipeline_metrics
+from alignment_intervals import alignment_interval
+from bill_timeline import DIED, classify, fetch_status_html, parse_actions, status_cache_path
+from records import RecordError, RollCall
+
+BILLS_FILE = 'data/bills.json'
+LEGISLATORS_FILE = 'data/legislators.json'
+VOTES_DIR = 'data/votes'
+SUMMARY_FILE = 'data/votes_summary.json'
+ALIGNMENTS_FILE = 'data/legislator_alignments.json'
+CACHE_DIR = 'cache/roll_calls'
+SESSION = '2025GS'
+
+FETCH_WORKERS = 4
+CONTESTED_SHARE = 0.2   # a roll call is contested when at least 20% voted nay
+
+# Status text after which a bill cannot get another floor vote
+NO_MORE_VOTES = ('governor', 'filed', 'became law')
+
+_VOTE_LINK_RE = re.compile(r'href=["\']([^"\']*voteid=(\d+)[^"\']*)["\']', re.I)
+_TALLY_RE = re.compile(r'\b(Yeas|Nays|Absent or not voting|Not voting|Absent)\s*[-:]\s*(\d+)', re.I)
+_CELL_RE = re.compile(r'<td[^>]*>(.*?)</td>', re.S | re.I)
+
+
+# -- Fetching ------------------------------------------------------------------
+
+def vote_cache_path(house, vote_id, session=SESSION):
+    """Where a fetched roll call page is cached on disk"""
+    return os.path.join(CACHE_DIR, session, f'{house}{vote_id}.html')
+
+
+def vote_url(house, vote_id, session=SESSION):
+    return f"https://le.utah.gov/DynaBill/svotes.jsp?sessionid={session}&voteid={vote_id}&house={house}"
+
+
+def fetch_vote_html(house, vote_id, url=None, bill=None, offline=False):
+    """Fetch one roll call page (cached on disk); safe to call from threads"""
+    run = pipeline_metrics.current()
+    cache_path = vote_cache_path(house, vote_id)
+    if os.path.exists(cache_path):
+        run.cache_hit('roll_call')
+        with open(cache_path, 'r') as f:
+            return f.read()
+    run.cache_miss('roll_call')
+    if offline:
+        return None
+
+    r = run.http_get(url or vote_url(house, vote_id), timeout=15, bill=bill)
+    if r is not None and r.status_code == 200:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp = f'{cache_path}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            f.write(r.text)
+        os.replace(tmp, cache_path)
+        run.sleep(0.3, bill)
+        return r.text
+    run.error('not_found' if r is not None else 'fetch_failed', bill)
+    return None
+
+
+def can_get_votes(bill):
+    status = (bill.get('status') or '').lower()
+    return not any(s in status for s in NO_MORE_VOTES)
+
+
+def discover_votes(bill, offline=False):
+    """[(house, vote_id, url, is_final)] floor votes listed on a bill's status page"""
+    number = bill['bill_number']
+    was_cached = os.path.exists(status_cache_path(number))
+    html = fetch_status_html(number, bill.get('url'), offline=offline,
+                             refresh=was_cached and can_get_votes(bill))
+    if not html:
+        return []
+    if not was_cached and not offline:
+        pipeline_metrics.current().sleep(0.3, number)
+
+    base = bill.get('url') or f"https://le.utah.gov/~2025/bills/static/{number}.html"
+    links = {vote_id: urljoin(base, unescape(href)) for href, vote_id in _VOTE_LINK_RE.findall(html)}
+    found = []
+    for _, action, _, vote in parse_actions(html):
+        if not vote or classify(action) == 'committee':
+            continue
+        house, vote_id = vote
+        text = action.lower()
+        is_final = 'reading' in text or 'concur' in text or classify(action) == DIED
+        found.append((house, vote_id, links.get(vote_id), is_final))
+    return found
+
+
+def _names(fragment):
+    cells = [re.sub(r'\s+', ' ', unescape(re.sub(r'<[^>]+>', ' ', c))).strip()
+             for c in _CELL_RE.findall(fragment)]
+    if not cells:
+        text = unescape(re.sub(r'<[^>]+>', '\n', fragment))
+        cells = [line.strip() for line in text.splitlines()]
+    return [c for c in cells if c and not _TALLY_RE.search(c)]
+
+
+def parse_vote_page(html):
+    """{'yeas': [...], 'nays': [...]} from a roll call page, or None
+
+    The page lists names under "Yeas - N", "Nays - N" and "Absent or not
+    voting - N" headings; the names under each must add up to its N.
+    """
+    tallies = list(_TALLY_RE.finditer(html or ''))
+    result = {}
+    for i, m in enumerate(tallies):
+        kind = m.group(1).lower()
+        if kind not in ('yeas', 'nays') or kind in result:
+            continue
+        end = tallies[i + 1].start() if i + 1 < len(tallies) else len(html)
+        names = _names(html[m.end():end])
+        if len(names) != int(m.group(2)):
+            return None
+        result[kind] = names
+    if 'yeas' not in result or 'nays' not in result:
+        return None
+    return result
+
+
+def fetch_roll_calls(jobs, offline=False, workers=FETCH_WORKERS):
+    """Yield (bill, roll call dict or None) for (bill, house, vote_id, url, is_final) jobs"""
+    run = pipeline_metrics.current()
+
+    def fetch(job):
+        bill, house, vote_id, url, is_final = job
+        with run.span('fetch', bill):
+            html = fetch_vote_html(house, vote_id, url, bill, offline)
+        if html is None:
+            return bill, None
+        with run.span('parse', bill):
+            parsed = parse_vote_page(html)
+        if parsed is None:
+            run.error('vote_parse', bill, f'{house}{vote_id}')
+            return bill, None
+        record = {
+            'vote_id': vote_id,
+            'house': house,
+            'type': 'floor_vote',
+            'is_final': is_final,
+            'yeas': parsed['yeas'],
+            'nays': parsed['nays'],
+            'yeas_count': len(parsed['yeas']),
+            'nays_count': len(parsed['nays']),
+        }
+        try:
+            RollCall.from_dict({'bill': bill, **record}, f'{bill}:{vote_id}')
+        except RecordError as e:
+            run.error('vote_invalid', bill, str(e))
+            return bill, None
+        return bill, record
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(fetch, jobs)
+
+
+# -- Deriving ------------------------------------------------------------------
+
+def surname_key(name):
+    """Match key for a roll call name or a "Last, First" legislator name
+
+    Roll call pages list surnames only, and some older vote files drop a
+    Mc/Mac prefix ("Cay" for McCay), so both sides compare without it.
+    """
+    surname = name.split(',')[0].strip()
+    return re.sub(r'^Ma?c(?=[A-Z])', '', surname).lower()
+
+
+def _initial(name):
+    parts = name.split(',', 1)
+    return parts[1].strip()[:1].upper() if len(parts) > 1 else ''
+
+
+def derive(votes, legislators, bills, organizations):
+    """Every vote-derived artifact from one pass over the roll calls
+
+    votes: {bill: {vote_id: roll call}}, legislators: legislators.json
+    records by name, bills: bills.json records, organizations: the
+    bills.json organization list. Returns a dict of plain values.
+
+    Roll calls name members by surname, so members of one chamber who
+    share a surname (three House Petersons) all get the vote unless the
+    page adds an initial; those matches are counted as ambiguous.
+    """
+    by_key = defaultdict(list)
+    for name, leg in legislators.items():
+        by_key[(leg.get('chamber', '')[:1], surname_key(name))].append(name)
+
+    org_fields = [(f"{o['field_name']}_position", o) for o in organizations]
+    stances = {}
+    for bill in bills:
+        stances[bill['bill_number']] = [(field, bill[field] == 'Support') for field, _ in org_fields
+                                        if bill.get(field) in ('Support', 'Oppose')]
+
+    yea, nay = defaultdict(set), defaultdict(set)
+    total, contested = Counter(), Counter()
+    agree = defaultdict(Counter)          # legislator -> {org field: matches}
+    disagree = defaultdict(Counter)
+    tallies = {}                          # bill -> [house for, house against, senate for, senate against]
+    unmatched, ambiguous = Counter(), 0
+
+    for number, calls in votes.items():
+        counts = tallies.setdefault(number, [0, 0, 0, 0])
+        positions = stances.get(number, [])
+        for call in calls.values():
+            house = call['house']
+            yeas, nays = call.get('yeas_count', 0), call.get('nays_count', 0)
+            offset = 0 if house == 'H' else 2
+            counts[offset] = max(counts[offset], yeas)
+            counts[offset + 1] = max(counts[offset + 1], nays)
+            is_contested = yeas + nays > 0 and nays / (yeas + nays) >= CONTESTED_SHARE
+
+            cast = {}                     # legislator -> voted yea (yea wins if listed both ways)
+            for voted_yea, names in ((False, call.get('nays', [])), (True, call.get('yeas', []))):
+                for vote_name in names:
+                    members = by_key.get((house, surname_key(vote_name)))
+                    if not members:
+                        unmatched[vote_name] += 1
+                        continue
+                    initial = _initial(vote_name)
+                    if initial:
+                        members = [m for m in members if _initial(m) == initial] or members
+                    if len(members) > 1:
+                        ambiguous += 1
+                    for member in members:
+                        (yea if voted_yea else nay)[member].add(number)
+                        cast[member] = voted_yea or cast.get(member, False)
+
+            for member, voted_yea in cast.items():
+                total[member] += 1
+                if not is_contested:
+                    continue
+                contested[member] += 1
+                for field, supports in positions:
+                    if supports == voted_yea:
+                        agree[member][field] += 1
+                    else:
+                        disagree[member][field] += 1
+
+    alignments = {}
+    for name, leg in legislators.items():
+        if not total[name]:
+            continue
+        orgs = {}
+        for field, org in sorted(org_fields, key=lambda f: f[0]):
+            matches, disagrees = agree[name][field], disagree[name][field]
+            if matches + disagrees:
+                low, high, reliable = alignment_interval(matches, matches + disagrees)
+                orgs[field] = {
+                    'name': org['name'],
+                    'emoji': org.get('emoji', '📋'),
+                    'matches': matches,
+                    'disagrees': disagrees,
+                    'total': matches + disagrees,
+                    'alignment': round(matches / (matches + disagrees) * 100, 1),
+                    'alignment_low': low,
+                    'alignment_high': high,
+                    'reliable': reliable,
+                }
+        alignments[leg['id']] = {
+            'total_votes': total[name],
+            'contested_votes': contested[name],
+            'organizations': orgs,
+            'name': leg.get('formatted_name', name),
+            'party': leg.get('party', ''),
+            'chamber': leg.get('chamber', ''),
+            'district': leg.get('district', ''),
+        }
+
+    return {
+        'yea_votes': {name: sorted(yea[name]) for name in legislators},
+        'nay_votes': {name: sorted(nay[name]) for name in legislators},
+        'tallies': tallies,
+        'summary': {
+            b['bill_number']: {
+                'vote_count': len(votes.get(b['bill_number'], {})),
+                'has_roll_call': bool(votes.get(b['bill_number'])),
+            }
+            for b in bills
+        },
+        'alignments': alignments,
+        'unmatched': unmatched,
+        'ambiguous': ambiguous,
+    }
+
+
+# -- Files ---------------------------------------------------------------------
+
+def load_votes():
+    votes = {}
+    if not os.path.isdir(VOTES_DIR):
+        return votes
+    for filename in sorted(os.listdir(VOTES_DIR)):
+        if filename.endswith('.json'):
+            with open(os.path.join(VOTES_DIR, filename), 'r') as f:
+                votes[filename[:-5]] = json.load(f)
+    return votes
+
+
+def write_if_changed(path, text):
+    """Write text unless the file already holds exactly that; True if written"""
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            if f.read() == text:
+                return False
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        f.write(text)
+    os.replace(tmp, path)
+    return True
+
+
+def apply(derived, bills_data, legislators_data):
+    """Fold derived vote fields into the bills.json / legislators.json payloads"""
+    for name, leg in legislators_data['legislators'].items():
+        leg['yea_votes'] = derived['yea_votes'][name]
+        leg['nay_votes'] = derived['nay_votes'][name]
+    for bill in bills_data['bills']:
+        counts = derived['tallies'].get(bill['bill_number'], [0, 0, 0, 0])
+        bill['house_votes_for'], bill['house_votes_against'] = counts[0], counts[1]
+        bill['senate_votes_for'], bill['senate_votes_against'] = counts[2], counts[3]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fetch roll calls and regenerate vote-derived data')
+    parser.add_argument('--offline', action='store_true', help='use only data/votes and cached pages')
+    parser.add_argument('--workers', type=int, default=FETCH_WORKERS, help='concurrent fetches')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("INGEST ROLL CALLS")
+    print("=" * 60)
+    run = pipeline_metrics.start_run('ingest_roll_calls')
+
+    with run.span('load'):
+        with open(BILLS_FILE, 'r') as f:
+            bills_data = json.load(f)
+        with open(LEGISLATORS_FILE, 'r') as f:
+            legislators_data = json.load(f)
+        votes = load_votes()
+    bills = bills_data['bills']
+    known = sum(len(v) for v in votes.values())
+    print(f"  {known} roll calls on {len(votes)} bills already in {VOTES_DIR}/")
+
+    # Status pages -> vote IDs not yet in data/votes
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        listed = list(pool.map(lambda b: discover_votes(b, args.offline), bills))
+    jobs = []
+    for bill, found in zip(bills, listed):
+        have = votes.get(bill['bill_number'], {})
+        for house, vote_id, url, is_final in found:
+            if vote_id not in have:
+                jobs.append((bill['bill_number'], house, vote_id, url, is_final))
+
+    changed_bills, added = set(), 0
+    if jobs:
+        print(f"  Fetching {len(jobs)} new roll calls ({args.workers} workers)...")
+        for number, record in fetch_roll_calls(jobs, args.offline, args.workers):
+            if record is not None:
+                votes.setdefault(number, {})[record['vote_id']] = record
+                changed_bills.add(number)
+                added += 1
+    run.count('roll_calls_added', added)
+
+    with run.span('analyze'):
+        derived = derive(votes, legislators_data['legislators'], bills, bills_data.get('organizations', []))
+        apply(derived, bills_data, legislators_data)
+
+    with run.span('serialize'):
+        os.makedirs(VOTES_DIR, exist_ok=True)
+        written = []
+        for number in sorted(changed_bills):
+            if write_if_changed(os.path.join(VOTES_DIR, f'{number}.json'), json.dumps(votes[number])):
+                written.append(f'{VOTES_DIR}/{number}.json')
+        outputs = [
+            (BILLS_FILE, json.dumps(bills_data, indent=2)),
+            (LEGISLATORS_FILE, json.dumps(legislators_data, indent=2)),
+            (SUMMARY_FILE, json.dumps(derived['summary'])),
+            (ALIGNMENTS_FILE, json.dumps(derived['alignments'], indent=2)),
+        ]
+        written += [path for path, text in outputs if write_if_changed(path, text)]
+
+    if derived['unmatched']:
+        run.count('unmatched_names', sum(derived['unmatched'].values()))
+        print(f"  ⚠️  Names matching no legislator: {', '.join(sorted(derived['unmatched']))}")
+    if derived['ambiguous']:
+        run.count('ambiguous_names', derived['ambiguous'])
+        print(f"  ⚠️  {derived['ambiguous']} roll call names matched several members sharing a surname")
+    run.count('files_written', len(written))
+    print(f"  {added} roll calls added; {len(written)} file(s) rewritten")
+    for path in written[:10]:
+        print(f"    {path}")
+    if len(written) > 10:
+        print(f"    ... and {len(written) - 10} more")
+    print(f"\n✅ Vote-derived data is up to date")
+    run.finish()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Org Position Matrix - Compact org x bill positions with cached coalition analytics
+Usage: python3 scripts/org_matrix.py     # writes data/org_analytics.json
+
+bills.json stores org positions as sparse `<org>_position` string columns.
+OrgPositionMatrix scans them once into one int8 row per org (array('b'))
+plus Support/Oppose bitsets, so agreement rates, coalitions, per-bill
+sides and ideology placement are set operations instead of nested scans.
+"""
+
+import json
+from array import array
+from datetime import datetime
+from functools import cached_property
+
+from artifact_index import open_index
+
+BILLS_FILE = 'data/bills.json'
+IDEOLOGY_FILE = 'data/org_ideology.json'
+OUTPUT_FILE = 'data/org_analytics.json'
+
+# int8 position codes
+NONE = 0
+SUPPORT = 1
+OPPOSE = -1
+WATCHING = 2   # any other tracked stance (Watching, Neutral, Monitor, Amend...)
+
+CODE_NAMES = {SUPPORT: 'Support', OPPOSE: 'Oppose', WATCHING: 'Watching'}
+
+# org_ideology.json uses a few different field names than bills.json
+# (the mismatch DYNAMIC_LOADING_GUIDE.md warns about)
+IDEOLOGY_ALIASES = {
+    'aclu_utah': 'aclu_of_utah',
+    'libertas_institute': 'libertas',
+    'rwau': 'rural_water_association_of_utah',
+    'upea': 'utah_public_employees_association',
+    'upha': 'utah_public_health_association',
+}
+
+
+def position_code(value):
+    """Map a free-text position string to its int8 code"""
+    if not value:
+        return NONE
+    v = value.strip().lower()
+    if v == 'support':
+        return SUPPORT
+    if v == 'oppose':
+        return OPPOSE
+    return WATCHING
+
+
+def org_fields(bill):
+    """The org position fields present on a bill record"""
+    return [k for k in bill if k.endswith('_position') and k != 'author_position']
+
+
+def popcount(x):
+    return x.bit_count()
+
+
+class OrgPositionMatrix:
+    """org x bill int8 position matrix with cached analytics"""
+
+    def __init__(self, orgs, bills, rows):
+        self.orgs = orgs                  # org ids (field name without _position)
+        self.bills = bills                # bill numbers, column order
+        self.rows = rows                  # {org: array('b') of len(bills)}
+        self.bill_index = {b: i for i, b in enumerate(bills)}
+
+    @classmethod
+    def from_bills(cls, bills):
+        """Build the matrix in one pass over bill records"""
+        bills = list(bills)
+        numbers = [b['bill_number'] for b in bills]
+
+        fields = set()
+        for bill in bills:
+            fields.update(org_fields(bill))
+        orgs = sorted(f[:-len('_position')] for f in fields)
+
+        rows = {org: array('b', bytes(len(numbers))) for org in orgs}
+        for j, bill in enumerate(bills):
+            for field in org_fields(bill):
+                code = position_code(bill[field])
+                if code:
+                    rows[field[:-len('_position')]][j] = code
+        return cls(orgs, numbers, rows)
+
+    @classmethod
+    def load(cls, bills_file=BILLS_FILE):
+        """Build from bills.json, parsing only bill numbers and position fields"""
+        index = open_index(bills_file, 'bills', key_field='bill_number')
+        return cls.from_bills(index.iter_records(
+            fields=lambda k: k == 'bill_number' or k.endswith('_position')
+        ))
+
+    # -- Bitsets ------------------------------------------------------------
+
+    @cached_property
+    def masks(self):
+        """{org: (support_bits, oppose_bits)} over bill ordinals"""
+        masks = {}
+        for org, row in self.rows.items():
+            sup = opp = 0
+            for j, code in enumerate(row):
+                if code == SUPPORT:
+                    sup |= 1 << j
+                elif code == OPPOSE:
+                    opp |= 1 << j
+            masks[org] = (sup, opp)
+        return masks
+
+    def bills_in(self, bits):
+        """Bill numbers whose bit is set in `bits`"""
+        return [self.bills[j] for j in range(len(self.bills)) if bits >> j & 1]
+
+    # -- Lookups ------------------------------------------------------------
+
+    def positions(self, org):
+        """{bill: 'Support'|'Oppose'} for one org (Watching excluded)"""
+        row = self.rows[org]
+        return {self.bills[j]: CODE_NAMES[c] for j, c in enumerate(row) if c in (SUPPORT, OPPOSE)}
+
+    def bill_positions(self, bill):
+        """{org: 'Support'|'Oppose'} for one bill"""
+        j = self.bill_index[bill]
+        return {org: CODE_NAMES[self.rows[org][j]] for org in self.orgs
+                if self.rows[org][j] in (SUPPORT, OPPOSE)}
+
+    def counts(self, org):
+        sup, opp = self.masks[org]
+        return popcount(sup), popcount(opp)
+
+    # -- Analytics (cached) --------------------------------------------------
+
+    @cached_property
+    def agreement(self):
+        """{(org_a, org_b): {shared, agree, rate}} for orgs sharing a bill"""
+        result = {}
+        for i, a in enumerate(self.orgs):
+            sup_a, opp_a = self.masks[a]
+            for b in self.orgs[i + 1:]:
+                sup_b, opp_b = self.masks[b]
+                shared = popcount((sup_a | opp_a) & (sup_b | opp_b))
+                if not shared:
+                    continue
+                agree = popcount(sup_a & sup_b) + popcount(opp_a & opp_b)
+                stats = {'shared': shared, 'agree': agree, 'rate': round(agree / shared, 3)}
+                result[(a, b)] = result[(b, a)] = stats
+        return result
+
+    def coalitions(self, threshold=0.75, min_shared=3):
+        """Average-linkage clusters of orgs that agree at least `threshold`
+
+        Pairs with fewer than `min_shared` common bills don't count toward
+        the average. Returns clusters sorted by size.
+        """
+        key = (threshold, min_shared)
+        cache = self.__dict__.setdefault('_coalitions', {})
+        if key in cache:
+            return cache[key]
+
+        def link(c1, c2):
+            rates = [self.agreement[(a, b)]['rate'] for a in c1 for b in c2
+                     if (a, b) in self.agreement and self.agreement[(a, b)]['shared'] >= min_shared]
+            return sum(rates) / len(rates) if rates else None
+
+        clusters = [[org] for org in self.orgs if any(self.counts(org))]
+        while True:
+            best = None
+            for i in range(len(clusters)):
+                for j in range(i + 1, len(clusters)):
+                    score = link(clusters[i], clusters[j])
+                    if score is not None and score >= threshold and (best is None or score > best[0]):
+                        best = (score, i, j)
+            if best is None:
+                break
+            _, i, j = best
+            clusters[i] = sorted(clusters[i] + clusters[j])
+            del clusters[j]
+
+        result = []
+        for c in sorted(clusters, key=len, reverse=True):
+            others = [o for o in self.orgs if o not in c]
+            opponents = sorted(
+                (o for o in others if link(c, [o]) is not None and link(c, [o]) < 1 - threshold),
+                key=lambda o: link(c, [o]),
+            )
+            result.append({
+                'members': c,
+                'cohesion': round(link(c, c), 3) if len(c) > 1 and link(c, c) is not None else None,
+                'opponents': opponents,
+            })
+        cache[key] = result
+        return result
+
+    def opposition(self, org, limit=5):
+        """The orgs `org` most often disagrees with"""
+        pairs = [(b, s) for (a, b), s in self.agreement.items() if a == org]
+        pairs.sort(key=lambda p: (p[1]['rate'], -p[1]['shared']))
+        return [{'org': b, **s} for b, s in pairs[:limit]]
+
+    @cached_property
+    def sides(self):
+        """{bill: {support: [...], oppose: [...], watching: [...], contested}}"""
+        table = {}
+        for j, bill in enumerate(self.bills):
+            support, oppose, watching = [], [], []
+            for org in self.orgs:
+                code = self.rows[org][j]
+                if code == SUPPORT:
+                    support.append(org)
+                elif code == OPPOSE:
+                    oppose.append(org)
+                elif code == WATCHING:
+                    watching.append(org)
+            if support or oppose or watching:
+                table[bill] = {
+                    'support': support,
+                    'oppose': oppose,
+                    'watching': watching,
+                    'contested': bool(support and oppose),
+                }
+        return table
+
+    def ideology_placement(self, ideology_file=IDEOLOGY_FILE, tolerance=0.5):
+        """Place every org on the ideology scale from its agreement pattern
+
+        Each org's position-derived score is the agreement-weighted average
+        of the declared scores of the orgs it shares bills with (weight =
+        (2*rate - 1) * shared). Orgs whose declared score in org_ideology.json
+        differs by more than `tolerance`, or has the opposite sign, are flagged.
+        """
+        with open(ideology_file, 'r') as f:
+            declared = {
+                IDEOLOGY_ALIASES.get(o['field_name'], o['field_name']): o['ideology_score']
+                for o in json.load(f)['organizations']
+            }
+
+        placement = {}
+        for org in self.orgs:
+            num = den = 0.0
+            for other, score in declared.items():
+                stats = self.agreement.get((org, other))
+                if not stats:
+                    continue
+                weight = (2 * stats['rate'] - 1) * stats['shared']
+                num += weight * score
+                den += abs(weight)
+            derived = round(num / den, 3) if den else None
+            stated = declared.get(org)
+            flagged = (
+                derived is not None and stated is not None
+                and (abs(derived - stated) > tolerance or derived * stated < 0)
+            )
+            placement[org] = {
+                'declared': stated,
+                'derived': derived,
+                'delta': round(derived - stated, 3) if derived is not None and stated is not None else None,
+                'flagged': flagged,
+            }
+
+        missing = sorted(set(declared) - set(self.orgs))
+        return placement, missing
+
+
+def build_analytics(matrix):
+    """Assemble the org_analytics.json payload"""
+    placement, unmatched = matrix.ideology_placement()
+    return {
+        'generated_date': datetime.now().isoformat(),
+        'totalBills': len(matrix.bills),
+        'organizations': {
+            org: {
+                'supportCount': matrix.counts(org)[0],
+                'opposeCount': matrix.counts(org)[1],
+                'ideology': placement[org],
+                'topOpposition': matrix.opposition(org, limit=3),
+            }
+            for org in matrix.orgs
+        },
+        'agreement': {
+            f'{a}|{b}': stats for (a, b), stats in matrix.agreement.items() if a < b
+        },
+        'coalitions': matrix.coalitions(),
+        'sides': {bill: s for bill, s in matrix.sides.items() if s['support'] or s['oppose']},
+        'ideologyUnmatched': unmatched,
+    }
+
+
+def main():
+    print("=" * 60)
+    print("ORG POSITION MATRIX")
+    print("=" * 60)
+
+    matrix = OrgPositionMatrix.load()
+    print(f"  {len(matrix.orgs)} orgs x {len(matrix.bills)} bills")
+
+    analytics = build_analytics(matrix)
+    with open(OUTPUT_FILE, 'w') as f:
+        json.dump(analytics, f, indent=2)
+
+    print(f"\n🤝 Coalitions (avg agreement >= 75%):")
+    for c in analytics['coalitions']:
+        if len(c['members']) > 1:
+            print(f"   {', '.join(c['members'])} (cohesion {c['cohesion']})")
+
+    flagged = [o for o, p in analytics['organizations'].items() if p['ideology']['flagged']]
+    if flagged:
+        print(f"\n⚠️  Ideology score disagrees with voting pattern: {', '.join(flagged)}")
+    if analytics['ideologyUnmatched']:
+        print(f"   No positions in bills.json for: {', '.join(analytics['ideologyUnmatched'])}")
+
+    contested = sum(1 for s in analytics['sides'].values() if s['contested'])
+    print(f"\n✅ Saved {OUTPUT_FILE} ({contested} bills with orgs on both sides)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+PDF Text - Page-at-a-time text extraction for fiscal note PDFs
+Usage: python3 scripts/pdf_text.py file.pdf [--pages N]   # print extracted text
+
+iter_pages(path, max_pages) yields one string per page and stops after
+max_pages, so a huge or hostile PDF costs at most that many pages of
+work. pypdf is used when installed. Without it, a small stdlib reader
+handles what the legislature's fiscal note PDFs need:
+  - objects found by scanning for `N G obj` (no xref parsing), including
+    objects packed in /ObjStm object streams; those are only inflated
+    when a lookup misses the plain objects, one stream at a time
+  - the /Root -> /Pages -> /Kids page tree, in page order
+  - FlateDecode content streams, with every decompression capped at
+    MAX_STREAM_BYTES
+  - Tj/TJ/'/" text operators with literal or hex strings, decoded via
+    the font's /ToUnicode CMap when it has one
+A malformed file (MALFORMED_ERRORS, plus pypdf's own errors) stops at
+the page that fails, keeping the pages before it, and the reason is
+appended to the caller's `errors` list. Any other exception is a reader
+bug and propagates.
+"""
+
+import mmap
+import re
+import sys
+import zlib
+from functools import lru_cache
+
+MAX_STREAM_BYTES = 4 * 1024 * 1024
+MAX_TREE_DEPTH = 32
+MALFORMED_ERRORS = (ValueError, zlib.error)      # bad numbers, bad UTF-16, bad streams
+
+OBJ_HEADER = re.compile(rb'(?<![\d])(\d+)\s+(\d+)\s+obj\b')
+REF = re.compile(rb'(\d+)\s+\d+\s+R')
+ROOT_REF = re.compile(rb'/Root\s+(\d+)\s+\d+\s+R')
+
+
+def _inflate(data):
+    d = zlib.decompressobj()
+    try:
+        out = d.decompress(data, MAX_STREAM_BYTES)
+    except zlib.error:
+        return b''
+    return out
+
+
+class _Document:
+    """Just enough of a PDF object store to walk pages and read streams"""
+
+    def __init__(self, data):
+        self.data = data
+        self.offsets = {}
+        self.packed = {}            # object number -> bytes, from object streams
+        self.object_streams = None  # /ObjStm object numbers not unpacked yet, found on first miss
+        for m in OBJ_HEADER.finditer(data):
+            self.offsets[int(m.group(1))] = m.end()
+
+    def _raw(self, num):
+        """(dictionary bytes, raw stream bytes or None) of one object"""
+        if num in self.packed:
+            return self.packed[num], None
+        start = self.offsets.get(num)
+        if start is None:
+            return self._find_packed(num), None
+        end = self.data.find(b'endobj', start)
+        end = len(self.data) if end < 0 else end
+        body = self.data[start:end]
+        s = body.find(b'stream')
+        if s < 0:
+            return body, None
+        head = body[:s]
+        data_start = s + len(b'stream')
+        if body[data_start:data_start + 2] == b'\r\n':
+            data_start += 2
+        elif body[data_start:data_start + 1] in (b'\n', b'\r'):
+            data_start += 1
+        stop = body.rfind(b'endstream')
+        return head, body[data_start:stop if stop > 0 else len(body)]
+
+    def dictionary(self, num):
+        return self._raw(num)[0]
+
+    def stream(self, num):
+        head, raw = self._raw(num)
+        if raw is None:
+            return b''
+        if b'/FlateDecode' in head:
+            return _inflate(raw)
+        if b'/Filter' in head:
+            return b''              # other filters (images, LZW...) carry no text we use
+        return raw[:MAX_STREAM_BYTES]
+
+    def _find_packed(self, num):
+        """Bytes of an object packed in an object stream; b'' if there is none"""
+        if self.object_streams is None:
+            self.object_streams = [n for n in reversed(self.offsets)
+                                   if b'/ObjStm' in self._raw(n)[0]]
+        while num not in self.packed and self.object_streams:
+            self._unpack_object_stream(self.object_streams.pop())
+        return self.packed.get(num, b'')
+
+    def _unpack_object_stream(self, num):
+        head, _ = self._raw(num)
+        data = self.stream(num)
+        first = re.search(rb'/First\s+(\d+)', head)
+        count = re.search(rb'/N\s+(\d+)', head)
+        if not data or not first or not count:
+            return
+        first = int(first.group(1))
+        numbers = list(map(int, data[:first].split()))[:2 * int(count.group(1))]
+        pairs = list(zip(numbers[::2], numbers[1::2]))
+        for i, (obj_num, offset) in enumerate(pairs):
+            end = pairs[i + 1][1] if i + 1 < len(pairs) else len(data) - first
+            self.packed.setdefault(obj_num, data[first + offset:first + end])
+
+    def value(self, dictionary, key):
+        """Raw value bytes of /key in a dictionary (enough for refs, names, arrays)"""
+        m = re.search(rb'/' + key + rb'\s*(\[[^\]]*\]|<<.*?>>|\d+\s+\d+\s+R|/\w+|\d+)', dictionary, re.S)
+        return m.group(1) if m else None
+
+    def resolve_dict(self, dictionary, key):
+        """Dictionary bytes behind /key, following one indirect reference"""
+        v = self.value(dictionary, key)
+        if v is None:
+            return b''
+        ref = REF.fullmatch(v.strip())
+        return self.dictionary(int(ref.group(1))) if ref else v
+
+    def pages(self):
+        """Page object numbers in page-tree order"""
+        roots = ROOT_REF.findall(self.data)
+        if not roots:
+            return []
+        catalog = self.dictionary(int(roots[-1]))
+        pages_ref = self.value(catalog, b'Pages')
+        if not pages_ref or not REF.match(pages_ref):
+            return []
+        result, seen = [], set()
+
+        def walk(num, depth):
+            if num in seen or depth > MAX_TREE_DEPTH:
+                return
+            seen.add(num)
+            node = self.dictionary(num)
+            kids = self.value(node, b'Kids')
+            if kids is not None and re.search(rb'/Type\s*/Pages\b', node):
+                for ref in REF.findall(kids):
+                    walk(int(ref), depth + 1)
+            else:
+                result.append(num)
+
+        walk(int(REF.match(pages_ref).group(1)), 0)
+        return result
+
+    def page_content(self, num):
+        contents = self.value(self.dictionary(num), b'Contents')
+        if contents is None:
+            return b''
+        return b'\n'.join(self.stream(int(r)) for r in REF.findall(contents))
+
+    def page_fonts(self, num):
+        """{font resource name: ToUnicode map or None} for one page"""
+        page = self.dictionary(num)
+        resources = self.resolve_dict(page, b'Resources')
+        font_dict = self.resolve_dict(resources, b'Font')
+        fonts = {}
+        for name, ref in re.findall(rb'/([\w.+-]+)\s+(\d+)\s+\d+\s+R', font_dict):
+            font = self.dictionary(int(ref))
+            cmap_ref = self.value(font, b'ToUnicode')
+            m = REF.match(cmap_ref) if cmap_ref else None
+            fonts[name] = parse_cmap(self.stream(int(m.group(1)))) if m else None
+        return fonts
+
+
+# -- Content streams ----------------------------------------------------------
+
+def _hex_units(hexstr):
+    hexstr = re.sub(rb'\s', b'', hexstr)
+    if len(hexstr) % 2:
+        hexstr += b'0'
+    return bytes.fromhex(hexstr.decode('ascii', 'replace'))
+
+
+def parse_cmap(data):
+    """{code bytes: text} from a ToUnicode CMap's bfchar/bfrange sections"""
+    mapping = {}
+
+    def text(hexdst):
+        raw = _hex_units(hexdst)
+        return raw.decode('utf-16-be', 'replace') if len(raw) >= 2 else raw.decode('latin-1')
+
+    for block in re.findall(rb'beginbfchar(.*?)endbfchar', data, re.S):
+        for src, dst in re.findall(rb'<([0-9A-Fa-f\s]+)>\s*<([0-9A-Fa-f\s]*)>', block):
+            mapping[_hex_units(src)] = text(dst)
+    for block in re.findall(rb'beginbfrange(.*?)endbfrange', data, re.S):
+        for lo, hi, dst in re.findall(rb'<([0-9A-Fa-f]+)>\s*<([0-9A-Fa-f]+)>\s*(<[0-9A-Fa-f]*>|\[[^\]]*\])', block):
+            lo_b, hi_b = _hex_units(lo), _hex_units(hi)
+            width = len(lo_b)
+            start, stop = int.from_bytes(lo_b, 'big'), int.from_bytes(hi_b, 'big')
+            if stop - start > 0xFFFF:
+                continue
+            if dst.startswith(b'['):
+                for i, item in enumerate(re.findall(rb'<([0-9A-Fa-f]*)>', dst)):
+                    mapping[(start + i).to_bytes(width, 'big')] = text(item)
+            else:
+                base = _hex_units(dst[1:-1])
+                base_int = int.from_bytes(base, 'big')
+                for i in range(stop - start + 1):
+                    mapping[(start + i).to_bytes(width, 'big')] = (
+                        (base_int + i).to_bytes(len(base), 'big').decode('utf-16-be', 'replace'))
+    return mapping
+
+
+def decode_string(raw, cmap):
+    if not cmap:
+        return raw.decode('latin-1')
+    widths = sorted({len(k) for k in cmap}, reverse=True)
+    out, i = [], 0
+    while i < len(raw):
+        for w in widths:
+            chunk = raw[i:i + w]
+            if chunk in cmap:
+                out.append(cmap[chunk])
+                i += w
+                break
+        else:
+            out.append(chr(raw[i]) if raw[i] >= 32 else '')
+            i += 1
+    return ''.join(out)
+
+
+_ESCAPES = {ord('n'): b'\n', ord('r'): b'\r', ord('t'): b'\t', ord('b'): b'\b',
+            ord('f'): b'\f', ord('('): b'(', ord(')'): b')', ord('\\'): b'\\'}
+_DELIMS = b'()<>[]{}/%'
+
+
+def _literal(data, i):
+    """(bytes, index after the closing paren) for a literal string starting at data[i] == '('"""
+    out = bytearray()
+    depth, i, n = 1, i + 1, len(data)
+    while i < n:
+        c = data[i]
+        if c == 0x5C:                                   # backslash
+            nxt = data[i + 1] if i + 1 < n else None
+            if nxt is None:
+                break
+            if nxt in _ESCAPES:
+                out += _ESCAPES[nxt]
+                i += 2
+            elif 0x30 <= nxt <= 0x37:
+                m = re.match(rb'[0-7]{1,3}', data[i + 1:i + 4])
+                out.append(int(m.group(0), 8) & 0xFF)
+                i += 1 + len(m.group(0))
+            else:
+                i += 2 if nxt in b'\r\n' else 1
+            continue
+        if c == 0x28:
+            depth += 1
+        elif c == 0x29:
+            depth -= 1
+            if depth == 0:
+                return bytes(out), i + 1
+        out.append(c)
+        i += 1
+    return bytes(out), n
+
+
+def extract_content_text(content, fonts):
+    """Text of one page's content stream, one line per text line"""
+    lines, line = [], []
+    operands = []
+    cmap = None
+    i, n = 0, len(content)
+
+    def newline():
+        if line:
+            lines.append(''.join(line).strip())
+            line.clear()
+
+    while i < n:
+        c = content[i]
+        if c in b' \t\r\n\f\x00':
+            i += 1
+        elif c == 0x25:                                 # % comment
+            end = content.find(b'\n', i)
+            i = n if end < 0 else end
+        elif c == 0x28:
+            raw, i = _literal(content, i)
+            operands.append(('s', raw))
+        elif c == 0x3C and content[i + 1:i + 2] != b'<':
+            end = content.find(b'>', i)
+            end = n if end < 0 else end
+            operands.append(('s', _hex_units(content[i + 1:end])))
+            i = end + 1
+        elif c == 0x5B:
+            operands.append(('[', None))
+            i += 1
+        elif c == 0x5D:
+            items = []
+            while operands and operands[-1][0] != '[':
+                items.append(operands.pop())
+            if operands:
+                operands.pop()
+            operands.append(('a', items[::-1]))
+            i += 1
+        elif c in b'<>{}':
+            i += 1 + (content[i + 1:i + 2] == bytes([c]))
+        elif c == 0x2F:                                 # /Name
+            m = re.match(rb'/[^\s()<>\[\]{}/%]*', content[i:i + 128])
+            operands.append(('n', m.group(0)[1:]))
+            i += len(m.group(0))
+        else:
+            m = re.match(rb'[^\s()<>\[\]{}/%]+', content[i:i + 64])
+            if m is None:                               # stray ')', \v...
+                i += 1
+                continue
+            token = m.group(0)
+            i += len(token)
+            if re.fullmatch(rb'[+-]?(\d+\.?\d*|\.\d+)', token):
+                operands.append(('f', float(token)))
+                continue
+            op = token
+            if op == b'Tf':
+                names = [v for k, v in operands if k == 'n']
+                cmap = fonts.get(names[-1]) if names else None
+            elif op in (b'Tj', b"'", b'"'):
+                if op != b'Tj':
+                    newline()
+                strings = [v for k, v in operands if k == 's']
+                if strings:
+                    line.append(decode_string(strings[-1], cmap))
+            elif op == b'TJ':
+                arrays = [v for k, v in operands if k == 'a']
+                for kind, v in (arrays[-1] if arrays else []):
+                    if kind == 's':
+                        line.append(decode_string(v, cmap))
+                    elif kind == 'f' and v < -200:
+                        line.append(' ')
+            elif op in (b'Td', b'TD'):
+                nums = [v for k, v in operands if k == 'f']
+                if len(nums) >= 2 and abs(nums[-1]) > 0.01:
+                    newline()
+                elif line:
+                    line.append(' ')
+            elif op in (b'T*', b'ET'):
+                newline()
+            elif op == b'Tm':
+                newline()
+            operands.clear()
+    newline()
+    return '\n'.join(l for l in lines if l)
+
+
+def _iter_stdlib(path, max_pages):
+    with open(path, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:                              # empty file
+            return
+        with data:
+            doc = _Document(data)
+            for num in doc.pages()[:max_pages]:
+                yield extract_content_text(doc.page_content(num), doc.page_fonts(num))
+
+
+@lru_cache(maxsize=None)
+def _pdf_reader():
+    """pypdf's PdfReader, or None; imported on first PDF so importers don't pay for it"""
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return None
+    return PdfReader
+
+
+def _iter_pypdf(path, max_pages):
+    reader = _pdf_reader()(path)
+    for i in range(min(len(reader.pages), max_pages)):
+        yield reader.pages[i].extract_text() or ''
+
+
+def _malformed_errors():
+    if _pdf_reader() is None:
+        return MALFORMED_ERRORS
+    from pypdf.errors import PyPdfError
+    return MALFORMED_ERRORS + (PyPdfError,)
+
+
+def iter_pages(path, max_pages, errors=None):
+    """Yield the text of each page, at most max_pages of them
+
+    A malformed PDF stops early; why is appended to `errors` if given.
+    """
+    pages = _iter_pypdf(path, max_pages) if _pdf_reader() is not None else _iter_stdlib(path, max_pages)
+    count = 0
+    try:
+        for count, text in enumerate(pages, 1):
+            yield text
+    except _malformed_errors() as e:
+        if errors is not None:
+            errors.append(f'truncated after {count} pages: {type(e).__name__}: {e}')
+
+
+if __name__ == '__main__':
+    limit = int(sys.argv[sys.argv.index('--pages') + 1]) if '--pages' in sys.argv else 20
+    for number, text in enumerate(iter_pages(sys.argv[1], limit), 1):
+        print(f"--- page {number} ---")
+        print(text)
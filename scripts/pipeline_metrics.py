@@ -0,0 +1,240 @@
+"""
+Pipeline Metrics - Shared timing/HTTP/cache instrumentation for scripts/
+
+Usage inside a script:
+
+    import pipeline_metrics
+
+    run = pipeline_metrics.start_run('scrape_fiscal_notes')
+    for bill in bills:
+        with run.span('fetch', bill_num):
+            html = fetch_fiscal_html(bill_num)     # uses run.http_get()
+        with run.span('parse', bill_num):
+            parsed = parse_fiscal_note(html)
+    run.finish()   # writes reports/<script>-<timestamp>.json + prints summary
+
+Fetch helpers call pipeline_metrics.current() so they work with or without
+an active run (single-bill test modes just record into a throwaway run).
+"""
+
+import json
+import math
+import os
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+REPORTS_DIR = 'reports'
+
+# Phases every script reports on, in display order. Scripts may add others.
+PHASES = ['load', 'fetch', 'api', 'parse', 'analyze', 'serialize', 'sleep']
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+def categorize_error(exc):
+    """Bucket an exception into a coarse error category"""
+    name = type(exc).__name__
+    if 'Timeout' in name:
+        return 'timeout'
+    if 'Connection' in name:
+        return 'connection'
+    if isinstance(exc, (json.JSONDecodeError, ValueError)):
+        return 'parse'
+    if isinstance(exc, OSError):
+        return 'io'
+    return name
+
+
+class RunRecorder:
+    """Collects spans, HTTP calls, cache lookups and errors for one script run"""
+
+    def __init__(self, script):
+        self.script = script
+        self.started = time.time()
+        self.spans = defaultdict(list)          # phase -> [seconds]
+        self.bill_spans = defaultdict(dict)     # bill -> {phase: seconds}
+        self.http = []                          # [{url, status, latency, retries, bytes}]
+        self.cache = defaultdict(Counter)       # kind -> {hit, miss}
+        self.errors = Counter()                 # category -> count
+        self.error_samples = defaultdict(list)  # category -> [(bill, detail)]
+        self.counters = Counter()
+
+    @contextmanager
+    def span(self, phase, bill=None):
+        """Time a block of work; exceptions are categorized and re-raised"""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.error(categorize_error(e), bill, str(e))
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.spans[phase].append(elapsed)
+            if bill:
+                self.bill_spans[bill][phase] = self.bill_spans[bill].get(phase, 0) + elapsed
+
+    def sleep(self, seconds, bill=None):
+        """Rate-limit sleep, recorded so idle time shows up in the report"""
+        with self.span('sleep', bill):
+            time.sleep(seconds)
+
+    def http_get(self, url, timeout=30, retries=2, backoff=1.0, bill=None):
+        """GET with retries on connection errors and 5xx responses
+
+        Returns the final response, or None if every attempt raised.
+        Status codes are tallied in the report; callers decide which
+        non-200s count as errors (a 404 on one of several URLs is normal).
+        """
+        import requests
+
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                response = requests.get(url, timeout=timeout)
+            except requests.RequestException as e:
+                self._record_http(url, None, time.perf_counter() - start, attempt, 0)
+                if attempt >= retries:
+                    self.error(categorize_error(e), bill, f'{url}: {e}')
+                    return None
+            else:
+                self._record_http(url, response.status_code, time.perf_counter() - start,
+                                  attempt, len(response.content))
+                if response.status_code < 500 or attempt >= retries:
+                    return response
+            attempt += 1
+            time.sleep(backoff * attempt)
+
+    def _record_http(self, url, status, latency, attempt, nbytes):
+        self.http.append({
+            'url': url,
+            'status': status,
+            'latency': latency,
+            'retry': attempt,
+            'bytes': nbytes,
+        })
+
+    def cache_hit(self, kind):
+        self.cache[kind]['hit'] += 1
+
+    def cache_miss(self, kind):
+        self.cache[kind]['miss'] += 1
+
+    def error(self, category, bill=None, detail=''):
+        self.errors[category] += 1
+        if len(self.error_samples[category]) < 10:
+            self.error_samples[category].append({'bill': bill, 'detail': detail[:200]})
+
+    def count(self, name, n=1):
+        """Free-form counters (bills processed, skipped, generated...)"""
+        self.counters[name] += n
+
+    def report(self):
+        """Machine-readable run report"""
+        latencies = [h['latency'] for h in self.http]
+        phases = {}
+        for phase, values in self.spans.items():
+            phases[phase] = {
+                'count': len(values),
+                'total_s': round(sum(values), 3),
+                'p50_s': round(percentile(values, 50), 4),
+                'p95_s': round(percentile(values, 95), 4),
+                'max_s': round(max(values), 4),
+            }
+
+        slowest = sorted(
+            self.bill_spans.items(), key=lambda kv: sum(kv[1].values()), reverse=True
+        )[:10]
+
+        return {
+            'script': self.script,
+            'started': datetime.fromtimestamp(self.started).isoformat(),
+            'wall_s': round(time.time() - self.started, 3),
+            'phases': phases,
+            'http': {
+                'requests': len(self.http),
+                'retries': sum(1 for h in self.http if h['retry']),
+                'bytes': sum(h['bytes'] for h in self.http),
+                'status': dict(Counter(str(h['status']) for h in self.http)),
+                'latency_p50_s': round(percentile(latencies, 50), 4) if latencies else None,
+                'latency_p95_s': round(percentile(latencies, 95), 4) if latencies else None,
+            },
+            'cache': {kind: dict(c) for kind, c in self.cache.items()},
+            'errors': dict(self.errors),
+            'error_samples': dict(self.error_samples),
+            'counters': dict(self.counters),
+            'slowest_bills': [
+                {'bill': bill, **{k: round(v, 3) for k, v in spans.items()}}
+                for bill, spans in slowest
+            ],
+        }
+
+    def summary(self, report):
+        """Human-readable summary lines"""
+        lines = [f"RUN SUMMARY - {report['script']} ({report['wall_s']:.1f}s)"]
+
+        ordered = [p for p in PHASES if p in report['phases']]
+        ordered += sorted(p for p in report['phases'] if p not in PHASES)
+        if ordered:
+            lines.append(f"  {'Phase':<12} {'Count':>6} {'Total':>9} {'p50':>8} {'p95':>8}")
+            for phase in ordered:
+                p = report['phases'][phase]
+                lines.append(f"  {phase:<12} {p['count']:>6} {p['total_s']:>8.1f}s "
+                             f"{p['p50_s']:>7.3f}s {p['p95_s']:>7.3f}s")
+
+        http = report['http']
+        if http['requests']:
+            lines.append(f"  🌐 HTTP: {http['requests']} requests, {http['retries']} retries, "
+                         f"{http['bytes'] / 1e6:.1f} MB, latency p50 {http['latency_p50_s']:.3f}s "
+                         f"/ p95 {http['latency_p95_s']:.3f}s")
+            lines.append(f"     Status: {http['status']}")
+        for kind, c in report['cache'].items():
+            lines.append(f"  💾 Cache {kind}: {c.get('hit', 0)} hits / {c.get('miss', 0)} misses")
+        if report['counters']:
+            lines.append(f"  📊 {report['counters']}")
+        if report['errors']:
+            lines.append(f"  ❌ Errors: {report['errors']}")
+        return lines
+
+    def finish(self):
+        """Write the JSON report and print the summary; returns the report path"""
+        report = self.report()
+        os.makedirs(REPORTS_DIR, exist_ok=True)
+        stamp = datetime.fromtimestamp(self.started).strftime('%Y%m%d-%H%M%S')
+        path = os.path.join(REPORTS_DIR, f'{self.script}-{stamp}.json')
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+
+        print()
+        for line in self.summary(report):
+            print(line)
+        print(f"  📁 Report: {path}")
+        return path
+
+
+_current = None
+
+
+def start_run(script):
+    """Start a new run and make it the one fetch helpers record into"""
+    global _current
+    _current = RunRecorder(script)
+    return _current
+
+
+def current():
+    """The active run, or a throwaway one if no script started a run"""
+    global _current
+    if _current is None:
+        _current = RunRecorder('adhoc')
+    return _current
@@ -0,0 +1,559 @@
+#!/usr/bin/env python3
+"""
+Query Server - Optional local API over the pipeline's JSON artifacts
+Usage:
+  python3 scripts/query_server.py                    # serve site + /api on :8000
+  python3 scripts/query_server.py --port 8080 --max-age 300
+  python3 scripts/query_server.py --host 0.0.0.0     # reachable from the LAN
+  python3 scripts/query_server.py --bench            # in-process load test
+  python3 scripts/query_server.py --bench --url http://localhost:8000 --clients 16
+
+The site is static: every page downloads bills.json / legislators.json and
+filters in the browser. This server loads those files once into bitset
+indexes (bills by status, topic, org position and sponsor; legislators by
+district and ZIP) and answers paged JSON queries. Responses carry an ETag
+derived from the data version + query, so a CDN or browser revalidation
+gets a 304 without the query running at all.
+
+Endpoints:
+  /api/bills?status=Passed,Filed&topic=Housing&org=libertas:Oppose&sponsor=PETERT&q=water&page=2&per_page=25
+  /api/bills/HB0001
+  /api/legislators?chamber=House&district=12   /api/legislators?zip=84101
+  /api/legislators/PETERT
+  /api/stats
+
+Within a parameter, comma-separated values are OR'd (like the filter
+checkboxes); different parameters are AND'd. Anything outside /api/ is
+served as a static file from the repo root, but only site files: pages
+and assets at the top level or under SITE_DIRS with a SITE_SUFFIXES
+extension. scripts/, cache/, .git/, backups and docs answer 404, and
+directories are not listed. The server binds 127.0.0.1 unless --host
+says otherwise.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import posixpath
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import pipeline_metrics
+from org_matrix import CODE_NAMES, org_fields, position_code
+
+BILLS_FILE = 'data/bills.json'
+LEGISLATORS_FILE = 'data/legislators.json'
+ZIP_FILE = 'data/zip-to-legislators.json'
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8000
+DEFAULT_MAX_AGE = 60
+PER_PAGE = 50
+MAX_PER_PAGE = 500
+RESPONSE_CACHE_SIZE = 512
+
+# Static files served outside /api/: the site's own pages and assets only
+SITE_DIRS = {'bills', 'blog', 'css', 'data', 'images', 'js', 'legislators', 'quiz', 'tools'}
+SITE_SUFFIXES = ('.html', '.css', '.js', '.json', '.geojson',
+                 '.png', '.jpg', '.jpeg', '.webp', '.svg', '.ico')
+
+# Fields returned in list results unless ?fields= asks for more
+SUMMARY_FIELDS = ('bill_number', 'title', 'status', 'sponsor', 'sponsor_id',
+                  'topics', 'last_action_date', 'fiscal_badge')
+
+
+def is_site_path(path, root='.'):
+    """True if a URL path names a site file, or a site directory (served as its index.html)"""
+    parts = [p for p in posixpath.normpath(unquote(path)).split('/') if p]
+    if not parts:
+        return True                         # / -> index.html
+    if any(p.startswith('.') for p in parts):
+        return False
+    if len(parts) > 1 and parts[0] not in SITE_DIRS:
+        return False
+    if parts[-1].lower().endswith(SITE_SUFFIXES):
+        return True
+    return parts[0] in SITE_DIRS and os.path.isdir(os.path.join(root, *parts))
+
+
+def bit_indices(bits):
+    """Ordinals of the set bits, ascending"""
+    return [j for j, c in enumerate(reversed(bin(bits)[2:])) if c == '1']
+
+
+def artifact_version(paths):
+    """Short hash of the artifacts' size + mtime; changes whenever a file does"""
+    h = hashlib.sha1()
+    for path in paths:
+        if os.path.exists(path):
+            st = os.stat(path)
+            h.update(f'{path}:{st.st_size}:{st.st_mtime_ns};'.encode())
+    return h.hexdigest()[:12]
+
+
+class ArtifactIndexes:
+    """Bill/legislator indexes over one version of the artifacts
+
+    Built whole by load() and never mutated afterwards (apart from the
+    status-term memo), so a request that holds one sees a single
+    consistent version while the store swaps in the next.
+    """
+
+    def __init__(self, version, bills, legislators, zips):
+        by_status, by_topic, by_sponsor, by_org = {}, {}, {}, {}
+        search_text = []
+        for j, bill in enumerate(bills):
+            bit = 1 << j
+            status = bill.get('status') or ''
+            by_status[status] = by_status.get(status, 0) | bit
+            for topic in bill.get('topics') or []:
+                by_topic[topic] = by_topic.get(topic, 0) | bit
+            for key in (bill.get('sponsor_id'), bill.get('sponsor')):
+                if key:
+                    by_sponsor[key.lower()] = by_sponsor.get(key.lower(), 0) | bit
+            for field in org_fields(bill):
+                value = bill[field]
+                if not value or not value.strip() or value == 'N/A':
+                    continue
+                slots = by_org.setdefault(field[:-len('_position')], {})
+                name = CODE_NAMES[position_code(value)]
+                slots[name] = slots.get(name, 0) | bit
+                slots['any'] = slots.get('any', 0) | bit
+            # Same fields filters.js searches
+            number = (bill.get('bill_number') or '').lower()
+            search_text.append('\n'.join((
+                number, re.sub('0+', '', number, count=1),
+                (bill.get('title') or '').lower(), (bill.get('sponsor') or '').lower(),
+            )))
+
+        by_district, by_id = {}, {}
+        for name, leg in legislators.items():
+            record = {'name': name, **{k: v for k, v in leg.items()
+                                       if k not in ('yea_votes', 'nay_votes')}}
+            by_id[leg.get('id') or name] = record
+            key = (leg.get('chamber', ''), str(leg.get('district', '')))
+            by_district.setdefault(key, []).append(record)
+
+        self.version = version
+        self.bills = bills
+        self.bill_index = {b['bill_number']: j for j, b in enumerate(bills)}
+        self.all_bits = (1 << len(bills)) - 1
+        self.by_status = by_status
+        self.by_topic = by_topic
+        self.by_sponsor = by_sponsor
+        self.by_org = by_org
+        self.search_text = search_text
+        self.legislators = by_id
+        self.by_district = by_district
+        self.by_name = {r['name']: r for r in by_id.values()}
+        self.zips = zips
+        self._status_terms = {}
+
+    @classmethod
+    def load(cls, paths, version):
+        bills_file, legislators_file, zip_file = paths
+        with open(bills_file, 'r') as f:
+            bills = json.load(f)['bills']
+        with open(legislators_file, 'r') as f:
+            data = json.load(f)
+        zips = {}
+        if os.path.exists(zip_file):
+            with open(zip_file, 'r') as f:
+                zips = json.load(f).get('zip_mappings', {})
+        return cls(version, bills, data.get('legislators', data), zips)
+
+    # -- Bill queries ---------------------------------------------------------
+
+    def status_bits(self, term):
+        """Bills whose status contains `term`, case-insensitively"""
+        if term not in self._status_terms:
+            bits = 0
+            for status, b in self.by_status.items():
+                if term.lower() in status.lower():
+                    bits |= b
+            self._status_terms[term] = bits
+        return self._status_terms[term]
+
+    def org_bits(self, spec):
+        """'org' (any stance) or 'org:Support|Oppose|Watching'"""
+        org, _, position = spec.partition(':')
+        slots = self.by_org.get(org, {})
+        return slots.get(position.capitalize() if position else 'any', 0)
+
+    def match_bills(self, params):
+        """Bitset of bills matching the query parameters"""
+        bits = self.all_bits
+        facets = (
+            ('status', self.status_bits),
+            ('topic', lambda t: self.by_topic.get(t, 0)),
+            ('sponsor', lambda s: self.by_sponsor.get(s.lower(), 0)),
+            ('org', self.org_bits),
+        )
+        for name, lookup in facets:
+            values = params.get(name)
+            if values:
+                any_of = 0
+                for value in values:
+                    any_of |= lookup(value)
+                bits &= any_of
+
+        q = params.get('q')
+        if q and bits:
+            term = q[0].lower()
+            text = self.search_text
+            hits = 0
+            for j in bit_indices(bits):
+                if term in text[j]:
+                    hits |= 1 << j
+            bits = hits
+        return bits
+
+    def query_bills(self, params):
+        bits = self.match_bills(params)
+        matches = bit_indices(bits)
+        page, per_page = page_args(params)
+        start = (page - 1) * per_page
+
+        fields = params.get('fields')
+        if fields == ['all']:
+            project = dict
+        else:
+            wanted = set(fields) | {'bill_number'} if fields else SUMMARY_FIELDS
+            project = lambda b: {k: b[k] for k in wanted if k in b}
+
+        return {
+            'total': len(matches),
+            'page': page,
+            'per_page': per_page,
+            'pages': -(-len(matches) // per_page),
+            'results': [project(self.bills[j]) for j in matches[start:start + per_page]],
+        }
+
+    # -- Legislator queries -----------------------------------------------------
+
+    def query_legislators(self, params):
+        if params.get('zip'):
+            names = self.zips.get(params['zip'][0], [])
+            matches = [self.by_name[n] for n in names if n in self.by_name]
+        else:
+            chambers = params.get('chamber') or ['House', 'Senate']
+            districts = params.get('district')
+            matches = []
+            for (chamber, district), records in sorted(self.by_district.items()):
+                if chamber in chambers and (not districts or district in districts):
+                    matches.extend(records)
+            party = params.get('party')
+            if party:
+                matches = [r for r in matches if r.get('party') in party]
+
+        page, per_page = page_args(params)
+        start = (page - 1) * per_page
+        return {
+            'total': len(matches),
+            'page': page,
+            'per_page': per_page,
+            'pages': -(-len(matches) // per_page),
+            'results': matches[start:start + per_page],
+        }
+
+    def stats(self):
+        return {
+            'version': self.version,
+            'bills': len(self.bills),
+            'legislators': len(self.legislators),
+            'statuses': len(self.by_status),
+            'topics': {t: b.bit_count() for t, b in sorted(self.by_topic.items())},
+            'orgs': len(self.by_org),
+            'sponsors': len(self.by_sponsor),
+            'districts': len(self.by_district),
+            'zips': len(self.zips),
+        }
+
+
+class ArtifactStore:
+    """The current ArtifactIndexes, rebuilt when the artifacts change"""
+
+    def __init__(self, bills_file=BILLS_FILE, legislators_file=LEGISLATORS_FILE,
+                 zip_file=ZIP_FILE):
+        self.paths = (bills_file, legislators_file, zip_file)
+        self.indexes = None
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self):
+        """Reload if any artifact's size/mtime changed; returns the current indexes"""
+        version = artifact_version(self.paths)
+        indexes = self.indexes
+        if indexes is None or indexes.version != version:
+            with self._lock:
+                if self.indexes is None or self.indexes.version != version:
+                    # Built off to the side, then published by one assignment:
+                    # in-flight requests keep the indexes they already hold
+                    self.indexes = ArtifactIndexes.load(self.paths, version)
+                indexes = self.indexes
+        return indexes
+
+
+def page_args(params):
+    try:
+        page = max(1, int(params.get('page', ['1'])[0]))
+        per_page = min(MAX_PER_PAGE, max(1, int(params.get('per_page', [PER_PAGE])[0])))
+    except ValueError:
+        raise QueryError('page and per_page must be integers')
+    return page, per_page
+
+
+class QueryError(ValueError):
+    pass
+
+
+def parse_params(query):
+    """{name: [values]} with comma-separated values split"""
+    params = {}
+    for name, values in parse_qs(query).items():
+        params[name] = [v.strip() for value in values for v in value.split(',') if v.strip()]
+    return params
+
+
+class ResponseCache:
+    """Bounded LRU of rendered response bodies keyed by ETag"""
+
+    def __init__(self, size=RESPONSE_CACHE_SIZE):
+        self.size = size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            body = self._items.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body):
+        with self._lock:
+            self._items[key] = body
+            if len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+
+class QueryHandler(SimpleHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'     # keep-alive for API clients and CDNs
+    disable_nagle_algorithm = True    # headers and body go out in separate writes
+    store = None
+    cache = None
+    max_age = DEFAULT_MAX_AGE
+    quiet = False
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if not url.path.startswith('/api/'):
+            if not is_site_path(url.path, self.directory):
+                return self.send_error(404)
+            return super().do_GET()
+
+        indexes = self.store.refresh()
+        version = indexes.version
+        # Canonical query so ?a=1&b=2 and ?b=2&a=1 share an ETag
+        canonical = url.path + '?' + '&'.join(sorted(url.query.split('&')))
+        etag = '"%s-%s"' % (version, hashlib.sha1(canonical.encode()).hexdigest()[:12])
+
+        if etag in (self.headers.get('If-None-Match') or ''):
+            self.send_response(304)
+            self._cache_headers(etag)
+            self.end_headers()
+            return
+
+        body = self.cache.get(etag)
+        status = 200
+        if body is None:
+            try:
+                payload = self.route(indexes, url.path, parse_params(url.query))
+            except QueryError as e:
+                status, payload = 400, {'error': str(e)}
+            if payload is None:
+                status, payload = 404, {'error': f'not found: {url.path}'}
+            body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+            if status == 200:
+                self.cache.put(etag, body)
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if status == 200:
+            self._cache_headers(etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_HEAD(self):
+        if not is_site_path(urlsplit(self.path).path, self.directory):
+            return self.send_error(404)
+        return super().do_HEAD()
+
+    def list_directory(self, path):
+        self.send_error(404)
+        return None
+
+    def _cache_headers(self, etag):
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', f'public, max-age={self.max_age}')
+
+    def route(self, indexes, path, params):
+        parts = path.strip('/').split('/')[1:]
+        if parts == ['bills']:
+            return indexes.query_bills(params)
+        if len(parts) == 2 and parts[0] == 'bills':
+            j = indexes.bill_index.get(parts[1].upper())
+            return None if j is None else indexes.bills[j]
+        if parts == ['legislators']:
+            return indexes.query_legislators(params)
+        if len(parts) == 2 and parts[0] == 'legislators':
+            return indexes.legislators.get(parts[1].upper())
+        if parts == ['stats']:
+            return {**indexes.stats(), 'responseCache': {'hits': self.cache.hits,
+                                                       'misses': self.cache.misses}}
+        return None
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(port, max_age=DEFAULT_MAX_AGE, quiet=False, root='.', host=DEFAULT_HOST):
+    store = ArtifactStore()
+    handler = type('Handler', (QueryHandler,), {
+        'store': store,
+        'cache': ResponseCache(),
+        'max_age': max_age,
+        'quiet': quiet,
+    })
+
+    def factory(*args, **kwargs):
+        return handler(*args, directory=root, **kwargs)
+
+    return ThreadingHTTPServer((host, port), factory)
+
+
+# -- Load generator ---------------------------------------------------------------
+
+BENCH_QUERIES = [
+    '/api/bills',
+    '/api/bills?status=Governor%20Signed',
+    '/api/bills?status=Passed,Filed&page=2',
+    '/api/bills?topic=Housing',
+    '/api/bills?topic=Education,Healthcare&status=Signed',
+    '/api/bills?org=libertas',
+    '/api/bills?org=aclu_of_utah:Oppose',
+    '/api/bills?q=water',
+    '/api/bills?q=tax&per_page=100',
+    '/api/bills/HB0001',
+    '/api/legislators?chamber=House&district=12',
+    '/api/legislators?zip=84101',
+    '/api/stats',
+]
+
+
+def run_bench(base_url, clients=8, duration=5.0, revalidate=0.5):
+    """Hammer the server with a query mix; `revalidate` share send If-None-Match"""
+    import http.client
+
+    target = urlsplit(base_url)
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(n):
+        conn = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=10)
+        etags = {}
+        mine, codes = [], {}
+        i = n
+        while time.perf_counter() < deadline:
+            path = BENCH_QUERIES[i % len(BENCH_QUERIES)]
+            headers = {}
+            if path in etags and (i * 7919 % 100) < revalidate * 100:
+                headers['If-None-Match'] = etags[path]
+            start = time.perf_counter()
+            conn.request('GET', path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            mine.append(time.perf_counter() - start)
+            codes[response.status] = codes.get(response.status, 0) + 1
+            if response.getheader('ETag'):
+                etags[path] = response.getheader('ETag')
+            i += 1
+        conn.close()
+        with lock:
+            latencies.extend(mine)
+            for code, c in codes.items():
+                statuses[code] = statuses.get(code, 0) + c
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(client, range(clients)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        'requests': len(latencies),
+        'clients': clients,
+        'seconds': round(elapsed, 2),
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(pipeline_metrics.percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(pipeline_metrics.percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(pipeline_metrics.percentile(latencies, 99) * 1000, 2),
+        'status': {str(k): v for k, v in sorted(statuses.items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local query server over data/*.json')
+    parser.add_argument('--host', default=DEFAULT_HOST,
+                        help='interface to bind (0.0.0.0 for every interface)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--max-age', type=int, default=DEFAULT_MAX_AGE,
+                        help='Cache-Control max-age for /api responses (seconds)')
+    parser.add_argument('--quiet', action='store_true', help='no per-request log lines')
+    parser.add_argument('--bench', action='store_true', help='run the load generator')
+    parser.add_argument('--url', help='benchmark an already running server instead')
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--revalidate', type=float, default=0.5,
+                        help='share of repeat requests sent with If-None-Match')
+    args = parser.parse_args()
+
+    if args.bench:
+        server = None
+        url = args.url
+        if not url:
+            server = make_server(0, args.max_age, quiet=True)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            url = f'http://127.0.0.1:{server.server_address[1]}'
+        print(f"🔥 {args.clients} clients x {args.duration:.0f}s against {url}")
+        result = run_bench(url, args.clients, args.duration, args.revalidate)
+        print(json.dumps(result, indent=2))
+        if server:
+            server.shutdown()
+        return
+
+    server = make_server(args.port, args.max_age, args.quiet, host=args.host)
+    print(f"📡 Serving site + /api on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped")
+        server.server_close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
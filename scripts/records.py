@@ -0,0 +1,640 @@
+#!/usr/bin/env python3
+"""
+Records - Typed, validated records for the pipeline's data files
+Usage:
+  python3 scripts/records.py            # validate every data file, exit 1 on errors
+  python3 scripts/records.py --check    # also verify encode/decode round trips
+
+Pipeline scripts read bills.json, legislators.json, data/votes/ and
+fiscal_notes.json as raw dicts and each guesses at their shapes. This
+module gives them one definition: slotted dataclasses for Bill,
+Legislator, RollCall, OrgPosition and FiscalNote, decoded from the JSON
+with type and format checks (RecordError names the file, record and
+field), and positions as the Position IntEnum instead of free strings.
+
+    from records import load_bills, load_legislators
+
+    bills = load_bills()                  # [Bill], validated
+    bills[0].positions['libertas'].position is Position.SUPPORT
+    legislators = load_legislators()      # {name: Legislator}
+
+Two encodings:
+  - to_dict()/dump_bills() write the published shape the site reads
+    (`<org>_position` string columns), so bills.json stays compatible
+  - dumps_compact()/loads_compact() write a column-oriented table with
+    enum-coded positions for pipeline-internal artifacts; keys are not
+    repeated per record, so it is smaller and faster to parse
+"""
+
+import dataclasses
+import json
+import os
+import re
+import sys
+import types
+from dataclasses import dataclass, field
+from enum import IntEnum
+
+BILLS_FILE = 'data/bills.json'
+LEGISLATORS_FILE = 'data/legislators.json'
+VOTES_DIR = 'data/votes'
+FISCAL_FILE = 'data/fiscal_notes.json'
+PROFILES_FILE = 'data/legislator_profiles.json'
+
+BILL_NUMBER = re.compile(r'^[HS](B|R|CR|JR)\d{2,4}$')
+LEGISLATOR_NAME = re.compile(r'^[^\x00-\x1f,]+, [^\x00-\x1f,]+$')
+CONTROL_CHARS = re.compile(r'[\x00-\x1f]')
+LEGISLATOR_ID = re.compile(r'^[A-Z]+$')
+IMPACT_LEVELS = {'Minimal', 'Low', 'Medium', 'High', 'Very High'}
+
+
+class RecordError(ValueError):
+    """A record that does not match its schema"""
+
+
+class Position(IntEnum):
+    """Org stance on a bill; SUPPORT/OPPOSE/WATCHING match org_matrix codes"""
+
+    NONE = 0
+    SUPPORT = 1
+    OPPOSE = -1
+    WATCHING = 2
+    NEUTRAL = 3
+    MONITOR = 4
+    AMEND = 5
+    STUDYING = 6
+    SUPPORT_AS_AMENDED = 7
+    UNKNOWN = 8
+
+    @classmethod
+    def parse(cls, value):
+        """Position from its published label or its int code"""
+        if type(value) is int:
+            return cls(value)
+        if type(value) is not str:
+            raise RecordError(f'expected position, got {type(value).__name__}')
+        try:
+            return _POSITION_LABELS[value.strip().lower()]
+        except KeyError:
+            raise RecordError(f'unknown position {value!r}') from None
+
+    @property
+    def label(self):
+        return _LABELS[self]
+
+    @property
+    def code(self):
+        """org_matrix int8 code: every other tracked stance counts as Watching"""
+        return self if self in (Position.NONE, Position.SUPPORT, Position.OPPOSE) else Position.WATCHING
+
+
+_LABELS = {
+    Position.NONE: '',
+    Position.SUPPORT: 'Support',
+    Position.OPPOSE: 'Oppose',
+    Position.WATCHING: 'Watching',
+    Position.NEUTRAL: 'Neutral',
+    Position.MONITOR: 'Monitor',
+    Position.AMEND: 'Amend',
+    Position.STUDYING: 'Studying',
+    Position.SUPPORT_AS_AMENDED: 'Support (as amended)',
+    Position.UNKNOWN: 'Unknown',
+}
+_POSITION_LABELS = {label.lower(): p for p, label in _LABELS.items()}
+
+
+# -- Field converters ---------------------------------------------------------
+# Each takes the raw JSON value and returns the typed value or raises
+# RecordError; the decoder adds the record/field location.
+
+def _str(v):
+    if type(v) is str:
+        return v
+    raise RecordError(f'expected str, got {type(v).__name__}')
+
+
+def _int(v):
+    if type(v) is int:
+        return v
+    raise RecordError(f'expected int, got {type(v).__name__}')
+
+
+def _count(v):
+    if type(v) is int and v >= 0:
+        return v
+    raise RecordError(f'expected non-negative int, got {v!r}')
+
+
+def _bool(v):
+    if type(v) is bool:
+        return v
+    raise RecordError(f'expected bool, got {type(v).__name__}')
+
+
+def _str_list(v):
+    if type(v) is list and all(type(x) is str for x in v):
+        return v
+    raise RecordError('expected list of str')
+
+
+def _str_dict(v):
+    if type(v) is dict and all(type(x) is str for x in v.values()):
+        return v
+    raise RecordError('expected object of str')
+
+
+def _dict(v):
+    if type(v) is dict:
+        return v
+    raise RecordError(f'expected object, got {type(v).__name__}')
+
+
+def _optional(convert):
+    return lambda v: None if v is None else convert(v)
+
+
+_CONVERTERS = {
+    str: _str,
+    int: _int,
+    bool: _bool,
+    list[str]: _str_list,
+    dict[str, str]: _str_dict,
+    dict: _dict,
+    Position: Position.parse,
+}
+
+_MISSING = object()
+
+
+def _converter(annotation, meta):
+    if 'convert' in meta:
+        return meta['convert']
+    if isinstance(annotation, types.UnionType):
+        inner, = [a for a in annotation.__args__ if a is not type(None)]
+        return _optional(_converter(inner, {}))
+    return _CONVERTERS[annotation]
+
+
+def _schema(cls):
+    """(name, plain type, converter, default factory or _MISSING) per field, built once
+
+    Fields annotated str/int/bool with no custom converter get their type
+    as `plain`, so the decoder accepts them with one type check and no call.
+    """
+    schema = []
+    for f in dataclasses.fields(cls):
+        if f.metadata.get('derived'):
+            continue
+        if f.default is not dataclasses.MISSING:
+            default = (lambda d=f.default: d)
+        elif f.default_factory is not dataclasses.MISSING:
+            default = f.default_factory
+        else:
+            default = _MISSING
+        plain = f.type if f.type in (str, int, bool) and 'convert' not in f.metadata else None
+        schema.append((f.name, plain, _converter(f.type, f.metadata), default))
+    return tuple(schema)
+
+
+def _decode(cls, data, where):
+    if type(data) is not dict:
+        raise RecordError(f'{where}: expected object, got {type(data).__name__}')
+    values = {}
+    for name, plain, convert, default in cls._schema:
+        value = data.get(name, _MISSING)
+        if type(value) is plain:
+            values[name] = value
+            continue
+        if value is _MISSING:
+            if default is _MISSING:
+                raise RecordError(f'{where}.{name}: missing')
+            values[name] = default()
+            continue
+        try:
+            values[name] = convert(value)
+        except RecordError as e:
+            raise RecordError(f'{where}.{name}: {e}') from None
+    record = cls(**values)
+    problem = record.validate()
+    if problem:
+        raise RecordError(f'{where}: {problem}')
+    return record
+
+
+def _encode(record):
+    """Schema fields as plain JSON values (positions as their published labels)"""
+    out = {}
+    for name, *_ in record._schema:
+        value = getattr(record, name)
+        out[name] = value.label if isinstance(value, Position) else value
+    return out
+
+
+def _counted():
+    return field(default=0, metadata={'convert': _count})
+
+
+# -- Records ------------------------------------------------------------------
+
+@dataclass(slots=True)
+class OrgPosition:
+    org: str                # bills.json field name without the _position suffix
+    position: Position
+    priority: bool = False
+    description: str = ''
+
+
+@dataclass(slots=True)
+class Bill:
+    bill_number: str
+    title: str
+    sponsor: str = ''
+    sponsor_id: str = ''
+    sponsor_house: str = ''
+    floor_sponsor: str = ''
+    status: str = ''
+    last_action_date: str = ''
+    committees: list[str] = field(default_factory=list)
+    house_votes_for: int = _counted()
+    house_votes_against: int = _counted()
+    senate_votes_for: int = _counted()
+    senate_votes_against: int = _counted()
+    url: str = ''
+    last_updated: str = ''
+    general_provisions: str = ''
+    highlighted_provisions: str = ''
+    fiscal_note_pdf: str = ''
+    fiscal_note_html: str = ''
+    fiscal_analyst: str = ''
+    monies_appropriated: str = ''
+    fiscal_impact_level: str = ''
+    fiscal_badge: str = ''
+    fiscal_summary: str = ''
+    fiscal_amount: str = ''
+    topics: list[str] = field(default_factory=list)
+    author_position: Position | None = None
+    agreement_count: int | None = None
+    controversy_score: int | None = None
+    # {org: OrgPosition}, from the `<org>_position/_priority/_description` columns
+    positions: dict = field(default_factory=dict, metadata={'derived': True})
+    # Columns this schema does not know about, kept so encoding is lossless
+    extra: dict = field(default_factory=dict, metadata={'derived': True})
+
+    def validate(self):
+        if not BILL_NUMBER.match(self.bill_number):
+            return f'bad bill number {self.bill_number!r}'
+        if self.sponsor_house not in ('', 'H', 'S'):
+            return f'bad sponsor_house {self.sponsor_house!r}'
+        return None
+
+    @classmethod
+    def from_dict(cls, data, where='bill'):
+        """Decode a bills.json record (org positions as string columns)"""
+        if type(data) is not dict:
+            raise RecordError(f'{where}: expected object, got {type(data).__name__}')
+        where = f"{where}[{data.get('bill_number')}]"
+        bill = _decode(cls, data, where)
+        for key, value in data.items():
+            if key in _BILL_FIELDS:
+                continue
+            if key.endswith('_position'):
+                org = key[:-len('_position')]
+                if not value:
+                    bill.extra[key] = value
+                    continue
+                try:
+                    bill.positions[org] = OrgPosition(
+                        org,
+                        Position.parse(value),
+                        _bool(data.get(f'{org}_priority', False)),
+                        _str(data.get(f'{org}_description', '')),
+                    )
+                except RecordError as e:
+                    raise RecordError(f'{where}.{org}: {e}') from None
+            elif not (key.endswith(('_priority', '_description'))
+                      and data.get(key.rsplit('_', 1)[0] + '_position')):
+                bill.extra[key] = value
+        return bill
+
+    def to_dict(self):
+        """bills.json shape"""
+        out = _encode(self)
+        for name in ('author_position', 'agreement_count', 'controversy_score'):
+            if out[name] is None:
+                del out[name]
+        for org, p in self.positions.items():
+            out[f'{org}_position'] = p.position.label
+            out[f'{org}_priority'] = p.priority
+            out[f'{org}_description'] = p.description
+        out.update(self.extra)
+        return out
+
+
+@dataclass(slots=True)
+class Legislator:
+    id: str
+    name: str               # "Last, First M." as on le.utah.gov
+    formatted_name: str = ''
+    email: str = ''
+    phone: str = ''
+    chamber: str = ''
+    party: str = ''
+    district: str = ''
+    committees: list[str] = field(default_factory=list)
+    website: str = ''
+    image: str = ''
+    counties: str = ''
+    position: str = ''
+    yea_votes: list[str] = field(default_factory=list)
+    nay_votes: list[str] = field(default_factory=list)
+
+    def validate(self):
+        if not LEGISLATOR_ID.match(self.id):
+            return f'bad id {self.id!r}'
+        if not LEGISLATOR_NAME.match(self.name):
+            return f'bad name {self.name!r}'
+        if self.chamber not in ('House', 'Senate'):
+            return f'bad chamber {self.chamber!r}'
+        if not self.district.isdigit():
+            return f'bad district {self.district!r}'
+        return None
+
+    @classmethod
+    def from_dict(cls, data, where='legislator'):
+        return _decode(cls, data, where)
+
+    def to_dict(self):
+        return _encode(self)
+
+
+@dataclass(slots=True)
+class RollCall:
+    bill: str
+    vote_id: str
+    house: str
+    type: str = 'floor_vote'
+    is_final: bool = False
+    yeas: list[str] = field(default_factory=list)
+    nays: list[str] = field(default_factory=list)
+    yeas_count: int = _counted()
+    nays_count: int = _counted()
+
+    def validate(self):
+        if self.house not in ('H', 'S'):
+            return f'bad house {self.house!r}'
+        if self.yeas_count != len(self.yeas) or self.nays_count != len(self.nays):
+            return (f'counts {self.yeas_count}-{self.nays_count} do not match '
+                    f'{len(self.yeas)}-{len(self.nays)} names')
+        return None
+
+    @classmethod
+    def from_dict(cls, data, where='roll_call'):
+        return _decode(cls, data, where)
+
+    def to_dict(self):
+        out = _encode(self)
+        del out['bill']
+        return out
+
+
+@dataclass(slots=True)
+class FiscalNote:
+    bill: str
+    impact_level: str
+    summary: str = ''
+    state_government: dict = field(default_factory=dict)
+    local_government: str = ''
+    individuals_businesses: str = ''
+    regulatory_impact: str = ''
+    fiscal_years: list[str] = field(default_factory=list)
+    total_expenditures: dict[str, str] = field(default_factory=dict)
+    total_revenues: dict[str, str] = field(default_factory=dict)
+    net_impact: dict[str, str] = field(default_factory=dict)
+    source: str = 'html'
+
+    def validate(self):
+        if self.impact_level not in IMPACT_LEVELS:
+            return f'bad impact_level {self.impact_level!r}'
+        if self.source not in ('html', 'pdf'):
+            return f'bad source {self.source!r}'
+        return None
+
+    @classmethod
+    def from_dict(cls, data, where='fiscal_note'):
+        return _decode(cls, data, where)
+
+    def to_dict(self):
+        out = _encode(self)
+        del out['bill']
+        return out
+
+
+for _cls in (Bill, Legislator, RollCall, FiscalNote):
+    _cls._schema = _schema(_cls)
+_BILL_FIELDS = {name for name, *_ in Bill._schema}
+
+
+# -- Files --------------------------------------------------------------------
+
+def _collection(data, name):
+    """Files are either {name: records, ...} or the records themselves"""
+    return data.get(name, data) if isinstance(data, dict) else data
+
+
+def decode_bills(records, where=BILLS_FILE):
+    return [Bill.from_dict(b, f'{where}:bills[{i}]') for i, b in enumerate(records)]
+
+
+def load_bills(path=BILLS_FILE):
+    """[Bill] from bills.json"""
+    with open(path, 'r') as f:
+        return decode_bills(_collection(json.load(f), 'bills'), path)
+
+
+def dump_bills(bills, data=None):
+    """bills.json text; `data` carries the other top-level keys (stats, organizations)"""
+    out = dict(data or {})
+    out['bills'] = [b.to_dict() for b in bills]
+    return json.dumps(out, indent=2)
+
+
+def load_legislators(path=LEGISLATORS_FILE):
+    """{name: Legislator} from legislators.json"""
+    with open(path, 'r') as f:
+        records = _collection(json.load(f), 'legislators')
+    return {key: Legislator.from_dict(r, f'{path}:{key}') for key, r in records.items()}
+
+
+def load_roll_calls(bill, votes_dir=VOTES_DIR):
+    """[RollCall] for one bill; [] if it has no votes file"""
+    path = os.path.join(votes_dir, f'{bill}.json')
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r') as f:
+        records = json.load(f)
+    return [RollCall.from_dict({'bill': bill, **r}, f'{path}:{vote_id}')
+            for vote_id, r in records.items()]
+
+
+def load_fiscal_notes(path=FISCAL_FILE):
+    """{bill: FiscalNote} from fiscal_notes.json"""
+    with open(path, 'r') as f:
+        records = _collection(json.load(f), 'notes')
+    return {bill: FiscalNote.from_dict({'bill': bill, **r}, f'{path}:{bill}')
+            for bill, r in records.items()}
+
+
+# -- Compact encoding ---------------------------------------------------------
+
+def _compact_value(value):
+    if isinstance(value, Position):
+        return int(value)
+    return value
+
+
+def dumps_compact(records):
+    """Column-oriented JSON for one record type, positions as int codes"""
+    records = list(records)
+    cls = type(records[0]) if records else Bill
+    names = [name for name, *_ in cls._schema]
+    rows = []
+    for r in records:
+        row = [_compact_value(getattr(r, name)) for name in names]
+        if cls is Bill:
+            row.append([[p.org, int(p.position), p.priority, p.description]
+                        for p in r.positions.values()])
+            row.append(r.extra)
+        rows.append(row)
+    if cls is Bill:
+        names = names + ['positions', 'extra']
+    return json.dumps({'type': cls.__name__, 'fields': names, 'rows': rows},
+                      separators=(',', ':'), ensure_ascii=False)
+
+
+def loads_compact(text):
+    """Records from dumps_compact() output, validated like the published files"""
+    data = json.loads(text)
+    cls = _TYPES[data['type']]
+    names = data['fields']
+    records = []
+    for i, row in enumerate(data['rows']):
+        values = dict(zip(names, row))
+        record = _decode(cls, values, f"{data['type']}[{i}]")
+        if cls is Bill:
+            for org, code, priority, description in values.get('positions', ()):
+                record.positions[org] = OrgPosition(
+                    _str(org), Position.parse(code), _bool(priority), _str(description))
+            record.extra = _dict(values.get('extra', {}))
+        records.append(record)
+    return records
+
+
+_TYPES = {cls.__name__: cls for cls in (Bill, Legislator, RollCall, FiscalNote)}
+
+
+# -- Validation report --------------------------------------------------------
+
+def _collect(errors, decode):
+    try:
+        return decode()
+    except RecordError as e:
+        errors.append(str(e))
+        return None
+
+
+def validate_all():
+    """({file: records decoded}, [error]) over every data file, one error per record"""
+    counts = {}
+    errors = []
+
+    with open(BILLS_FILE, 'r') as f:
+        records = _collection(json.load(f), 'bills')
+    counts[BILLS_FILE] = sum(
+        _collect(errors, lambda: Bill.from_dict(b, f'{BILLS_FILE}:bills[{i}]')) is not None
+        for i, b in enumerate(records)
+    )
+
+    with open(LEGISLATORS_FILE, 'r') as f:
+        records = _collection(json.load(f), 'legislators')
+    counts[LEGISLATORS_FILE] = sum(
+        _collect(errors, lambda: Legislator.from_dict(r, f'{LEGISLATORS_FILE}:{k}')) is not None
+        for k, r in records.items()
+    )
+
+    roll_calls = 0
+    for name in sorted(os.listdir(VOTES_DIR)) if os.path.isdir(VOTES_DIR) else []:
+        if name.endswith('.json'):
+            calls = _collect(errors, lambda: load_roll_calls(name[:-len('.json')]))
+            roll_calls += len(calls or [])
+    counts[VOTES_DIR] = roll_calls
+
+    with open(FISCAL_FILE, 'r') as f:
+        records = _collection(json.load(f), 'notes')
+    counts[FISCAL_FILE] = sum(
+        _collect(errors, lambda: FiscalNote.from_dict({'bill': k, **r}, f'{FISCAL_FILE}:{k}')) is not None
+        for k, r in records.items()
+    )
+
+    # Profile names are vote-page surnames, not full records - only the
+    # control-character check applies. A newline means the vote-page scrape
+    # merged two adjacent roll-call columns ('Matthews, A.\nMoss'); those
+    # totals belong to neither legislator, so such entries are dropped from
+    # the data rather than repaired
+    if os.path.exists(PROFILES_FILE):
+        with open(PROFILES_FILE, 'r') as f:
+            profiles = json.load(f)
+        ok = 0
+        for i, match in enumerate(profiles.get('sample_matches', [])):
+            if CONTROL_CHARS.search(match.get('name', '')):
+                errors.append(f"{PROFILES_FILE}:sample_matches[{i}].name: bad name {match['name']!r}")
+            else:
+                ok += 1
+        counts[PROFILES_FILE] = ok
+
+    return counts, errors
+
+
+def check_round_trips():
+    """Every encoding decodes back to equal records; returns failure messages"""
+    failures = []
+    with open(BILLS_FILE, 'r') as f:
+        records = _collection(json.load(f), 'bills')
+    bills = decode_bills(records)
+    for raw, bill in zip(records, bills):
+        if bill.to_dict() != raw:
+            failures.append(f'{bill.bill_number}: to_dict() differs from bills.json')
+    if loads_compact(dumps_compact(bills)) != bills:
+        failures.append('bills: compact round trip differs')
+
+    for name, loaded in (('legislators', list(load_legislators().values())),
+                         ('fiscal notes', list(load_fiscal_notes().values()))):
+        if loads_compact(dumps_compact(loaded)) != loaded:
+            failures.append(f'{name}: compact round trip differs')
+    return failures
+
+
+def main():
+    print("=" * 60)
+    print("RECORD VALIDATION")
+    print("=" * 60)
+
+    counts, errors = validate_all()
+    for path, n in counts.items():
+        print(f"  {path:<32} {n} valid")
+    for error in errors:
+        print(f"  ❌ {error}")
+
+    failures = check_round_trips() if '--check' in sys.argv else []
+    for failure in failures:
+        print(f"  ❌ {failure}")
+    if '--check' in sys.argv and not failures:
+        print("  Round trips: bills.json shape and compact encoding match")
+
+    if errors or failures:
+        print(f"\n⚠️  {len(errors)} invalid records, {len(failures)} round-trip failures")
+        sys.exit(1)
+    print("\n✅ All records valid")
+
+
+if __name__ == '__main__':
+    main()
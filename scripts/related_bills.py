@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Related Bills - Top-k most similar bills per bill from sparse TF-IDF vectors
+Usage:
+  python3 scripts/related_bills.py                  # writes data/related_bills.json
+  python3 scripts/related_bills.py --k 8 --block 256
+
+Bills are featurized exactly like tag_topics.py (title, provisions,
+extracted text; cached term counts under cache/features/). Similarity is
+a blocked sparse matrix multiply: an inverted index maps each term to
+its (bill, weight) postings, and each block of query bills accumulates
+dot products by walking only the postings of its own terms. Per-bill
+results go through a size-k heap.
+
+Memory stays bounded for multi-session corpora:
+  - each vector keeps only its MAX_TERMS heaviest terms (re-normalized),
+    which caps the inverted index at MAX_TERMS postings per bill
+  - terms in more than half the corpus are dropped by tfidf()
+  - score accumulators exist for one block at a time, and results are
+    k entries per bill
+"""
+
+import argparse
+import heapq
+import json
+import math
+from datetime import datetime
+
+import pipeline_metrics
+from artifact_index import open_index, optional_index
+from sentence_table import SentenceTable
+from tag_topics import LANGUAGE_FILE, extracted_text
+from text_features import FeatureCache, bill_document, tfidf
+
+BILLS_FILE = 'data/bills.json'
+OUTPUT_FILE = 'data/related_bills.json'
+
+TOP_K = 5
+MIN_SIMILARITY = 0.1
+MAX_TERMS = 64          # heaviest terms kept per vector (~0.8 recall@5 vs exact)
+BLOCK_SIZE = 512        # query bills per accumulator block
+
+
+def prune(vectors, max_terms=MAX_TERMS):
+    """Keep each vector's heaviest terms, re-normalized to unit length"""
+    pruned = {}
+    for key, vec in vectors.items():
+        if len(vec) > max_terms:
+            vec = dict(heapq.nlargest(max_terms, vec.items(), key=lambda tw: tw[1]))
+        norm = math.sqrt(sum(w * w for w in vec.values())) or 1.0
+        pruned[key] = {t: w / norm for t, w in vec.items()}
+    return pruned
+
+
+def inverted_index(vectors):
+    """{term: [(doc_ordinal, weight)]} plus the ordinal -> key list"""
+    keys = list(vectors)
+    postings = {}
+    for i, key in enumerate(keys):
+        for term, w in vectors[key].items():
+            postings.setdefault(term, []).append((i, w))
+    return keys, postings
+
+
+def top_k_similar(vectors, k=TOP_K, block_size=BLOCK_SIZE, min_similarity=MIN_SIMILARITY):
+    """Yield (key, [(other_key, score)]) for every vector, best first
+
+    Vectors must be L2-normalized so dot products are cosines.
+    """
+    keys, postings = inverted_index(vectors)
+    for start in range(0, len(keys), block_size):
+        block = keys[start:start + block_size]
+        # One accumulator per query in the block: {doc_ordinal: dot}
+        scores = [{} for _ in block]
+        for q, key in enumerate(block):
+            acc = scores[q]
+            for term, wq in vectors[key].items():
+                for i, wd in postings[term]:
+                    acc[i] = acc.get(i, 0.0) + wq * wd
+        for q, key in enumerate(block):
+            acc = scores[q]
+            acc.pop(start + q, None)
+            best = heapq.nlargest(k, acc.items(), key=lambda iw: iw[1])
+            yield key, [(keys[i], s) for i, s in best if s >= min_similarity]
+        del scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute related bills')
+    parser.add_argument('--k', type=int, default=TOP_K)
+    parser.add_argument('--block', type=int, default=BLOCK_SIZE)
+    parser.add_argument('--max-terms', type=int, default=MAX_TERMS)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("RELATED BILLS")
+    print("=" * 60)
+    run = pipeline_metrics.start_run('related_bills')
+
+    with run.span('load'):
+        bills = list(open_index(BILLS_FILE, 'bills', key_field='bill_number').iter_records(
+            fields=('bill_number', 'title', 'general_provisions', 'highlighted_provisions')
+        ))
+        analyses = optional_index(LANGUAGE_FILE, 'analyses')
+        sentences = SentenceTable()
+
+    with run.span('parse'):
+        docs = {
+            b['bill_number']: bill_document(b, extracted_text(b['bill_number'], analyses, sentences))
+            for b in bills
+        }
+        cache = FeatureCache('bills')
+        counts = cache.counts(docs)
+        run.cache['features'].update(hit=cache.hits, miss=cache.misses)
+
+    with run.span('analyze'):
+        vectors, _ = tfidf(counts)
+        vectors = prune(vectors, args.max_terms)
+        related = {
+            key: [[other, round(score, 3)] for other, score in ranked]
+            for key, ranked in top_k_similar(vectors, args.k, args.block)
+        }
+
+    output = {
+        'generated_date': datetime.now().isoformat(),
+        'k': args.k,
+        # {bill: [[related_bill, cosine], ...]} best first
+        'related': related,
+    }
+    with run.span('serialize'):
+        with open(OUTPUT_FILE, 'w') as f:
+            json.dump(output, f, separators=(',', ':'))
+
+    with_related = sum(1 for r in related.values() if r)
+    print(f"  {with_related}/{len(related)} bills have related bills "
+          f"(k={args.k}, {args.max_terms} terms/vector, block {args.block})")
+    run.count('bills_with_related', with_related)
+    print(f"\n✅ Saved {OUTPUT_FILE}")
+    run.finish()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,512 @@
+#!/usr/bin/env python3
+"""
+Render Pages - Pre-render one static HTML page per bill and per legislator
+Usage:
+  python3 scripts/render_pages.py              # render changed pages into bills/ and legislators/
+  python3 scripts/render_pages.py --force      # re-render everything
+  python3 scripts/render_pages.py --workers 4
+
+bill.html fetches bills.json, legislators.json, the bill's vote file,
+bill_summaries.json and related_bills.json before it can show anything.
+This stage renders the same content ahead of time from
+templates/page-template.html: summary, fiscal note, SHALL/MAY counts
+from bill_language.json, org positions, roll calls and related bills for
+every bill (bills/HB0001.html), and contact details, sponsored bills and
+vote record for every legislator (legislators/PETERT.html). The pages
+need no JSON fetches to paint; bill.html?bill=... stays the interactive
+view (voting, watchlist) and each static page links to it.
+
+Each page's inputs are gathered into one payload and hashed together
+with the template and this renderer's source. cache/pages/manifest.json
+keeps the hash per page, so only pages whose inputs changed are
+re-rendered. Rendering is spread over a process pool.
+
+Run before build_site.py so dist/ picks the pages up; the Pages workflow
+(.github/workflows/pages.yml) runs both on every push to main. The bills
+listing (js/app.js) and the legislator cards (js/legislators.js) link to
+these pages, and build_site.py lists them in sitemap.xml.
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pipeline_metrics
+from artifact_index import optional_index
+from change_feed import record_hash
+
+BILLS_FILE = 'data/bills.json'
+LEGISLATORS_FILE = 'data/legislators.json'
+SUMMARIES_FILE = 'data/bill_summaries.json'
+FISCAL_FILE = 'data/fiscal_notes.json'
+LANGUAGE_FILE = 'data/bill_language.json'
+RELATED_FILE = 'data/related_bills.json'
+ALIGNMENTS_FILE = 'data/legislator_alignments.json'
+VOTES_DIR = 'data/votes'
+TEMPLATE_FILE = 'templates/page-template.html'
+MANIFEST_FILE = 'cache/pages/manifest.json'
+
+BILL_PAGES_DIR = 'bills'
+LEGISLATOR_PAGES_DIR = 'legislators'
+
+CONTENT_MARKER = '<!-- Your content here -->'
+TEMPLATE_SCRIPT = '<script src="../js/app.js"></script>'
+# Header only: app.js would fetch bills.json on load
+PAGE_SCRIPTS = '<script src="../js/components.js"></script>'
+
+LANGUAGE_KINDS = [('shall', 'SHALL'), ('shall_not', 'SHALL NOT'), ('may', 'MAY'),
+                  ('may_not', 'MAY NOT'), ('must', 'MUST')]
+POSITION_ORDER = {'Support': 0, 'Oppose': 1, 'Watching': 2}
+POSITION_COLORS = {
+    'Support': 'bg-green-100 border-green-400 text-green-800',
+    'Oppose': 'bg-red-100 border-red-400 text-red-800',
+    'Watching': 'bg-blue-100 border-blue-400 text-blue-800',
+}
+ORG_ALIGNMENTS_SHOWN = 6
+
+esc = html.escape
+
+
+# -- Rendering (pure: payload -> HTML) ------------------------------------------
+
+def status_color(status):
+    """Same buckets as bill-detail.js getStatusColor()"""
+    s = status.lower()
+    if 'signed' in s or 'passed' in s or 'enrolled' in s:
+        return 'bg-green-100 text-green-800'
+    if 'failed' in s or 'vetoed' in s:
+        return 'bg-red-100 text-red-800'
+    if 'committee' in s:
+        return 'bg-yellow-100 text-yellow-800'
+    return 'bg-gray-100 text-gray-800'
+
+
+def card(title, body, extra_class='bg-white text-gray-800'):
+    return (f'<section class="{extra_class} rounded-lg shadow p-6 mb-6">'
+            f'<h3 class="text-lg font-bold mb-4">{title}</h3>{body}</section>')
+
+
+def bill_link(number, title=None, status=None):
+    parts = [f'<span class="font-semibold text-blue-900">{esc(number)}</span>']
+    if title:
+        parts.append(f'<span class="text-gray-700 ml-2">{esc(title.strip())}</span>')
+    if status:
+        parts.append(f'<span class="block text-xs text-gray-500 mt-1">{esc(status)}</span>')
+    return (f'<a href="../{BILL_PAGES_DIR}/{esc(number)}.html" '
+            f'class="block p-3 rounded-lg border border-gray-200 hover:bg-gray-50">{"".join(parts)}</a>')
+
+
+def bill_chip(number):
+    return (f'<a href="../{BILL_PAGES_DIR}/{esc(number)}.html" '
+            f'class="px-2 py-1 bg-gray-100 rounded text-sm text-blue-900 hover:bg-gray-200">{esc(number)}</a>')
+
+
+def render_summary(bill, summary):
+    if summary and summary.get('plain_summary'):
+        body = [f'<p class="mb-4">{esc(summary["plain_summary"])}</p>']
+        if summary.get('who_affected'):
+            body.append('<h4 class="font-semibold text-purple-800 mb-2">👥 Who\'s Affected</h4>'
+                        f'<p class="text-sm mb-4">{esc(summary["who_affected"])}</p>')
+        if summary.get('argument_for') or summary.get('argument_against'):
+            body.append(
+                '<div class="grid md:grid-cols-2 gap-4 mb-4">'
+                '<div class="bg-green-50 rounded-lg p-4 border border-green-200">'
+                '<h4 class="font-semibold text-green-800 mb-2">✅ Argument For</h4>'
+                f'<p class="text-sm text-green-900">{esc(summary.get("argument_for", ""))}</p></div>'
+                '<div class="bg-red-50 rounded-lg p-4 border border-red-200">'
+                '<h4 class="font-semibold text-red-800 mb-2">❌ Argument Against</h4>'
+                f'<p class="text-sm text-red-900">{esc(summary.get("argument_against", ""))}</p></div>'
+                '</div>')
+        if summary.get('key_question'):
+            body.append('<div class="bg-yellow-50 rounded-lg p-4 border border-yellow-200 mb-4">'
+                        '<h4 class="font-semibold text-yellow-800 mb-2">🤔 Key Question</h4>'
+                        f'<p class="text-sm text-yellow-900 italic">{esc(summary["key_question"])}</p></div>')
+        body.append('<div class="text-xs text-gray-500 border-t pt-3 mt-3">⚠️ This summary was '
+                    'generated by AI (Claude) and is for informational purposes only. Always read the '
+                    f'<a href="{esc(bill.get("url", ""))}" class="text-purple-600 hover:underline">'
+                    'full bill text</a> for complete details.</div>')
+    else:
+        fallback = bill.get('general_provisions') or f"This bill addresses: {bill.get('title', '')}"
+        body = ['<p class="mb-2 text-gray-500 italic">AI summary not yet available for this bill.</p>',
+                f'<p>{esc(fallback)}</p>']
+    return card('🤖 Bill Summary', ''.join(body),
+                'bg-gradient-to-r from-purple-50 to-blue-50 text-gray-700')
+
+
+def render_fiscal(note):
+    if not note:
+        return ''
+    body = [f'<p class="mb-2"><span class="font-semibold">Impact:</span> {esc(note.get("impact_level", ""))}</p>']
+    if note.get('summary'):
+        body.append(f'<p class="text-sm mb-4">{esc(" ".join(note["summary"].split()))}</p>')
+    years = note.get('fiscal_years') or []
+    rows = [(label, note.get(key) or {}) for label, key in
+            (('Revenues', 'total_revenues'), ('Expenditures', 'total_expenditures'), ('Net', 'net_impact'))]
+    rows = [(label, values) for label, values in rows if values]
+    if years and rows:
+        head = ''.join(f'<th class="px-3 py-1 text-right">FY {esc(fy)}</th>' for fy in years)
+        lines = ''.join(
+            f'<tr><td class="px-3 py-1 font-semibold">{label}</td>'
+            + ''.join(f'<td class="px-3 py-1 text-right">{esc(values.get(f"FY{fy}", "$0"))}</td>' for fy in years)
+            + '</tr>'
+            for label, values in rows
+        )
+        body.append(f'<table class="text-sm"><tr><th></th>{head}</tr>{lines}</table>')
+    return card('💰 Fiscal Note', ''.join(body))
+
+
+def render_language(counts):
+    if not counts or not any(counts.values()):
+        return ''
+    cells = ''.join(
+        f'<div class="bg-gray-50 rounded p-3 text-center"><div class="text-2xl font-bold">{counts.get(kind, 0)}</div>'
+        f'<div class="text-xs text-gray-600">{label}</div></div>'
+        for kind, label in LANGUAGE_KINDS
+    )
+    return card('🔍 Bill Language', f'<div class="grid grid-cols-5 gap-2">{cells}</div>')
+
+
+def render_positions(positions):
+    if not positions:
+        return card('🏢 Organization Positions',
+                    '<p class="text-gray-500 italic">No organizations have taken a position on this bill yet.</p>')
+    items = sorted(positions, key=lambda p: (POSITION_ORDER.get(p[2], 3), p[0]))
+    body = ''.join(
+        f'<div class="border-2 rounded-lg p-4 {POSITION_COLORS.get(position, "bg-gray-100 border-gray-400 text-gray-800")}">'
+        f'<div class="flex items-center gap-2 mb-1"><span class="text-xl">{esc(emoji)}</span>'
+        f'<span class="font-semibold">{esc(name)}</span></div>'
+        f'<div class="text-lg font-bold">{esc(position)}</div></div>'
+        for name, emoji, position in items
+    )
+    return card('🏢 Organization Positions', f'<div class="grid md:grid-cols-2 lg:grid-cols-3 gap-4">{body}</div>')
+
+
+def final_votes(votes):
+    """Final (or last) roll call per chamber, like bill-detail.js renderVotes()"""
+    result = []
+    for house, chamber in (('H', 'House'), ('S', 'Senate')):
+        calls = [v for v in (votes or {}).values() if v.get('house') == house]
+        if calls:
+            result.append((chamber, next((v for v in calls if v.get('is_final')), calls[-1])))
+    return result
+
+
+def render_votes(votes):
+    calls = final_votes(votes)
+    if not calls:
+        return card('🗳️ Vote Breakdown', '<p class="text-gray-500 italic">No recorded votes yet.</p>')
+    bars, lists = [], []
+    for chamber, vote in calls:
+        yeas, nays = vote.get('yeas_count', 0), vote.get('nays_count', 0)
+        if yeas + nays:
+            yea_pct = round(yeas / (yeas + nays) * 100)
+            verdict = ('text-green-600', '✅ Passed') if yeas > nays else ('text-red-600', '❌ Failed')
+            bars.append(
+                f'<div class="mb-4"><div class="flex justify-between items-center mb-2">'
+                f'<span class="font-semibold">{chamber}</span>'
+                f'<span class="{verdict[0]} font-bold">{verdict[1]} {yeas}-{nays}</span></div>'
+                f'<div class="h-8 flex rounded-lg overflow-hidden">'
+                f'<div class="bg-green-500 text-white text-center" style="width: {yea_pct}%">{yeas} Yea</div>'
+                f'<div class="bg-red-500 text-white text-center" style="width: {100 - yea_pct}%">{nays} Nay</div>'
+                f'</div></div>')
+        columns = ''.join(
+            f'<div><h5 class="{color} font-semibold mb-2">{label} ({len(names)})</h5>'
+            f'<div class="text-sm space-y-1">{"".join(f"<div>{esc(n)}</div>" for n in names)}</div></div>'
+            for label, color, names in (('✅ Yea', 'text-green-700', vote.get('yeas', [])),
+                                        ('❌ Nay', 'text-red-700', vote.get('nays', [])))
+        )
+        lists.append(f'<div><h4 class="font-bold text-lg mb-3">{chamber}</h4>'
+                     f'<div class="grid grid-cols-2 gap-4">{columns}</div></div>')
+    return (card('🗳️ Vote Breakdown', ''.join(bars))
+            + card('👥 How Legislators Voted', f'<div class="grid md:grid-cols-2 gap-6">{"".join(lists)}</div>'))
+
+
+def render_bill(payload):
+    bill = payload['bill']
+    number = bill['bill_number']
+    status = bill.get('status') or 'Unknown'
+    header = (
+        '<a href="../index.html" class="text-blue-300 hover:underline mb-4 inline-block">← Back to tracker</a>'
+        '<section class="bg-white text-gray-800 rounded-lg shadow-lg p-6 mb-6">'
+        f'<h1 class="text-3xl font-bold text-blue-900 mb-2">{esc(number)}</h1>'
+        f'<h2 class="text-xl text-gray-700 mb-4">{esc(bill.get("title", "").strip())}</h2>'
+        '<div class="flex flex-wrap gap-2 mb-4">'
+        f'<span class="px-3 py-1 rounded-full text-sm font-semibold {status_color(status)}">{esc(status)}</span>'
+        f'<span class="px-3 py-1 bg-gray-100 rounded-full text-sm">👤 {esc(bill.get("sponsor") or "Unknown sponsor")}</span>'
+        '</div><div class="flex flex-wrap gap-2">'
+        f'<a href="{esc(bill.get("url", ""))}" target="_blank" class="bg-yellow-500 text-blue-900 px-4 py-2 rounded">📄 Official Page</a>'
+        f'<a href="../bill.html?bill={esc(number)}" class="border border-blue-500 text-blue-700 px-4 py-2 rounded">🗳️ Vote &amp; Watch</a>'
+        f'<a href="../analysis.html?bill={esc(number)}" class="border border-teal-500 text-teal-600 px-4 py-2 rounded">🔍 Policy Analysis</a>'
+        '</div></section>'
+    )
+    related = ''
+    if payload['related']:
+        related = card('🔗 Related Bills', '<div class="space-y-2">'
+                       + ''.join(bill_link(*r) for r in payload['related']) + '</div>')
+    content = ''.join([
+        header,
+        render_summary(bill, payload['summary']),
+        render_fiscal(payload['fiscal']),
+        render_language(payload['language']),
+        render_positions(payload['positions']),
+        render_votes(payload['votes']),
+        related,
+    ])
+    return f"{number} - {bill.get('title', '').strip()}", content
+
+
+def render_legislator(payload):
+    leg = payload['legislator']
+    name = leg.get('formatted_name') or leg['name']
+    title = 'Rep.' if leg.get('chamber') == 'House' else 'Sen.'
+    contact = ''.join(
+        f'<li>{label}: {value}</li>' for label, value in (
+            ('Email', f'<a href="mailto:{esc(leg["email"])}" class="text-blue-700 hover:underline">{esc(leg["email"])}</a>'
+             if leg.get('email') else ''),
+            ('Phone', esc(leg.get('phone', ''))),
+            ('Website', f'<a href="{esc(leg["website"])}" class="text-blue-700 hover:underline">{esc(leg["website"])}</a>'
+             if leg.get('website') else ''),
+            ('Counties', esc(leg.get('counties', ''))),
+        ) if value
+    )
+    header = (
+        '<a href="../legislators.html" class="text-blue-300 hover:underline mb-4 inline-block">← All legislators</a>'
+        '<section class="bg-white text-gray-800 rounded-lg shadow-lg p-6 mb-6 flex gap-6 items-start">'
+        + (f'<img src="{esc(leg["image"])}" alt="{esc(name)}" class="w-24 h-32 object-cover rounded" loading="lazy">'
+           if leg.get('image') else '')
+        + f'<div><h1 class="text-3xl font-bold text-blue-900 mb-2">{title} {esc(name)}</h1>'
+        f'<p class="text-gray-700 mb-2">{esc(leg.get("chamber", ""))} District {esc(leg.get("district", ""))}'
+        f' · {esc(leg.get("party", ""))}</p><ul class="text-sm space-y-1">{contact}</ul></div></section>'
+    )
+
+    committees = ''
+    if leg.get('committees'):
+        committees = card('🏛️ Committees', '<ul class="list-disc ml-6 space-y-1">'
+                          + ''.join(f'<li>{esc(c)}</li>' for c in leg['committees']) + '</ul>')
+
+    sponsored = ''
+    if payload['sponsored']:
+        sponsored = card(f'✍️ Sponsored Bills ({len(payload["sponsored"])})', '<div class="space-y-2">'
+                         + ''.join(bill_link(*b) for b in payload['sponsored']) + '</div>')
+
+    yea, nay = payload['yea'], payload['nay']
+    record = (f'<p class="mb-4">Voted <strong>Yea</strong> on {len(yea)} bills and '
+              f'<strong>Nay</strong> on {len(nay)}.</p>')
+    if nay:
+        record += ('<h4 class="font-semibold text-red-700 mb-2">❌ Nay votes</h4><div class="space-y-2 mb-4">'
+                   + ''.join(bill_link(*b) for b in nay) + '</div>')
+    if yea:
+        record += (f'<details><summary class="font-semibold text-green-700 cursor-pointer">✅ Yea votes ({len(yea)})</summary>'
+                   '<div class="flex flex-wrap gap-2 mt-2">' + ''.join(bill_chip(b) for b in yea) + '</div></details>')
+    votes = card('🗳️ Voting Record', record)
+
+    alignment = ''
+    if payload['alignment']:
+        rows = ''.join(
+            f'<tr class="{"" if reliable else "text-gray-400"}"><td class="px-3 py-1">{esc(emoji)} {esc(org)}</td>'
+            f'<td class="px-3 py-1 text-right font-semibold">{pct:.0f}%</td>'
+            f'<td class="px-3 py-1 text-right text-gray-500">{low:.0f}-{high:.0f}%</td>'
+            f'<td class="px-3 py-1 text-right text-gray-500">{total} bills</td></tr>'
+            for org, emoji, pct, total, low, high, reliable in payload['alignment']
+        )
+        note = '<p class="text-xs text-gray-500 mt-2">Ranges are 95% intervals; greyed rows rest on too few votes to read much into.</p>'
+        alignment = card('🤝 Agreement with Organizations', f'<table class="text-sm">{rows}</table>{note}')
+
+    return f"{title} {name}", header + committees + alignment + sponsored + votes
+
+
+RENDERERS = {'bill': render_bill, 'legislator': render_legislator}
+
+
+def fill_template(template, title, content):
+    page = template.replace('PAGE_TITLE', esc(title))
+    page = page.replace(CONTENT_MARKER, '<div id="site-header"></div>\n'
+                        f'    <main class="container mx-auto px-4 py-8">{content}</main>')
+    if TEMPLATE_SCRIPT in page:
+        return page.replace(TEMPLATE_SCRIPT, PAGE_SCRIPTS)
+    return page.replace('</body>', f'    {PAGE_SCRIPTS}\n</body>')
+
+
+_template = None
+
+
+def _init_worker(template):
+    global _template
+    _template = template
+
+
+def render_job(job):
+    """Worker entry point: render and write one page; returns its path"""
+    kind, path, payload = job
+    title, content = RENDERERS[kind](payload)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(fill_template(_template, title, content))
+    return path
+
+
+# -- Payloads (parent process) ---------------------------------------------------
+
+def load_json(path, key=None):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        data = json.load(f)
+    return data.get(key, {}) if key else data
+
+
+def load_votes(bill_number):
+    path = os.path.join(VOTES_DIR, f'{bill_number}.json')
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def bill_payloads(bills, organizations):
+    """{page path: payload} for every bill"""
+    summaries = load_json(SUMMARIES_FILE, 'summaries')
+    notes = load_json(FISCAL_FILE, 'notes')
+    related = load_json(RELATED_FILE, 'related')
+    analyses = optional_index(LANGUAGE_FILE, 'analyses')
+    by_number = {b['bill_number']: b for b in bills}
+    orgs = {o['field_name']: (o['name'], o.get('emoji', '📋')) for o in organizations}
+
+    payloads = {}
+    for bill in bills:
+        number = bill['bill_number']
+        analysis = analyses.get(number) or {}
+        positions = []
+        for key, value in bill.items():
+            if key.endswith('_position') and key != 'author_position' and value:
+                org = key[:-len('_position')]
+                name, emoji = orgs.get(org, (org.replace('_', ' ').title(), '📋'))
+                positions.append([name, emoji, value])
+        payloads[os.path.join(BILL_PAGES_DIR, f'{number}.html')] = ('bill', {
+            'bill': bill,
+            'summary': summaries.get(number),
+            'fiscal': notes.get(number),
+            'language': {kind: (analysis.get(kind) or {}).get('count', 0) for kind, _ in LANGUAGE_KINDS},
+            'positions': positions,
+            'votes': load_votes(number),
+            'related': [[other, by_number[other].get('title', ''), by_number[other].get('status') or 'Filed']
+                        for other, _ in related.get(number, []) if other in by_number],
+        })
+    return payloads
+
+
+def legislator_payloads(legislators, bills):
+    """{page path: payload} for every legislator"""
+    alignments = load_json(ALIGNMENTS_FILE)
+    titles = {b['bill_number']: b.get('title', '') for b in bills}
+    sponsored = {}
+    for b in bills:
+        sponsored.setdefault(b.get('sponsor_id'), []).append([b['bill_number'], b.get('title', ''), b.get('status')])
+
+    payloads = {}
+    for leg in legislators.values():
+        orgs = (alignments.get(leg['id']) or {}).get('organizations', {})
+        top = sorted(orgs.values(), key=lambda o: o.get('total', 0), reverse=True)[:ORG_ALIGNMENTS_SHOWN]
+        payloads[os.path.join(LEGISLATOR_PAGES_DIR, f"{leg['id']}.html")] = ('legislator', {
+            'legislator': leg,
+            'sponsored': sponsored.get(leg['id'], []),
+            'yea': leg.get('yea_votes', []),
+            'nay': [[b, titles.get(b, '')] for b in leg.get('nay_votes', [])],
+            'alignment': [[o['name'], o.get('emoji', ''), o.get('alignment', 0), o.get('total', 0),
+                           o.get('alignment_low', 0), o.get('alignment_high', 100), o.get('reliable', False)]
+                          for o in top if o.get('total')],
+        })
+    return payloads
+
+
+def renderer_fingerprint(template):
+    """Changes whenever the template or this module's rendering code does"""
+    with open(__file__, 'rb') as f:
+        code = f.read()
+    return hashlib.sha1(code + template.encode('utf-8')).hexdigest()
+
+
+def load_manifest():
+    return load_json(MANIFEST_FILE) or {'fingerprint': None, 'pages': {}}
+
+
+def save_manifest(manifest):
+    os.makedirs(os.path.dirname(MANIFEST_FILE), exist_ok=True)
+    with open(MANIFEST_FILE, 'w') as f:
+        json.dump(manifest, f, separators=(',', ':'))
+
+
+def render_all(jobs, template, workers):
+    """Render jobs over a process pool; yields page paths as they finish"""
+    if workers == 1:
+        _init_worker(template)
+        yield from map(render_job, jobs)
+        return
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(template,)) as pool:
+        yield from pool.map(render_job, jobs, chunksize=chunksize)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pre-render static bill and legislator pages')
+    parser.add_argument('--force', action='store_true', help='ignore the manifest and render every page')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("RENDER PAGES")
+    print("=" * 60)
+    run = pipeline_metrics.start_run('render_pages')
+
+    with run.span('load'):
+        with open(TEMPLATE_FILE, 'r') as f:
+            template = f.read()
+        if CONTENT_MARKER not in template:
+            raise SystemExit(f"❌ {TEMPLATE_FILE} has no '{CONTENT_MARKER}' marker")
+        with open(BILLS_FILE, 'r') as f:
+            bills_data = json.load(f)
+        bills = bills_data.get('bills', bills_data)
+        legislators = load_json(LEGISLATORS_FILE, 'legislators')
+
+    with run.span('analyze'):
+        payloads = bill_payloads(bills, bills_data.get('organizations', []))
+        payloads.update(legislator_payloads(legislators, bills))
+
+        manifest = load_manifest()
+        fingerprint = renderer_fingerprint(template)
+        previous = {} if args.force or manifest.get('fingerprint') != fingerprint else manifest['pages']
+        hashes = {}
+        jobs = []
+        for path, (kind, payload) in payloads.items():
+            hashes[path] = record_hash(payload)
+            if previous.get(path) == hashes[path] and os.path.exists(path):
+                run.cache_hit('pages')
+            else:
+                run.cache_miss('pages')
+                jobs.append((kind, path, payload))
+
+    for directory in (BILL_PAGES_DIR, LEGISLATOR_PAGES_DIR):
+        os.makedirs(directory, exist_ok=True)
+    with run.span('render'):
+        rendered = sum(1 for _ in render_all(jobs, template, args.workers))
+
+    with run.span('serialize'):
+        stale = [p for p in manifest['pages'] if p not in payloads]
+        for path in stale:
+            if os.path.exists(path):
+                os.remove(path)
+        save_manifest({'fingerprint': fingerprint, 'pages': hashes})
+
+    run.count('pages_rendered', rendered)
+    run.count('pages_removed', len(stale))
+    print(f"  {len(payloads)} pages: {rendered} rendered, {len(payloads) - rendered} unchanged"
+          f"{f', {len(stale)} removed' if stale else ''} ({args.workers} worker(s))")
+    print(f"\n✅ Pages in {BILL_PAGES_DIR}/ and {LEGISLATOR_PAGES_DIR}/")
+    run.finish()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,31 +1,83 @@
 """
 Fiscal Note Scraper - Extracts fiscal impact data from Utah Legislature
+
+Notes are read from the HTML rendering. Bills whose HTML note is missing
+or parses empty fall back to the PDF rendering: PDFs are downloaded once
+into cache/fiscal_pdf/, then their text is extracted page by page (at
+most PDF_PAGE_LIMIT pages each) across a process pool and parsed into the
+same fields. A parsed HTML note is always kept; the PDF only fills its
+empty fields ('source': 'html+pdf'), or stands in for a missing HTML note
+('source': 'pdf').
 """
 
 import re
 import json
-import requests
+from concurrent.futures import ProcessPoolExecutor
 from html import unescape
 import time
 import os
 
+import pipeline_metrics
+from artifact_index import open_index, optional_index
+from pdf_text import iter_pages
+
+BILLS_FILE = 'data/bills.json'
+CACHE_DIR = 'cache/fiscal_html'
+PDF_CACHE_DIR = 'cache/fiscal_pdf'
+PDF_PAGE_LIMIT = 12   # fiscal notes run 1-3 pages; anything longer is not a note
+FIXTURE = 'scripts/fixtures/state_government'   # .fn.html, .fn.txt (PDF text), .json (expected rows)
+
+def fiscal_html_cache_path(bill_number, session="2025GS"):
+    """Where a fetched fiscal note page is cached on disk"""
+    return os.path.join(CACHE_DIR, session, f'{bill_number}.fn.html')
+
 def fetch_fiscal_html(bill_number, session="2025GS"):
-    """Fetch fiscal note HTML"""
+    """Fetch fiscal note HTML (cached on disk)"""
+    run = pipeline_metrics.current()
+    cache_path = fiscal_html_cache_path(bill_number, session)
+    if os.path.exists(cache_path):
+        run.cache_hit('fiscal_html')
+        with open(cache_path, 'r') as f:
+            return f.read()
+    run.cache_miss('fiscal_html')
+
     url = f"https://pf.utleg.gov/public-web/sessions/{session}/fiscal-notes/{bill_number}.fn.html"
-    try:
-        r = requests.get(url, timeout=15)
-        if r.status_code == 200:
-            return r.text
-    except:
-        pass
+    r = run.http_get(url, timeout=15, bill=bill_number)
+    if r is not None and r.status_code == 200:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path, 'w') as f:
+            f.write(r.text)
+        return r.text
+    run.error('not_found' if r is not None else 'fetch_failed', bill_number)
     return None
 
-def parse_fiscal_note(html):
-    """Parse fiscal note HTML and extract key data"""
-    if not html:
-        return None
-    
-    result = {
+def fiscal_pdf_cache_path(bill_number, session="2025GS"):
+    """Where a fetched fiscal note PDF is cached on disk"""
+    return os.path.join(PDF_CACHE_DIR, session, f'{bill_number}.fn.pdf')
+
+def fetch_fiscal_pdf(bill_number, url=None, session="2025GS"):
+    """Fetch a fiscal note PDF to the disk cache; returns its path or None"""
+    run = pipeline_metrics.current()
+    cache_path = fiscal_pdf_cache_path(bill_number, session)
+    if os.path.exists(cache_path):
+        run.cache_hit('fiscal_pdf')
+        return cache_path
+    run.cache_miss('fiscal_pdf')
+
+    url = url or f"https://pf.utleg.gov/public-web/sessions/{session}/fiscal-notes/{bill_number}.fn.pdf"
+    r = run.http_get(url, timeout=30, bill=bill_number)
+    if r is not None and r.status_code == 200 and r.content.startswith(b'%PDF'):
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp = cache_path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(r.content)
+        os.replace(tmp, cache_path)
+        return cache_path
+    run.error('pdf_not_found' if r is not None else 'pdf_fetch_failed', bill_number)
+    return None
+
+def empty_note():
+    return {
         'state_government': {},
         'local_government': '',
         'individuals_businesses': '',
@@ -36,29 +88,131 @@ def parse_fiscal_note(html):
         'total_revenues': {},
         'net_impact': {}
     }
-    
-    # Extract fiscal years
-    fy_matches = re.findall(r'FY\s*(\d{4})', html)
+
+AMOUNT = r'(\$[\d,\(\)\-]+)'
+TOTAL_PATTERNS = {
+    'total_expenditures': re.compile(r'Total Expenditures[^\$]*' + r'[^\$]*'.join([AMOUNT] * 3)),
+    'total_revenues': re.compile(r'Total Revenues[^\$]*' + r'[^\$]*'.join([AMOUNT] * 3)),
+    'net_impact': re.compile(r'Net All Funds[^\$]*' + r'[^\$]*'.join([AMOUNT] * 3)),
+}
+
+def parse_totals(result, text):
+    """Fill fiscal years and the three totals rows from note text or HTML"""
+    fy_matches = re.findall(r'FY\s*(\d{4})', text)
     result['fiscal_years'] = sorted(list(set(fy_matches)))
     
-    # Extract dollar amounts with context
-    # Find Total Expenditures line
-    exp_match = re.search(r'Total Expenditures[^\$]*(\$[\d,\(\)\-]+)[^\$]*(\$[\d,\(\)\-]+)[^\$]*(\$[\d,\(\)\-]+)', html)
-    if exp_match:
-        for i, fy in enumerate(result['fiscal_years'][:3]):
-            result['total_expenditures'][f'FY{fy}'] = exp_match.group(i+1) if i < 3 else ''
-    
-    # Find Total Revenues line
-    rev_match = re.search(r'Total Revenues[^\$]*(\$[\d,\(\)\-]+)[^\$]*(\$[\d,\(\)\-]+)[^\$]*(\$[\d,\(\)\-]+)', html)
-    if rev_match:
-        for i, fy in enumerate(result['fiscal_years'][:3]):
-            result['total_revenues'][f'FY{fy}'] = rev_match.group(i+1) if i < 3 else ''
-    
-    # Find Net All Funds
-    net_match = re.search(r'Net All Funds[^\$]*(\$[\d,\(\)\-]+)[^\$]*(\$[\d,\(\)\-]+)[^\$]*(\$[\d,\(\)\-]+)', html)
-    if net_match:
-        for i, fy in enumerate(result['fiscal_years'][:3]):
-            result['net_impact'][f'FY{fy}'] = net_match.group(i+1) if i < 3 else ''
+    for key, pattern in TOTAL_PATTERNS.items():
+        match = pattern.search(text)
+        if match:
+            for i, fy in enumerate(result['fiscal_years'][:3]):
+                result[key][f'FY{fy}'] = match.group(i+1)
+
+# -- State government table ---------------------------------------------------
+# Each note's state_government is a long table: one row per
+# (kind, agency, fund, fiscal year) with an integer dollar amount.
+# fiscal_cube.py stacks these across bills.
+
+STATE_COLUMNS = ['kind', 'agency', 'fund', 'fiscal_year', 'amount']
+AMOUNT_CELL = re.compile(r'^\$?\s*\(?-?\$?[\d,]+\)?$')
+AGENCY_WORDS = re.compile(r'\b(Department|Office|Division|Board|Commission|Agency|Courts?|Legislature|'
+                          r'Attorney General|Auditor|Treasurer|Governor|University|College|System)\b')
+_ROW_RE = re.compile(r'<tr[^>]*>(.*?)</tr>', re.S | re.I)
+_CELL_RE = re.compile(r'<t[dh][^>]*>(.*?)</t[dh]>', re.S | re.I)
+_TEXT_ROW_RE = re.compile(r'^(.*?[A-Za-z)].*?)\s+((?:\$?\(?-?\$?[\d,]+\)?\s*){1,9})$')
+
+def state_government_rows(table):
+    """Long-table rows from a state government table given as lists of cell text
+    
+    "Revenues"/"Expenditures" rows switch the kind, rows of "FY 2026"
+    cells set the year columns, a label-only row naming an agency sets
+    the agency for the fund rows under it, and Total/Net rows are
+    skipped (they are derivable).
+    """
+    rows = []
+    kind, agency, years = None, '', []
+    for cells in table:
+        cells = [c for c in cells if c]
+        if not cells:
+            continue
+        fys = [m for c in cells for m in re.findall(r'FY\s*(\d{4})', c)]
+        label = cells[0] if not AMOUNT_CELL.match(cells[0]) else ''
+        lowered = label.lower()
+        if lowered.startswith('revenue'):
+            kind = 'revenue'
+        elif lowered.startswith('expenditure'):
+            kind = 'expenditure'
+        if fys:
+            years = [f'FY{y}' for y in fys]
+            continue
+        amounts = [c for c in cells[1:] if AMOUNT_CELL.match(c)]
+        if lowered.startswith(('revenue', 'expenditure', 'total', 'net ')):
+            continue
+        if not amounts:
+            if label and AGENCY_WORDS.search(label):
+                agency = label
+            continue
+        if kind is None or not label:
+            continue
+        if AGENCY_WORDS.search(label) and 'fund' not in lowered:
+            agency, fund = label, ''
+        else:
+            fund = label
+        for fy, amount in zip(years, amounts):
+            value = parse_amount(amount)
+            if value:
+                rows.append([kind, agency, fund, fy, value])
+    return rows
+
+def parse_state_government(html):
+    """{'columns': STATE_COLUMNS, 'rows': [...]} from the note's HTML tables, or {}"""
+    start = re.search(r'State\s+Government', html)
+    end = re.search(r'Local\s+Government', html[start.end():]) if start else None
+    section = html[start.start():start.end() + end.start()] if end else html[start.start():] if start else html
+    table = [[clean_text(c) for c in _CELL_RE.findall(row)] for row in _ROW_RE.findall(section)]
+    rows = state_government_rows(table)
+    return {'columns': STATE_COLUMNS, 'rows': rows} if rows else {}
+
+def state_government_from_lines(lines):
+    """Same as parse_state_government(), from extracted PDF text lines"""
+    table = []
+    for line in lines:
+        m = None if re.search(r'FY\s*\d{4}', line) else _TEXT_ROW_RE.match(line)
+        table.append([m.group(1).strip()] + m.group(2).split() if m else [line])
+    rows = state_government_rows(table)
+    return {'columns': STATE_COLUMNS, 'rows': rows} if rows else {}
+
+def has_content(note):
+    """Whether a parsed note carries anything beyond its empty skeleton
+    
+    Every empty_note() field counts except fiscal_years, which only echoes
+    the column headings every note renders.
+    """
+    return bool(note) and any(note.get(key) for key in empty_note() if key != 'fiscal_years')
+
+def merge_pdf_note(note, pdf_note):
+    """The HTML note with its empty fields filled from the PDF note; the PDF note if there is none"""
+    if not note:
+        return pdf_note
+    filled = [key for key in empty_note() if not note.get(key) and pdf_note.get(key)]
+    for key in filled:
+        note[key] = pdf_note[key]
+    if filled:
+        note['impact_level'] = calculate_impact_level(note)
+        note['source'] = 'html+pdf'
+    return note
+
+def parse_fiscal_note(html):
+    """Parse fiscal note HTML and extract key data"""
+    if not html:
+        return None
+    
+    result = empty_note()
+    
+    # Fiscal years and the Total Expenditures / Total Revenues / Net All Funds rows
+    parse_totals(result, html)
+    
+    # Per-fund / per-agency rows of the state government table
+    result['state_government'] = parse_state_government(html)
     
     # Extract text summaries
     # Local Government
@@ -90,6 +244,75 @@ def parse_fiscal_note(html):
     
     return result
 
+# Section headings in the PDF text, e.g. "Local Governments (UCA 36-12-13(2)(c))"
+PDF_SECTIONS = {
+    'local_government': re.compile(r'Local\s+Government', re.IGNORECASE),
+    'individuals_businesses': re.compile(r'Individuals.*Businesses', re.IGNORECASE),
+    'regulatory_impact': re.compile(r'Regulatory\s+Impact', re.IGNORECASE),
+}
+
+def parse_fiscal_text(pages):
+    """Parse fiscal note text (an iterable of page strings) into the HTML note schema
+    
+    Pages are consumed one at a time; only the note's text is held, never
+    the PDF itself.
+    """
+    lines = [line.strip() for page in pages for line in page.splitlines() if line.strip()]
+    if not lines:
+        return None
+    text = '\n'.join(lines)
+    
+    result = empty_note()
+    parse_totals(result, text)
+    
+    start = next((i for i, line in enumerate(lines) if re.search(r'State\s+Government', line)), 0)
+    stop = next((i for i, line in enumerate(lines) if i > start and re.search(r'Local\s+Government', line)), len(lines))
+    result['state_government'] = state_government_from_lines(lines[start:stop])
+    
+    # A section runs from its "(UCA ...)" heading to the next heading
+    headings = [i for i, line in enumerate(lines) if '(UCA' in line]
+    for n, start in enumerate(headings):
+        stop = headings[n + 1] if n + 1 < len(headings) else len(lines)
+        for key, pattern in PDF_SECTIONS.items():
+            if pattern.search(lines[start]) and not result[key]:
+                result[key] = clean_text(' '.join(lines[start + 1:stop]))
+    
+    # "This bill ..." sentences may wrap across lines in the PDF text
+    flat = re.sub(r'\s+', ' ', text)
+    summaries = re.findall(r'(This bill [^.]{20,300}\.?)', flat)
+    if summaries:
+        result['summary'] = ' '.join(dict.fromkeys(summaries))[:500]
+    
+    result['impact_level'] = calculate_impact_level(result)
+    result['source'] = 'pdf'
+    return result
+
+def parse_pdf_file(job):
+    """(bill_number, pdf_path) -> (bill_number, note or None, error or None); runs in worker processes
+    
+    Errors come back to the parent so they land in its run report.
+    """
+    bill_num, path = job
+    errors = []
+    try:
+        note = parse_fiscal_text(iter_pages(path, PDF_PAGE_LIMIT, errors))
+    except OSError as e:
+        return bill_num, None, str(e)
+    return bill_num, note, errors[0] if errors else None
+
+def parse_pdf_parallel(jobs, workers=None, chunksize=None):
+    """Fan (bill_number, pdf_path) jobs out over a process pool, in job order"""
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, len(jobs) // (workers * 4))
+    
+    if workers == 1 or len(jobs) < 2:
+        yield from map(parse_pdf_file, jobs)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(parse_pdf_file, jobs, chunksize=chunksize)
+
 def clean_text(text):
     """Clean HTML text"""
     text = re.sub(r'<[^>]+>', ' ', text)
@@ -129,38 +352,98 @@ def calculate_impact_level(data):
     else:
         return 'Very High'
 
+def load_existing_notes(output_file):
+    """Load previously saved fiscal notes (empty if none yet)"""
+    if not os.path.exists(output_file):
+        return {}
+    with open(output_file, 'r') as f:
+        return json.load(f).get('notes', {})
+
 def generate_all_fiscal():
     """Generate fiscal data for controversial bills"""
-    with open('data/bills.json', 'r') as f:
-        bills_data = json.load(f)
-    
-    # Get controversial bills
-    controversial = bills_data['bills']  # Process ALL bills
+    run = pipeline_metrics.start_run('scrape_fiscal_notes')
+
+    # Only bill numbers are needed up front, so read them from the index
+    with run.span('load'):
+        bills_index = open_index(BILLS_FILE, 'bills', 'bill_number')
+        controversial = list(bills_index.keys())  # Process ALL bills
     print(f"Processing {len(controversial)} controversial bills...")
     
+    # Existing notes are checked by key; the full file is only loaded
+    # once there is a new note to merge into it
     output_file = 'data/fiscal_notes.json'
-    if os.path.exists(output_file):
-        with open(output_file, 'r') as f:
-            existing = json.load(f)
-        notes = existing.get('notes', {})
-    else:
-        notes = {}
+    with run.span('load'):
+        done = optional_index(output_file, 'notes')
+    notes = None
+    needs_pdf = []
     
-    for i, bill in enumerate(controversial):
-        bill_num = bill['bill_number']
-        
-        if bill_num in notes:
+    for i, bill_num in enumerate(controversial):
+        if bill_num in done:
+            run.count('skipped')
             continue
         
         print(f"  [{i+1}/{len(controversial)}] {bill_num}...")
         
-        html = fetch_fiscal_html(bill_num)
+        was_cached = os.path.exists(fiscal_html_cache_path(bill_num))
+        with run.span('fetch', bill_num):
+            html = fetch_fiscal_html(bill_num)
         if html:
-            parsed = parse_fiscal_note(html)
+            with run.span('parse', bill_num):
+                parsed = parse_fiscal_note(html)
             if parsed:
+                if notes is None:
+                    with run.span('load'):
+                        notes = load_existing_notes(output_file)
                 notes[bill_num] = parsed
+                run.count('parsed')
+            if not has_content(parsed):
+                needs_pdf.append(bill_num)
+        else:
+            needs_pdf.append(bill_num)
         
-        time.sleep(0.3)
+        if not was_cached:
+            run.sleep(0.3, bill_num)
+    
+    # PDF fallback: download sequentially (rate-limited), parse in parallel
+    recovered = 0
+    if needs_pdf:
+        print(f"\n📄 Trying PDF fiscal notes for {len(needs_pdf)} bills...")
+        jobs = []
+        for bill_num in needs_pdf:
+            was_cached = os.path.exists(fiscal_pdf_cache_path(bill_num))
+            bill = bills_index.get(bill_num) or {}
+            with run.span('fetch_pdf', bill_num):
+                path = fetch_fiscal_pdf(bill_num, bill.get('fiscal_note_pdf'))
+            if path:
+                jobs.append((bill_num, path))
+            if not was_cached:
+                run.sleep(0.3, bill_num)
+        
+        with run.span('parse_pdf'):
+            for bill_num, parsed, error in parse_pdf_parallel(jobs):
+                if error:
+                    run.error('pdf_truncated', bill_num, error)
+                if not has_content(parsed):
+                    run.error('pdf_unparsed', bill_num)
+                    continue
+                if notes is None:
+                    with run.span('load'):
+                        notes = load_existing_notes(output_file)
+                notes[bill_num] = merge_pdf_note(notes.get(bill_num), parsed)
+                recovered += 1
+        run.count('parsed_pdf', recovered)
+    
+    missing = sum(1 for bill_num in needs_pdf if bill_num not in (notes or {}))
+    print(f"\n📊 Coverage: {run.counters['parsed']} HTML notes "
+          f"({len(needs_pdf) - missing - recovered} of them still empty), "
+          f"{recovered} filled or recovered from PDF, {missing} still missing "
+          f"(of {len(controversial)} bills)")
+    run.count('missing', missing)
+    
+    if notes is None:
+        print(f"\n✅ No new fiscal notes ({len(done)} already in {output_file})")
+        run.finish()
+        return
     
     output = {
         'generated_date': time.strftime('%Y-%m-%dT%H:%M:%S'),
@@ -168,15 +451,95 @@ def generate_all_fiscal():
         'notes': notes
     }
     
-    with open(output_file, 'w') as f:
-        json.dump(output, f, indent=2)
+    with run.span('serialize'):
+        with open(output_file, 'w') as f:
+            json.dump(output, f, indent=2)
     
     print(f"\n✅ Saved {len(notes)} fiscal notes to {output_file}")
+    run.finish()
 
-if __name__ == "__main__":
+def reparse_cached():
+    """Re-parse every cached note (HTML, else PDF) with the current parser; no fetching
+    
+    Needed after parser changes such as the state government table, since
+    --all skips bills that already have a note.
+    """
+    run = pipeline_metrics.start_run('scrape_fiscal_notes')
+    output_file = 'data/fiscal_notes.json'
+    with run.span('load'):
+        bills = list(open_index(BILLS_FILE, 'bills', 'bill_number').keys())
+        notes = load_existing_notes(output_file)
+    
+    pdf_jobs = []
+    for bill_num in bills:
+        html_path = fiscal_html_cache_path(bill_num)
+        if os.path.exists(html_path):
+            with open(html_path, 'r') as f:
+                with run.span('parse', bill_num):
+                    parsed = parse_fiscal_note(f.read())
+            if parsed:
+                notes[bill_num] = parsed
+                run.count('parsed')
+            if has_content(parsed):
+                continue
+        if os.path.exists(fiscal_pdf_cache_path(bill_num)):
+            pdf_jobs.append((bill_num, fiscal_pdf_cache_path(bill_num)))
+    with run.span('parse_pdf'):
+        for bill_num, parsed, error in parse_pdf_parallel(pdf_jobs):
+            if error:
+                run.error('pdf_truncated', bill_num, error)
+            if has_content(parsed):
+                notes[bill_num] = merge_pdf_note(notes.get(bill_num), parsed)
+                run.count('parsed_pdf')
+    
+    tables = sum(1 for n in notes.values() if n.get('state_government'))
+    print(f"  Re-parsed {run.counters['parsed']} HTML + {run.counters['parsed_pdf']} PDF notes; "
+          f"{tables} of {len(notes)} have a state government table")
+    output = {
+        'generated_date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'total_bills': len(notes),
+        'notes': notes
+    }
+    with run.span('serialize'):
+        with open(output_file, 'w') as f:
+            json.dump(output, f, indent=2)
+    run.finish()
+
+def check_fixtures():
+    """Parse the saved state government note (HTML and PDF text); returns failure messages"""
+    with open(f'{FIXTURE}.json', 'r') as f:
+        expected = json.load(f)['rows']
+    with open(f'{FIXTURE}.fn.html', 'r') as f:
+        html_note = parse_fiscal_note(f.read())
+    with open(f'{FIXTURE}.fn.txt', 'r') as f:
+        pdf_note = parse_fiscal_text([f.read()])
+    
+    failures = []
+    for source, note in (('html', html_note), ('pdf', pdf_note)):
+        rows = (note.get('state_government') or {}).get('rows', [])
+        if rows != expected:
+            missing = [r for r in expected if r not in rows]
+            extra = [r for r in rows if r not in expected]
+            failures.append(f"{source}: {len(rows)} rows, expected {len(expected)} "
+                            f"(missing {missing[:2]}, unexpected {extra[:2]})")
+        table_only = dict(empty_note(), state_government=note.get('state_government') or {})
+        if not has_content(table_only):
+            failures.append(f"{source}: a note with only a state government table counts as empty")
+    return failures
+
+def main():
     import sys
     if len(sys.argv) > 1 and sys.argv[1] == '--all':
         generate_all_fiscal()
+    elif len(sys.argv) > 1 and sys.argv[1] == '--reparse':
+        reparse_cached()
+    elif len(sys.argv) > 1 and sys.argv[1] == '--check':
+        failures = check_fixtures()
+        for failure in failures:
+            print(f"  ❌ {failure}")
+        print(f"{'❌' if failures else '✅'} State government table parsers "
+              f"{'disagree with' if failures else 'match'} {FIXTURE}.json")
+        sys.exit(1 if failures else 0)
     else:
         # Test one bill
         print("Testing HB0001 fiscal note...")
@@ -187,3 +550,9 @@ if __name__ == "__main__":
         else:
             print("No fiscal note found")
         print("\nUse --all to process all controversial bills")
+        print("Use --reparse to re-parse every cached note without fetching")
+        print("Use --check to run the table parsers against the saved fixture")
+
+
+if __name__ == "__main__":
+    main()
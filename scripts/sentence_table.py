@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Sentence Table - Content-addressed store for the language analyzer's sentences
+Usage:
+  python3 scripts/sentence_table.py            # intern sentences in data/bill_language.json in place
+  python3 scripts/sentence_table.py --check    # verify every sentence ID resolves, print sizes
+
+bill_language.json used to carry up to 10 raw sentences per category per
+bill, and statutory boilerplate ("(1) The department shall:",
+appropriation clauses) was repeated across hundreds of bills. Sentences
+now live once in data/sentences/, keyed by a short hash of their text,
+and each analysis category holds `ids` instead of `sentences`:
+
+  data/sentences/<first 2 hex digits of id>.json    {id: text}
+
+Sharding by ID prefix lets the analysis page fetch only the few small
+shards one bill needs, after its counts are already on screen.
+
+A sentence counts as boilerplate when sentences of the same shape
+(lowercased, digits masked) appear in BOILERPLATE_MIN_BILLS or more
+bills. Frequencies come from the stored sentences, so they can be
+recomputed from the table alone. Each category records how many of its
+sentences are boilerplate, and each analysis carries `substantive`
+totals with them excluded.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+from collections import defaultdict
+
+SENTENCE_DIR = 'data/sentences'
+LANGUAGE_FILE = 'data/bill_language.json'
+ID_LENGTH = 10              # 40 bits; add() refuses a collision rather than guess
+BOILERPLATE_MIN_BILLS = 5
+KINDS = ('shall', 'shall_not', 'may', 'may_not', 'must')
+
+
+def sentence_id(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:ID_LENGTH]
+
+
+def shape(text):
+    """Frequency key: same sentence modulo case, numbering and spacing"""
+    return re.sub(r'\s+', ' ', re.sub(r'\d+', '#', text.lower())).strip()
+
+
+class SentenceTable:
+    """{id: text}, stored as one small JSON file per ID prefix, loaded on demand"""
+
+    def __init__(self, directory=SENTENCE_DIR):
+        self.directory = directory
+        self.shards = {}
+        self.dirty = set()
+
+    def _path(self, prefix):
+        return os.path.join(self.directory, f'{prefix}.json')
+
+    def _shard(self, prefix):
+        if prefix not in self.shards:
+            path = self._path(prefix)
+            if os.path.exists(path):
+                with open(path, 'r') as f:
+                    self.shards[prefix] = json.load(f)
+            else:
+                self.shards[prefix] = {}
+        return self.shards[prefix]
+
+    def get(self, sid, default=None):
+        return self._shard(sid[:2]).get(sid, default)
+
+    def texts(self, ids):
+        return [self.get(sid, '') for sid in ids]
+
+    def add(self, text):
+        """Intern one sentence; returns its ID"""
+        sid = sentence_id(text)
+        shard = self._shard(sid[:2])
+        existing = shard.get(sid)
+        if existing is None:
+            shard[sid] = text
+            self.dirty.add(sid[:2])
+        elif existing != text:
+            raise ValueError(f'sentence ID collision on {sid}: {existing[:60]!r} vs {text[:60]!r}')
+        return sid
+
+    def save(self, keep=None):
+        """Write changed shards; with `keep`, first drop IDs no longer referenced"""
+        if keep is not None:
+            if os.path.isdir(self.directory):
+                for name in os.listdir(self.directory):
+                    if name.endswith('.json'):
+                        self._shard(name[:-5])
+            for prefix, shard in self.shards.items():
+                stale = [sid for sid in shard if sid not in keep]
+                for sid in stale:
+                    del shard[sid]
+                if stale:
+                    self.dirty.add(prefix)
+        os.makedirs(self.directory, exist_ok=True)
+        for prefix in sorted(self.dirty):
+            shard = self.shards[prefix]
+            path = self._path(prefix)
+            if not shard:
+                if os.path.exists(path):
+                    os.remove(path)
+                continue
+            with open(path, 'w') as f:
+                json.dump(dict(sorted(shard.items())), f, separators=(',', ':'))
+        self.dirty.clear()
+
+
+def referenced_ids(analyses):
+    return {sid for a in analyses.values() for kind in KINDS for sid in (a.get(kind) or {}).get('ids', [])}
+
+
+def intern_analyses(analyses, table):
+    """Swap sentence text for IDs in place, then flag boilerplate
+
+    Analyses straight from analyze_text() carry `sentences`; ones loaded
+    back from bill_language.json already carry `ids`. Returns the sorted
+    boilerplate IDs.
+    """
+    for analysis in analyses.values():
+        for kind in KINDS:
+            category = analysis.get(kind)
+            if category is not None and 'sentences' in category:
+                category['ids'] = [table.add(s) for s in category.pop('sentences')]
+
+    bills_by_shape = defaultdict(set)
+    shapes = {}
+    for number, analysis in analyses.items():
+        for kind in KINDS:
+            for sid in (analysis.get(kind) or {}).get('ids', []):
+                if sid not in shapes:
+                    shapes[sid] = shape(table.get(sid, ''))
+                bills_by_shape[shapes[sid]].add(number)
+    boilerplate = {sid for sid, s in shapes.items() if len(bills_by_shape[s]) >= BOILERPLATE_MIN_BILLS}
+
+    for analysis in analyses.values():
+        flagged = {}
+        for kind in KINDS:
+            category = analysis.get(kind)
+            if category is not None:
+                category['boilerplate'] = sum(1 for sid in category.get('ids', []) if sid in boilerplate)
+                flagged[kind] = category['boilerplate']
+        totals = analysis.get('totals', {})
+        analysis['substantive'] = {
+            'mandatory': totals.get('mandatory', 0) - flagged.get('shall', 0) - flagged.get('must', 0),
+            'prohibited': totals.get('prohibited', 0) - flagged.get('shall_not', 0) - flagged.get('may_not', 0),
+            'discretionary': totals.get('discretionary', 0) - flagged.get('may', 0),
+        }
+    return sorted(boilerplate)
+
+
+def language_payload(analyses, generated_date, table):
+    """The bill_language.json payload, with its sentences interned into `table`"""
+    boilerplate = intern_analyses(analyses, table)
+    return {
+        'generated_date': generated_date,
+        'total_bills': len(analyses),
+        'sentence_dir': table.directory,
+        'boilerplate_min_bills': BOILERPLATE_MIN_BILLS,
+        'boilerplate': boilerplate,
+        'analyses': analyses,
+    }
+
+
+def write_language(output_file, analyses, generated_date, directory=SENTENCE_DIR):
+    """Intern, prune the table to what is referenced, and write bill_language.json"""
+    table = SentenceTable(directory)
+    output = language_payload(analyses, generated_date, table)
+    table.save(keep=referenced_ids(analyses))
+    with open(output_file, 'w') as f:
+        json.dump(output, f, separators=(',', ':'))
+    return output
+
+
+def dir_size(directory):
+    if not os.path.isdir(directory):
+        return 0, 0
+    names = [n for n in os.listdir(directory) if n.endswith('.json')]
+    return len(names), sum(os.path.getsize(os.path.join(directory, n)) for n in names)
+
+
+def check(output_file=LANGUAGE_FILE, directory=SENTENCE_DIR):
+    with open(output_file, 'r') as f:
+        data = json.load(f)
+    table = SentenceTable(directory)
+    ids = referenced_ids(data['analyses'])
+    missing = [sid for sid in ids if table.get(sid) is None]
+    shards, size = dir_size(directory)
+    print(f"  {output_file}: {os.path.getsize(output_file) / 1e6:.2f} MB, {len(data['analyses'])} bills")
+    print(f"  {directory}/: {shards} shards, {size / 1e6:.2f} MB, {len(ids)} sentences, "
+          f"{len(data.get('boilerplate', []))} boilerplate")
+    if missing:
+        print(f"❌ {len(missing)} sentence IDs do not resolve (e.g. {missing[0]})")
+        return False
+    print("✅ Every sentence ID resolves")
+    return True
+
+
+def main():
+    if '--check' in sys.argv:
+        sys.exit(0 if check() else 1)
+
+    with open(LANGUAGE_FILE, 'r') as f:
+        data = json.load(f)
+    before = os.path.getsize(LANGUAGE_FILE)
+    output = write_language(LANGUAGE_FILE, data['analyses'], data.get('generated_date'))
+    shards, size = dir_size(SENTENCE_DIR)
+    after = os.path.getsize(LANGUAGE_FILE)
+    print(f"✅ Interned {len(referenced_ids(output['analyses']))} sentences "
+          f"({len(output['boilerplate'])} boilerplate)")
+    print(f"   {LANGUAGE_FILE}: {before / 1e6:.2f} MB -> {after / 1e6:.2f} MB "
+          f"(+ {size / 1e6:.2f} MB in {shards} shards under {SENTENCE_DIR}/)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Snapshot Store - Deduplicated per-record history of the pipeline's outputs
+Usage:
+  python3 scripts/snapshot_store.py                           # snapshot the current data/ files
+  python3 scripts/snapshot_store.py --get bills HB0085 --at 2025-02-20
+  python3 scripts/snapshot_store.py --history bills HB0085    # runs where the record changed
+  python3 scripts/snapshot_store.py --runs
+  python3 scripts/snapshot_store.py --gc 30                   # keep the newest 30 runs
+
+Every pipeline run overwrites data/*.json in place, so "what did the
+tracker say about HB0085 on Feb 20" had no answer. Keeping whole copies
+would cost about 10MB per run. This store splits each change_feed
+SOURCES file into its records (per bill, per legislator) and stores
+every record once, by content:
+
+  snapshots/objects/<2 hex>/<38 hex>   zlib(canonical JSON), named by record_hash()
+  snapshots/runs/<run id>.json         {source: hash of its {key: hash} map} for one run
+
+A source's {key: hash} map is itself stored as a blob, so a run where a
+source did not change points at the previous run's map and writes
+nothing for it. A run writes only blobs it has not seen before, plus a
+run file of a few hundred bytes. Storage therefore grows with what
+changed. A point-in-time read is a bisect over the run IDs (timestamps),
+then one run file, one source map and one blob. Two runs in the same
+second get -01, -02... suffixes. --gc drops old runs, then deletes every
+blob no remaining run reaches.
+"""
+
+import bisect
+import json
+import os
+import sys
+import zlib
+from datetime import datetime
+
+import pipeline_metrics
+from change_feed import SOURCES, canonical_json, iter_source, record_hash
+
+STORE_DIR = 'snapshots'
+RUN_ID_FORMAT = '%Y%m%dT%H%M%S'
+RUN_ID_LAST = '~'           # sorts after any -NN suffix of the same second
+
+
+def _parse_at(value):
+    """Run ID upper bound for --at: an ISO date (that whole day) or datetime"""
+    if len(value) == 10:
+        value += 'T23:59:59'
+    return datetime.fromisoformat(value).strftime(RUN_ID_FORMAT) + RUN_ID_LAST
+
+
+class SnapshotStore:
+    """Content-addressed record blobs and source maps, plus one manifest per run"""
+
+    def __init__(self, directory=STORE_DIR):
+        self.directory = directory
+        self.objects_dir = os.path.join(directory, 'objects')
+        self.runs_dir = os.path.join(directory, 'runs')
+        self._manifests = {}
+        self._maps = {}
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+
+    def _manifest_path(self, run_id):
+        return os.path.join(self.runs_dir, f'{run_id}.json')
+
+    def has(self, digest):
+        return os.path.exists(self._object_path(digest))
+
+    def put(self, record):
+        """Store one record; returns (hash, bytes written - 0 if already stored)"""
+        digest = record_hash(record)
+        path = self._object_path(digest)
+        if os.path.exists(path):
+            return digest, 0
+        data = zlib.compress(canonical_json(record).encode('utf-8'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f'{path}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+        return digest, len(data)
+
+    def load(self, digest):
+        with open(self._object_path(digest), 'rb') as f:
+            return json.loads(zlib.decompress(f.read()))
+
+    def runs(self):
+        """Run IDs, oldest first"""
+        if not os.path.isdir(self.runs_dir):
+            return []
+        return sorted(name[:-5] for name in os.listdir(self.runs_dir) if name.endswith('.json'))
+
+    def manifest(self, run_id):
+        if run_id not in self._manifests:
+            with open(self._manifest_path(run_id), 'r') as f:
+                self._manifests[run_id] = json.load(f)
+        return self._manifests[run_id]
+
+    def records(self, run_id, source):
+        """{key: hash} of `source` in a run ({} if the run did not archive it)"""
+        digest = self.manifest(run_id)['sources'].get(source)
+        if digest is None:
+            return {}
+        if digest not in self._maps:
+            self._maps[digest] = self.load(digest)
+        return self._maps[digest]
+
+    def _claim_run_id(self, run_id):
+        """Create the manifest file for `run_id`, adding a -NN suffix if it is taken"""
+        os.makedirs(self.runs_dir, exist_ok=True)
+        candidate, n = run_id, 0
+        while True:
+            try:
+                return candidate, open(self._manifest_path(candidate), 'x')
+            except FileExistsError:
+                n += 1
+                candidate = f'{run_id}-{n:02d}'
+
+    def snapshot(self, sources=SOURCES, run_id=None):
+        """Archive every record of `sources`; returns the new manifest"""
+        previous = self.runs()
+        parent = previous[-1] if previous else None
+        manifest = {'run_id': run_id or datetime.now().strftime(RUN_ID_FORMAT),
+                    'generated_date': datetime.now().isoformat(),
+                    'parent': parent, 'sources': {}, 'stats': {}}
+        for name in sources:
+            records = {}
+            new_blobs = new_bytes = 0
+            for key, record in iter_source(name):
+                digest, written = self.put(record)
+                records[key] = digest
+                if written:
+                    new_blobs += 1
+                    new_bytes += written
+            if not records:
+                continue
+            digest, written = self.put(records)
+            self._maps[digest] = records
+            # An unchanged source hashes to the parent's map, already cached
+            old = self.records(parent, name) if parent else {}
+            manifest['sources'][name] = digest
+            manifest['stats'][name] = {
+                'records': len(records),
+                'changed': sum(1 for k, h in records.items() if old.get(k) != h),
+                'removed': len(set(old) - set(records)),
+                'new_blobs': new_blobs + bool(written),
+                'new_bytes': new_bytes + written,
+            }
+
+        run_id, f = self._claim_run_id(manifest['run_id'])
+        manifest['run_id'] = run_id
+        with f:
+            json.dump(manifest, f, separators=(',', ':'))
+        self._manifests[run_id] = manifest
+        return manifest
+
+    def run_at(self, at=None):
+        """The newest run at or before `at` (an ISO date/datetime), or None"""
+        runs = self.runs()
+        if at is None:
+            return runs[-1] if runs else None
+        i = bisect.bisect_right(runs, _parse_at(at))
+        return runs[i - 1] if i else None
+
+    def get(self, source, key, at=None):
+        """A record as of `at` (latest run if None); None if it did not exist then"""
+        run_id = self.run_at(at)
+        if run_id is None:
+            return None
+        digest = self.records(run_id, source).get(key)
+        return self.load(digest) if digest else None
+
+    def history(self, source, key):
+        """[(run ID, hash or None)] for each run where the record changed"""
+        changes = []
+        last = last_map = None
+        for run_id in self.runs():
+            source_map = self.manifest(run_id)['sources'].get(source)
+            if source_map == last_map and source_map is not None:
+                continue                    # same map, same record
+            last_map = source_map
+            digest = self.records(run_id, source).get(key)
+            if digest != last:
+                changes.append((run_id, digest))
+                last = digest
+        return changes
+
+    def gc(self, keep):
+        """Keep the newest `keep` runs; delete older manifests and unreferenced blobs"""
+        runs = self.runs()
+        dropped = runs[:-keep] if keep else runs
+        for run_id in dropped:
+            os.remove(self._manifest_path(run_id))
+            self._manifests.pop(run_id, None)
+
+        live = set()
+        for run_id in self.runs():
+            for source, digest in self.manifest(run_id)['sources'].items():
+                live.add(digest)
+                live.update(self.records(run_id, source).values())
+
+        removed = freed = 0
+        if os.path.isdir(self.objects_dir):
+            for shard in os.listdir(self.objects_dir):
+                shard_dir = os.path.join(self.objects_dir, shard)
+                for name in os.listdir(shard_dir):
+                    if shard + name not in live:
+                        path = os.path.join(shard_dir, name)
+                        freed += os.path.getsize(path)
+                        os.remove(path)
+                        removed += 1
+                if not os.listdir(shard_dir):
+                    os.rmdir(shard_dir)
+        return len(dropped), removed, freed
+
+    def size(self):
+        """(blob count, total bytes) under objects/"""
+        count = total = 0
+        for root, _, files in os.walk(self.objects_dir):
+            count += len(files)
+            total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+        return count, total
+
+
+def _arg(flag, default=None):
+    return sys.argv[sys.argv.index(flag) + 1] if flag in sys.argv else default
+
+
+def main():
+    store = SnapshotStore()
+
+    if '--get' in sys.argv:
+        source, key = sys.argv[sys.argv.index('--get') + 1:][:2]
+        at = _arg('--at')
+        record = store.get(source, key, at)
+        if record is None:
+            print(f"❌ No {source} record {key} as of {at or 'the latest run'} ({store.run_at(at)})")
+            sys.exit(1)
+        print(json.dumps(record, indent=2, ensure_ascii=False))
+        return
+
+    if '--history' in sys.argv:
+        source, key = sys.argv[sys.argv.index('--history') + 1:][:2]
+        for run_id, digest in store.history(source, key):
+            print(f"  {run_id}  {digest[:12] if digest else '(absent)'}")
+        return
+
+    if '--runs' in sys.argv:
+        for run_id in store.runs():
+            stats = store.manifest(run_id).get('stats', {})
+            changed = ', '.join(f"{name} {s['changed']}" for name, s in stats.items() if s['changed'])
+            print(f"  {run_id}  {changed or 'no changes'}")
+        return
+
+    if '--gc' in sys.argv:
+        dropped, removed, freed = store.gc(int(_arg('--gc')))
+        print(f"🗑️  Dropped {dropped} runs, {removed} unreferenced blobs ({freed / 1e6:.2f} MB)")
+        return
+
+    print("=" * 60)
+    print("SNAPSHOT STORE")
+    print("=" * 60)
+    run = pipeline_metrics.start_run('snapshot_store')
+
+    with run.span('serialize'):
+        manifest = store.snapshot()
+
+    for name, s in manifest['stats'].items():
+        print(f"  {name:<14} {s['records']:>5} records, {s['changed']:>5} changed, "
+              f"{s['new_blobs']:>5} new blobs ({s['new_bytes'] / 1e3:.1f} KB)")
+        run.count('new_blobs', s['new_blobs'])
+        run.count('new_bytes', s['new_bytes'])
+    blobs, total = store.size()
+    print(f"\n  Store: {len(store.runs())} runs, {blobs} blobs, {total / 1e6:.2f} MB")
+    print(f"✅ Saved run {manifest['run_id']}")
+    run.finish()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Tag Topics - Classify every bill into the data/prompts.json topic taxonomy
+Usage: python3 scripts/tag_topics.py        # writes data/bill_topics.json
+
+Topics come from prompts.json `topic_mapping` (the same taxonomy the
+prompt cards use), so a bill's tags line up with the prompts for it.
+Each bill is featurized from its title, provisions and extracted text
+(cached bill XML when available, otherwise the SHALL/MAY sentences that
+bill_language.json references) into TF-IDF vectors; term counts are
+cached under cache/features/ so only new or changed bills are re-tokenized.
+
+Scoring is two-pass and fully offline:
+  1. seed score - TF-IDF weight of each topic's seed keywords, with a
+     bonus when a seed appears in the title
+  2. centroid score - cosine similarity to the centroid of the bills the
+     seeds tagged confidently
+
+The existing `topics` field in bills.json is used as a labeled subset
+for per-topic precision/recall; it is never used for training. Those
+labels are noisy (fireworks and veterans bills are labeled Housing), so
+seeds are terms that mean the topic on their own, not ones that only
+match a label.
+"""
+
+import json
+import os
+from datetime import datetime
+
+import pipeline_metrics
+from analyze_bill_language import bill_xml_cache_path, extract_text_from_xml
+from artifact_index import open_index, optional_index
+from sentence_table import KINDS, SentenceTable
+from text_features import FeatureCache, bill_document, cosine, stem, tfidf, tokenize
+
+BILLS_FILE = 'data/bills.json'
+PROMPTS_FILE = 'data/prompts.json'
+LANGUAGE_FILE = 'data/bill_language.json'
+OUTPUT_FILE = 'data/bill_topics.json'
+
+# Seed keywords per taxonomy topic (stemmed with the same tokenizer)
+TOPIC_SEEDS = {
+    'Healthcare': 'health medical medicaid hospital physician patient nurse pharmacy drug '
+                  'prescription mental insurance clinic disease treatment care dental',
+    'Education': 'school education student teacher academic university college charter '
+                 'curriculum classroom board learning scholarship higher',
+    'Immigration': 'immigration immigrant alien citizenship deportation refugee undocumented',
+    'Guns': 'firearm gun weapon ammunition concealed rifle handgun shooting',
+    'Abortion': 'abortion pregnancy unborn fetus embryo reproductive',
+    'Housing': 'housing home rent landlord tenant dwelling residential homeless homelessness '
+               'mortgage affordable zoning subdivision homeowner landowner development community',
+    'Climate': 'environment environmental water air quality emission energy wildlife '
+               'conservation pollution climate land lake mining oil gas renewable solar',
+    'Taxes': 'tax taxation income sales revenue credit exemption levy assessment '
+             'appropriation budget',
+    'Labor': 'employee employer employment labor wage worker union compensation '
+             'workforce occupational retirement',
+    'LGBTQ': 'gender sex sexual orientation transgender identity marriage biological',
+    'Criminal Justice': 'criminal crime offense prison jail sentence probation parole '
+                        'police enforcement court prosecutor felony misdemeanor victim',
+    # Not 'public', 'agency' or 'legislature': nearly every bill uses them
+    'Government': 'government governmental election voter ballot candidate campaign precinct '
+                  'county municipal official procurement records administrative rulemaking '
+                  'ethics disclosure lobbyist redistricting',
+    'Disability': 'disability disabled accessibility impairment guardianship special needs',
+    'Business': 'business commerce license licensing company corporation consumer '
+                'contract insurance insurer industry commercial bank financial regulation '
+                'liability product association innovation employer',
+}
+
+# Existing bills.json topic labels -> taxonomy, for evaluation only
+LABEL_MAP = {
+    'Healthcare': 'Healthcare',
+    'Education': 'Education',
+    'Housing': 'Housing',
+    'Environment': 'Climate',
+    'Tax & Budget': 'Taxes',
+    'Criminal Justice': 'Criminal Justice',
+    'Government': 'Government',
+    'Business': 'Business',
+}
+
+TITLE_BONUS = 0.15      # per seed found in the title
+SEED_CONFIDENT = 0.25   # seed score that makes a bill part of a topic's centroid
+MIN_SCORE = 0.2         # final score to tag a topic
+RELATIVE_MIN = 0.6      # ...and at least this share of the bill's best score
+MAX_TOPICS = 3
+
+
+def load_taxonomy():
+    with open(PROMPTS_FILE, 'r') as f:
+        return list(json.load(f)['topic_mapping'])
+
+
+def extracted_text(bill_number, analyses, sentences):
+    """Bill body text: cached XML if we have it, else the analyzer's sentences"""
+    path = bill_xml_cache_path(bill_number)
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            return extract_text_from_xml(f.read())
+    analysis = analyses.get(bill_number) or {}
+    return ' '.join(
+        s for kind in KINDS
+        for s in sentences.texts((analysis.get(kind) or {}).get('ids', []))
+    )
+
+
+def seed_scores(vectors, titles, taxonomy):
+    seeds = {t: {stem(w) for w in TOPIC_SEEDS.get(t, '').split()} for t in taxonomy}
+    scores = {}
+    for bill, vec in vectors.items():
+        title_terms = set(tokenize(titles[bill]))
+        scores[bill] = {
+            topic: sum(vec.get(s, 0.0) for s in terms) + TITLE_BONUS * len(terms & title_terms)
+            for topic, terms in seeds.items()
+        }
+    return scores
+
+
+def centroids(vectors, seeds, taxonomy):
+    """Mean normalized vector of each topic's confidently seeded bills"""
+    result = {}
+    for topic in taxonomy:
+        members = [b for b, s in seeds.items() if s[topic] >= SEED_CONFIDENT]
+        if not members:
+            continue
+        centroid = {}
+        for bill in members:
+            for term, w in vectors[bill].items():
+                centroid[term] = centroid.get(term, 0.0) + w
+        norm = sum(w * w for w in centroid.values()) ** 0.5 or 1.0
+        result[topic] = {t: w / norm for t, w in centroid.items()}
+    return result
+
+
+def assign(vectors, seeds, cents, taxonomy):
+    """{bill: [(topic, score)]} best first"""
+    tags = {}
+    for bill, vec in vectors.items():
+        scores = {}
+        for topic in taxonomy:
+            centroid_score = cosine(vec, cents[topic]) if topic in cents else 0.0
+            scores[topic] = 0.5 * min(seeds[bill][topic], 1.0) + 0.5 * centroid_score
+        best = max(scores.values(), default=0.0)
+        ranked = sorted(
+            ((t, s) for t, s in scores.items() if s >= MIN_SCORE and s >= RELATIVE_MIN * best),
+            key=lambda ts: ts[1], reverse=True,
+        )
+        tags[bill] = ranked[:MAX_TOPICS]
+    return tags
+
+
+def evaluate(tags, labels, taxonomy):
+    """Per-topic precision/recall against the mapped bills.json labels"""
+    labeled = [b for b in tags if labels.get(b)]
+    report = {}
+    for topic in taxonomy:
+        if topic not in LABEL_MAP.values():
+            continue
+        predicted = {b for b in labeled if any(t == topic for t, _ in tags[b])}
+        actual = {b for b in labeled if topic in labels[b]}
+        hits = len(predicted & actual)
+        report[topic] = {
+            'predicted': len(predicted),
+            'labeled': len(actual),
+            'precision': round(hits / len(predicted), 3) if predicted else None,
+            'recall': round(hits / len(actual), 3) if actual else None,
+        }
+    return len(labeled), report
+
+
+def main():
+    print("=" * 60)
+    print("TOPIC TAGGER")
+    print("=" * 60)
+    run = pipeline_metrics.start_run('tag_topics')
+
+    with run.span('load'):
+        taxonomy = load_taxonomy()
+        bills = list(open_index(BILLS_FILE, 'bills', key_field='bill_number').iter_records(
+            fields=('bill_number', 'title', 'general_provisions', 'highlighted_provisions', 'topics')
+        ))
+        analyses = optional_index(LANGUAGE_FILE, 'analyses')
+        sentences = SentenceTable()
+
+    with run.span('parse'):
+        docs = {
+            b['bill_number']: bill_document(b, extracted_text(b['bill_number'], analyses, sentences))
+            for b in bills
+        }
+        cache = FeatureCache('bills')
+        counts = cache.counts(docs)
+        run.cache['features'].update(hit=cache.hits, miss=cache.misses)
+
+    with run.span('analyze'):
+        vectors, _ = tfidf(counts)
+        titles = {b['bill_number']: b.get('title') or '' for b in bills}
+        seeds = seed_scores(vectors, titles, taxonomy)
+        cents = centroids(vectors, seeds, taxonomy)
+        tags = assign(vectors, seeds, cents, taxonomy)
+
+        labels = {
+            b['bill_number']: {LABEL_MAP[t] for t in b.get('topics') or [] if t in LABEL_MAP}
+            for b in bills
+        }
+        labeled_count, evaluation = evaluate(tags, labels, taxonomy)
+
+    output = {
+        'generated_date': datetime.now().isoformat(),
+        'taxonomy': taxonomy,
+        'bills': {
+            bill: [{'topic': t, 'score': round(s, 3)} for t, s in ranked]
+            for bill, ranked in tags.items()
+        },
+        'evaluation': {'labeledBills': labeled_count, 'topics': evaluation},
+    }
+    with run.span('serialize'):
+        with open(OUTPUT_FILE, 'w') as f:
+            json.dump(output, f, indent=2)
+
+    tagged = sum(1 for r in tags.values() if r)
+    print(f"  Tagged {tagged}/{len(tags)} bills; features cached {cache.hits} / "
+          f"re-tokenized {cache.misses}")
+    print(f"\n  {'Topic':<17} {'Pred':>5} {'Label':>6} {'Prec':>6} {'Recall':>7}")
+    for topic, e in evaluation.items():
+        prec = f"{e['precision']:.2f}" if e['precision'] is not None else '-'
+        rec = f"{e['recall']:.2f}" if e['recall'] is not None else '-'
+        print(f"  {topic:<17} {e['predicted']:>5} {e['labeled']:>6} {prec:>6} {rec:>7}")
+    print(f"\n✅ Saved {OUTPUT_FILE} (evaluated on {labeled_count} labeled bills)")
+    run.count('bills_tagged', tagged)
+    run.finish()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+Text Features - Shared tokenizing, cached term counts and TF-IDF for bill text
+
+Used by the tagging and similarity stages. Term counts are the expensive
+part, so they're cached per bill under cache/features/, keyed by a hash
+of the exact text that was tokenized; only new or changed bills are
+re-tokenized on the next run.
+
+    from text_features import bill_document, FeatureCache, tfidf
+
+    docs = {b['bill_number']: bill_document(b) for b in bills}
+    counts = FeatureCache('topics').counts(docs)      # {bill: {term: n}}
+    vectors, idf = tfidf(counts)                       # L2-normalized
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+from collections import Counter
+
+CACHE_DIR = 'cache/features'
+
+# Bump when tokenize() changes so cached counts are rebuilt
+TOKENIZER_VERSION = 1
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been
+before being below between both but by can could did do does doing down during each
+few for from further had has have having he her here hers him his how i if in into is
+it its itself just me more most my no nor not now of off on once only or other our out
+over own same she should so some such than that the their them then there these they
+this those through to too under until up very was we were what when where which while
+who whom why will with would you your
+bill act amendment amendments amend amends amended modifies modify modification
+modifications provision provisions provides provide section sections subsection code
+utah state defines define term terms technical changes change makes make made
+certain related including include includes requires require required require
+enacts enact repeals repeal effective date shall may must person entity
+""".split())
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_WORD_RE = re.compile(r"[a-z][a-z'-]+")
+
+
+def stem(word):
+    """Light suffix stripping - enough to fold plurals and verb forms"""
+    for suffix, repl in (('ies', 'y'), ('sses', 'ss'), ('ing', ''), ('ed', ''), ('es', ''), ('s', '')):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)] + repl
+            break
+    return word
+
+
+def tokenize(text):
+    """Lowercased, stopword-free, stemmed tokens"""
+    text = _TAG_RE.sub(' ', text or '').lower()
+    return [stem(w.strip("'-")) for w in _WORD_RE.findall(text)
+            if w.strip("'-") not in STOPWORDS and len(w) > 2]
+
+
+def bill_document(bill, extra=''):
+    """The text a bill is featurized from: title, provisions, plus `extra`
+
+    The title is repeated so its terms outweigh boilerplate in the body.
+    """
+    title = bill.get('title') or ''
+    return '\n'.join((
+        title, title,
+        bill.get('general_provisions') or '',
+        bill.get('highlighted_provisions') or '',
+        extra,
+    ))
+
+
+def content_hash(text):
+    return hashlib.sha1(f'{TOKENIZER_VERSION}\0{text}'.encode('utf-8')).hexdigest()[:16]
+
+
+class FeatureCache:
+    """Term counts per document, cached on disk by content hash"""
+
+    def __init__(self, name, cache_dir=CACHE_DIR):
+        self.path = os.path.join(cache_dir, f'{name}.json')
+        self.hits = self.misses = 0
+
+    def _load(self):
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        return {}
+
+    def counts(self, docs):
+        """{key: {term: count}} for {key: text}, tokenizing only changed texts"""
+        cached = self._load()
+        result, fresh = {}, {}
+        for key, text in docs.items():
+            h = content_hash(text)
+            entry = cached.get(key)
+            if entry and entry['hash'] == h:
+                self.hits += 1
+                counts = entry['counts']
+            else:
+                self.misses += 1
+                counts = dict(Counter(tokenize(text)))
+            result[key] = counts
+            fresh[key] = {'hash': h, 'counts': counts}
+
+        if self.misses or set(cached) != set(fresh):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'w') as f:
+                json.dump(fresh, f, separators=(',', ':'))
+        return result
+
+
+def tfidf(counts, min_df=1, max_df_ratio=0.5):
+    """({key: {term: weight}}, idf) - sublinear tf, smoothed idf, L2-normalized
+
+    Terms in fewer than `min_df` documents or more than `max_df_ratio` of
+    them are dropped.
+    """
+    n = len(counts)
+    df = Counter()
+    for terms in counts.values():
+        df.update(terms.keys())
+    max_df = max_df_ratio * n
+    idf = {t: math.log((1 + n) / (1 + d)) + 1 for t, d in df.items() if min_df <= d <= max_df}
+
+    vectors = {}
+    for key, terms in counts.items():
+        vec = {t: (1 + math.log(c)) * idf[t] for t, c in terms.items() if t in idf}
+        norm = math.sqrt(sum(w * w for w in vec.values())) or 1.0
+        vectors[key] = {t: w / norm for t, w in vec.items()}
+    return vectors, idf
+
+
+def cosine(a, b):
+    """Dot product of two L2-normalized sparse vectors"""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(w * b.get(t, 0.0) for t, w in a.items())